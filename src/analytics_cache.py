@@ -0,0 +1,283 @@
+"""
+This module provides a persistent on-disk cache of computed game math.
+
+Results are keyed by a hash of the paytable (every configuration value the
+game math depends on), the name of the analysis, its parameters and the cache
+format version, so a change to config.py or to the format simply misses the
+old entries. Values are stored as JSON, and lookup tables as raw arrays of
+doubles that are memory-mapped when loaded, so large tables are shared by all
+processes reading them and only the pages used are read.
+
+Every hit refreshes the modification time of the entry, and the least
+recently used entries are removed once there are more than
+ANALYTICS_CACHE_MAX_ENTRIES. Entries are written to a temporary file and moved
+into place, so processes sharing the cache never read a partial entry.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections.abc import Callable, Sequence
+from dataclasses import asdict
+from typing import Any, cast
+from game_math import Paytable
+from config import ANALYTICS_CACHE_ENABLED, ANALYTICS_CACHE_DIRECTORY, ANALYTICS_CACHE_MAX_ENTRIES
+
+# Version of the stored format, increase it whenever the layout or the meaning of entries changes
+CACHE_FORMAT_VERSION: int = 1
+
+# File extensions of values and lookup tables
+_VALUE_EXTENSION: str = ".json"
+_TABLE_EXTENSION: str = ".bin"
+
+# Marker of a value missing from the cache, None is a valid cached value
+_MISSING: object = object()
+
+
+class AnalyticsCache:
+    """
+    Represents the on-disk cache of analysis results.
+
+    Attributes:
+        directory (str | None): The absolute path of the cache directory, or None to only cache in memory.
+        max_entries (int): The number of entries kept on disk.
+    """
+
+    def __init__(self, directory: str | None = ANALYTICS_CACHE_DIRECTORY,
+                 max_entries: int = ANALYTICS_CACHE_MAX_ENTRIES) -> None:
+        """
+        Initialize a new AnalyticsCache instance.
+
+        Args:
+            directory (str | None): The cache directory, relative to the source directory,
+                or None to only cache in memory.
+            max_entries (int): The number of entries kept on disk.
+        """
+        if directory is not None:
+            directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+            os.makedirs(directory, exist_ok=True)
+        self.directory: str | None = directory
+        self.max_entries: int = max_entries
+        self._values: dict[str, Any] = {}
+        self._tables: dict[str, "memoryview[float]"] = {}
+        self._maps: list[mmap.mmap] = []
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the AnalyticsCache object.
+
+        Returns:
+            str: A string representation of the AnalyticsCache object.
+        """
+        return (f"AnalyticsCache(directory={self.directory}, max_entries={self.max_entries}, "
+                f"loaded={len(self._values) + len(self._tables)})")
+
+    @staticmethod
+    def key(name: str, paytable: Paytable, **parameters: Any) -> str:
+        """
+        Get the key of an analysis result.
+
+        Args:
+            name (str): The name of the analysis.
+            paytable (Paytable): The paytable the result is computed for.
+            **parameters (Any): The JSON-compatible parameters of the analysis.
+
+        Returns:
+            str: The key, the analysis name followed by the hash of everything the result depends on.
+        """
+        identity = {
+            "version": CACHE_FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "name": name,
+            "paytable": asdict(paytable),
+            "parameters": parameters
+        }
+        digest = hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+        return f"{name}-{digest[:32]}"
+
+    def _path(self, key: str, extension: str) -> str | None:
+        """
+        Get the path of an entry file.
+
+        Args:
+            key (str): The key of the entry.
+            extension (str): The extension of the entry file.
+
+        Returns:
+            str | None: The path, or None without a cache directory.
+        """
+        return os.path.join(self.directory, key + extension) if self.directory is not None else None
+
+    def _store(self, path: str, write: Callable[[Any], None], mode: str) -> None:
+        """
+        Write an entry file atomically and evict the least recently used entries.
+
+        Args:
+            path (str): The path of the entry file.
+            write (Callable[[Any], None]): The function writing the content to the open file.
+            mode (str): The mode to open the file with.
+        """
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, mode) as file:
+            write(file)
+        os.replace(temporary_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries beyond the maximum number of entries.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((_VALUE_EXTENSION, _TABLE_EXTENSION)):
+                entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:  # Removed by another process, or mapped on a platform that forbids removing it
+                pass
+
+    @staticmethod
+    def _read_value(path: str) -> Any:
+        """
+        Read a stored value and mark it as recently used.
+
+        Args:
+            path (str): The path of the value file.
+
+        Returns:
+            Any: The value, or the missing marker if it is not stored or cannot be read.
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                value = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return _MISSING
+        return value
+
+    def _map_table(self, path: str) -> "memoryview[float] | None":
+        """
+        Memory-map a stored lookup table and mark it as recently used.
+
+        Args:
+            path (str): The path of the table file.
+
+        Returns:
+            memoryview[float] | None: The read-only table, or None if it is not stored.
+        """
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    # An empty file cannot be memory-mapped
+                    return cast("memoryview[float]", memoryview(array("d")).toreadonly())
+                table_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)
+        except OSError:
+            return None
+        self._maps.append(table_map)
+        return memoryview(table_map).cast("d")
+
+    def value(self, name: str, paytable: Paytable, compute: Callable[[], Any], **parameters: Any) -> Any:
+        """
+        Get a JSON-compatible analysis result, computing and storing it on a miss.
+
+        Args:
+            name (str): The name of the analysis.
+            paytable (Paytable): The paytable the result is computed for.
+            compute (Callable[[], Any]): The function computing the result.
+            **parameters (Any): The JSON-compatible parameters of the analysis.
+
+        Returns:
+            Any: The result, as it reads back from JSON.
+        """
+        key = self.key(name, paytable, **parameters)
+        if key in self._values:
+            return self._values[key]
+
+        path = self._path(key, _VALUE_EXTENSION)
+        result = self._read_value(path) if path is not None else _MISSING
+        if result is _MISSING:
+            # Round trip through JSON, so a miss returns the same types as a hit
+            result = json.loads(json.dumps(compute()))
+            if path is not None:
+                self._store(path, lambda file: json.dump(result, file), "w")
+        self._values[key] = result
+        return result
+
+    def table(self, name: str, paytable: Paytable, compute: Callable[[], Sequence[float]],
+              **parameters: Any) -> "memoryview[float]":
+        """
+        Get a lookup table of floats, computing and storing it on a miss.
+
+        Args:
+            name (str): The name of the analysis.
+            paytable (Paytable): The paytable the table is computed for.
+            compute (Callable[[], Sequence[float]]): The function computing the table.
+            **parameters (Any): The JSON-compatible parameters of the analysis.
+
+        Returns:
+            memoryview[float]: The read-only table, memory-mapped from the cache file when possible.
+        """
+        key = self.key(name, paytable, **parameters)
+        if key in self._tables:
+            return self._tables[key]
+
+        path = self._path(key, _TABLE_EXTENSION)
+        table: "memoryview[float] | None" = self._map_table(path) if path is not None else None
+        if table is None:
+            values = array("d", compute())
+            if path is not None:
+                self._store(path, values.tofile, "wb")
+            table = self._map_table(path) if path is not None else None
+        if table is None:
+            table = cast("memoryview[float]", memoryview(values).toreadonly())
+        self._tables[key] = table
+        return table
+
+    def clear(self) -> None:
+        """
+        Remove all entries from memory and disk.
+        """
+        self.close()
+        if self.directory is None:
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((_VALUE_EXTENSION, _TABLE_EXTENSION)):
+                os.remove(entry.path)
+
+    def close(self) -> None:
+        """
+        Forget the loaded entries and unmap the lookup tables.
+
+        Tables returned earlier must not be used afterwards.
+        """
+        self._values.clear()
+        for table in self._tables.values():
+            table.release()
+        self._tables.clear()
+        for table_map in self._maps:
+            table_map.close()
+        self._maps.clear()
+
+
+_analytics_cache: AnalyticsCache | None = None
+
+
+def get_analytics_cache() -> AnalyticsCache:
+    """
+    Get the analytics cache shared by the game and the analysis tools.
+
+    The cache is created on first use, on disk if ANALYTICS_CACHE_ENABLED is set and in memory otherwise.
+
+    Returns:
+        AnalyticsCache: The shared cache.
+    """
+    global _analytics_cache
+    if _analytics_cache is None:
+        _analytics_cache = AnalyticsCache(ANALYTICS_CACHE_DIRECTORY if ANALYTICS_CACHE_ENABLED else None)
+    return _analytics_cache
@@ -0,0 +1,291 @@
+"""
+This module provides risk-of-ruin and session-length analysis for the Slot Machine game.
+
+The player's money is modelled as a Markov chain whose states are the possible
+balances. Every pull moves the balance by the net result of one of the outcomes
+from the "game_math" module. The chain has two absorbing ends: ruin, when the
+balance falls below the pull cost, and the target, when the player is assumed
+to stop playing. The distribution over balances is advanced with vectorized
+transition steps (one shifted slice per outcome), so no simulation is needed.
+
+Run this module directly to print a report for the values in config.py.
+"""
+
+import argparse
+from dataclasses import dataclass, asdict
+from game_math import Paytable
+from analytics_cache import get_analytics_cache
+from config import DEFAULT_MONEY, BANKROLL_TARGET_MONEY, BANKROLL_TOLERANCE
+
+
+@dataclass(frozen=True)
+class BalanceDistribution:
+    """
+    Represents the distribution of the player's money after a number of pulls.
+
+    Attributes:
+        pulls (int): The number of pulls played.
+        balances (tuple[int, ...]): The balances the player can still play with.
+        probabilities (tuple[float, ...]): The probability of each balance.
+        ruin_probability (float): The probability that the player has been ruined.
+        target_probability (float): The probability that the player has reached the target.
+    """
+    pulls: int
+    balances: tuple[int, ...]
+    probabilities: tuple[float, ...]
+    ruin_probability: float
+    target_probability: float
+
+    def as_dict(self) -> dict[int, float]:
+        """
+        Get the non-zero balance probabilities as a dictionary.
+
+        Returns:
+            dict[int, float]: The probability of each balance the player can still play with.
+        """
+        return {balance: probability
+                for balance, probability in zip(self.balances, self.probabilities) if probability > 0}
+
+
+@dataclass(frozen=True)
+class RuinAnalysis:
+    """
+    Represents the long-run results of the bankroll analysis.
+
+    Attributes:
+        starting_money (int): The player's money before the first pull.
+        target_money (int): The balance at which the player stops playing.
+        ruin_probability (float): The probability of falling below the pull cost before reaching the target.
+        target_probability (float): The probability of reaching the target before ruin.
+        expected_pulls (float): The expected number of pulls until ruin or target.
+        pulls_analyzed (int): The number of transition steps that were computed.
+        remaining_probability (float): The probability of still playing after the analyzed pulls.
+    """
+    starting_money: int
+    target_money: int
+    ruin_probability: float
+    target_probability: float
+    expected_pulls: float
+    pulls_analyzed: int
+    remaining_probability: float
+
+
+class BankrollChain:
+    """
+    Represents the player's money as a Markov chain over balance states.
+
+    Balances are stored in units of the paytable money unit, which keeps the
+    number of states small. State 0 is the lowest balance that still allows
+    a pull and the last state is the highest balance below the target.
+
+    Attributes:
+        paytable (Paytable): The paytable describing a single pull.
+        starting_money (int): The player's money before the first pull.
+        target_money (int): The balance at which the player stops playing.
+        unit (int): The money unit shared by every balance change.
+        lowest_balance (int): The balance of state 0.
+        number_of_states (int): The number of transient (still playing) states.
+    """
+
+    def __init__(self, paytable: Paytable = Paytable(), starting_money: int = DEFAULT_MONEY,
+                 target_money: int = BANKROLL_TARGET_MONEY) -> None:
+        """
+        Initialize a new BankrollChain instance.
+
+        Args:
+            paytable (Paytable): The paytable describing a single pull.
+            starting_money (int): The player's money before the first pull.
+            target_money (int): The balance at which the player stops playing.
+
+        Raises:
+            ValueError: If the target is not above the starting money.
+        """
+        if target_money <= starting_money:
+            raise ValueError("Target money must be above the starting money.")
+
+        self.paytable: Paytable = paytable
+        self.starting_money: int = starting_money
+        self.target_money: int = target_money
+        self.unit: int = paytable.money_unit()
+
+        # The lowest playable balance that can be reached from the starting money
+        offset = (starting_money - paytable.pull_cost) % self.unit
+        self.lowest_balance: int = paytable.pull_cost + offset
+        self.number_of_states: int = max(0, -(-(target_money - self.lowest_balance) // self.unit))
+
+        self._shifts: tuple[tuple[int, float], ...] = tuple(
+            (outcome.net // self.unit, outcome.probability) for outcome in paytable.outcomes()
+        )
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the BankrollChain object.
+
+        Returns:
+            str: A string representation of the BankrollChain object.
+        """
+        return (f"BankrollChain(starting_money={self.starting_money}, target_money={self.target_money}, "
+                f"unit={self.unit}, states={self.number_of_states})")
+
+    def balance_of(self, state: int) -> int:
+        """
+        Get the balance represented by a state.
+
+        Args:
+            state (int): The index of the state.
+
+        Returns:
+            int: The balance of the state.
+        """
+        return self.lowest_balance + state * self.unit
+
+    def initial_distribution(self) -> list[float]:
+        """
+        Get the distribution over states before the first pull.
+
+        Returns:
+            list[float]: The probability of each state, which is 1 for the starting money.
+        """
+        distribution = [0.0] * self.number_of_states
+        if self.starting_money >= self.paytable.pull_cost:
+            distribution[(self.starting_money - self.lowest_balance) // self.unit] = 1.0
+        return distribution
+
+    def step(self, distribution: list[float]) -> tuple[list[float], float, float]:
+        """
+        Advance the distribution over states by one pull.
+
+        Each outcome shifts the whole distribution by its net result at once,
+        and the mass shifted past either end is absorbed.
+
+        Args:
+            distribution (list[float]): The probability of each state before the pull.
+
+        Returns:
+            tuple[list[float], float, float]: The distribution after the pull, the probability
+                absorbed by ruin and the probability absorbed by the target.
+        """
+        states = self.number_of_states
+        new_distribution = [0.0] * states
+        ruined = 0.0
+        reached_target = 0.0
+
+        for shift, probability in self._shifts:
+            if shift >= 0:
+                kept = max(0, states - shift)
+                new_distribution[shift:] = [new + probability * old for new, old in
+                                            zip(new_distribution[shift:], distribution[:kept])]
+                reached_target += probability * sum(distribution[kept:])
+            else:
+                lost = min(states, -shift)
+                new_distribution[:states - lost] = [new + probability * old for new, old in
+                                                    zip(new_distribution[:states - lost], distribution[lost:])]
+                ruined += probability * sum(distribution[:lost])
+
+        return new_distribution, ruined, reached_target
+
+    def distribution_after(self, pulls: int) -> BalanceDistribution:
+        """
+        Calculate the distribution of the player's money after a number of pulls.
+
+        Args:
+            pulls (int): The number of pulls.
+
+        Returns:
+            BalanceDistribution: The distribution of the player's money.
+        """
+        distribution = self.initial_distribution()
+        ruined = 1.0 - sum(distribution)
+        reached_target = 0.0
+
+        for _ in range(pulls):
+            distribution, step_ruined, step_target = self.step(distribution)
+            ruined += step_ruined
+            reached_target += step_target
+
+        balances = tuple(self.balance_of(state) for state in range(self.number_of_states))
+        return BalanceDistribution(pulls, balances, tuple(distribution), ruined, reached_target)
+
+    def analyze(self, tolerance: float = BANKROLL_TOLERANCE, max_pulls: int = 1_000_000) -> RuinAnalysis:
+        """
+        Calculate the probability of ruin and the expected number of pulls.
+
+        The expected number of pulls is the sum of the probabilities of still
+        playing after each pull. Steps are computed until the remaining
+        probability drops below the tolerance or the pull limit is reached.
+
+        Args:
+            tolerance (float): The remaining probability at which the analysis stops.
+            max_pulls (int): The maximum number of pulls to compute.
+
+        Returns:
+            RuinAnalysis: The results of the analysis.
+        """
+        distribution = self.initial_distribution()
+        remaining = sum(distribution)
+        ruined = 1.0 - remaining
+        reached_target = 0.0
+        expected_pulls = 0.0
+        pulls = 0
+
+        while remaining > tolerance and pulls < max_pulls:
+            expected_pulls += remaining
+            distribution, step_ruined, step_target = self.step(distribution)
+            ruined += step_ruined
+            reached_target += step_target
+            remaining = sum(distribution)
+            pulls += 1
+
+        return RuinAnalysis(self.starting_money, self.target_money, ruined, reached_target,
+                            expected_pulls, pulls, remaining)
+
+    def cached_analysis(self, tolerance: float = BANKROLL_TOLERANCE, max_pulls: int = 1_000_000) -> RuinAnalysis:
+        """
+        Get the probability of ruin and the expected number of pulls from the analytics cache.
+
+        The chain is analyzed only if the cache misses the result.
+
+        Args:
+            tolerance (float): The remaining probability at which the analysis stops.
+            max_pulls (int): The maximum number of pulls to compute.
+
+        Returns:
+            RuinAnalysis: The results of the analysis.
+        """
+        analysis = get_analytics_cache().value("ruin_analysis", self.paytable,
+                                               lambda: asdict(self.analyze(tolerance, max_pulls)),
+                                               starting_money=self.starting_money, target_money=self.target_money,
+                                               tolerance=tolerance, max_pulls=max_pulls)
+        return RuinAnalysis(**analysis)
+
+
+def main() -> None:
+    """
+    Print a bankroll report for the values in config.py.
+    """
+    parser = argparse.ArgumentParser(description="Risk-of-ruin and session-length analysis.")
+    parser.add_argument("--money", type=int, default=DEFAULT_MONEY, help="Starting money.")
+    parser.add_argument("--target", type=int, default=BANKROLL_TARGET_MONEY, help="Money at which the player stops.")
+    parser.add_argument("--pulls", type=int, nargs="*", default=[10, 100, 1000],
+                        help="Numbers of pulls to show the balance distribution for.")
+    arguments = parser.parse_args()
+
+    chain = BankrollChain(starting_money=arguments.money, target_money=arguments.target)
+    analysis = chain.cached_analysis()
+    print(f"Starting money: ${analysis.starting_money}, target: ${analysis.target_money}")
+    print(f"Probability of ruin: {analysis.ruin_probability:.6f}")
+    print(f"Probability of reaching the target: {analysis.target_probability:.6f}")
+    print(f"Expected number of pulls: {analysis.expected_pulls:.2f}")
+
+    for pulls in arguments.pulls:
+        distribution = chain.distribution_after(pulls)
+        still_playing = 1 - distribution.ruin_probability - distribution.target_probability
+        expected_balance = sum(balance * probability for balance, probability
+                               in distribution.as_dict().items())
+        print(f"After {pulls} pulls: ruined {distribution.ruin_probability:.6f}, "
+              f"target {distribution.target_probability:.6f}, still playing {still_playing:.6f}, "
+              f"expected balance while playing ${expected_balance / still_playing if still_playing else 0:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ KEY_TO_EXIT: str = "Escape"
 
 # Machine configuration
 NUMBER_OF_SLOTS: int = 3  # Number of slots must be at least 2
+NUMBER_OF_ROWS: int = 3  # Rows shown on every reel, the main row is the middle (lower middle if even), 5 fit the screen
+WIN_MODE: str = "line"  # "line" (all main slots match) or "ways" (a value on every reel in any row, each way pays)
 DEFAULT_SLOT_SIZE: int = 20  # Do not change this value, it is Turtle default size
 SLOT_SHAPE: str = "square"
 VERTICAL_SHAPE_STRETCH: int = 5
@@ -25,10 +27,6 @@ HORIZONTAL_SHAPE_STRETCH: int = 5
 OUTLINE_SIZE: int = 10
 STARTING_Y_POSITION: int = 0
 
-# Slot types
-TOP_SECONDARY_SLOT: str = "top"
-BOTTOM_SECONDARY_SLOT: str = "bottom"
-
 # Slot colors
 MAIN_SLOT_COLOR: str = "white"
 SECONDARY_SLOT_COLOR: str = "gray"
@@ -52,9 +50,21 @@ JACKPOT_COLOR: str = "orange"
 JACKPOT_X_POSITION: int = 380
 JACKPOT_Y_POSITION: int = -360
 
+# Progressive jackpot configuration
+PROGRESSIVE_JACKPOT_ENABLED: bool = False  # Set as True to share a growing jackpot pool between machine processes
+PROGRESSIVE_POOL_NAME: str = "slot_machine_jackpot"  # Name of the shared memory block
+PROGRESSIVE_CONTRIBUTION_RATE: float = 0.02  # Share of every pull cost added to the pool, between 0 and 1
+PROGRESSIVE_SEED: int = 5000  # Pool value after a jackpot is won
+PROGRESSIVE_MAX_MACHINES: int = 64  # Number of machine processes that can share the pool
+PROGRESSIVE_SNAPSHOT_FILE: str = "../data/progressive_jackpot.json"  # Snapshot used to recover the pool
+PROGRESSIVE_SNAPSHOT_INTERVAL: int = 100  # Pulls of a machine between snapshots, 0 to save only on jackpots
+
 # Game logic
 MIN_PULL_CYCLES: int = 10  # Must be at least 1 and not greater than MAX_PULL_CYCLES
 MAX_PULL_CYCLES: int = 20  # Must not be greater than 100
+SPIN_DURATION_MS: int = 2000  # Wall-clock length of a spin in milliseconds, 0 to spin for a random number of cycles
+SPIN_FRAME_MS: int = 40  # Time between animation frames of a spin, late frames are skipped to keep the duration
+SPIN_REEL_STAGGER_MS: int = 300  # Time between the stops of neighbouring reels, the last reel stops at the duration
 
 # Slot configuration
 SLOT_ALIGNMENT: str = "center"
@@ -103,11 +113,113 @@ PULL_MESSAGES_Y_POSITION: int = 370
 RTP_ALIGNMENT: str = "left"
 RTP_X_POSITION: int = -390
 RTP_Y_POSITION: int = -380
+SESSION_STATS_ENABLED: bool = True  # Set as False to hide the statistics of the current session
+SESSION_STATS_ALIGNMENT: str = "left"
+SESSION_STATS_FONT: tuple[str, int, str] = ("Arial", 11, "normal")
+SESSION_STATS_COLOR: str = "white"
+SESSION_STATS_X_POSITION: int = -390  # Above the RTP display
+SESSION_STATS_Y_POSITION: int = -330
+
+# Diagnostics configuration
+DIAGNOSTICS_ENABLED: bool = False  # Set as True to show frame timing and input latency and record a trace
+DIAGNOSTICS_FONT: tuple[str, int, str] = ("Courier", 10, "normal")
+DIAGNOSTICS_COLOR: str = "lime"
+DIAGNOSTICS_X_POSITION: int = -280  # Right of the RTP display
+DIAGNOSTICS_Y_POSITION: int = -380
+DIAGNOSTICS_REFRESH_MS: int = 500  # Shortest time between redraws of the overlay while the reels spin
+DIAGNOSTICS_TRACE_EVENTS: int = 100_000  # Number of trace events kept, older events are dropped
+DIAGNOSTICS_TRACE_DIRECTORY: str = "../logs"  # Directory of the Chrome trace file written on exit
 
 # Logger configuration
 LOGGER_ON: bool = True
 LOGGER_SIMPLE_MODE: bool = True  # Set as False to use detailed log mode
+LOGGER_JSON_MODE: bool = False  # Set as True to write one JSON object per line instead of text
+LOGGER_PULL_SUMMARY: bool = False  # Set as True to write one summary record per pull instead of every cycle
+LOGGER_PULL_TRACE: bool = False  # Set as True to also write the full trace of every pull in summary mode
 LOG_DIRECTORY: str = "../logs"  # Directory to store logs
+LOG_MAX_BYTES: int = 10_000_000  # Size in bytes at which a log file is rotated, 0 to disable
+LOG_MAX_AGE_SECONDS: float = 86_400  # Age in seconds at which a log file is rotated, 0 to disable
+LOG_MAX_SEGMENTS: int = 100  # Number of rotated log files kept, 0 to keep all
+LOG_COMPRESS_ROTATED: bool = True  # Set as False to keep rotated log files uncompressed
+LOG_MANIFEST_FILE: str = "manifest.json"  # File in the log directory listing rotated log files
+
+# Event configuration
+EVENT_QUEUE_SIZE: int = 10_000  # Number of events an asynchronous subscriber can have waiting before a pull blocks
+
+# Random number configuration
+RNG_BACKEND: str = "bulk"  # "standard" (one call per draw), "bulk" (prefetched blocks) or "secure" (OS random)
+RNG_BLOCK_SIZE: int = 1024  # Number of random 32-bit words prefetched at once by the bulk and secure backends
+RNG_PREFETCH_BLOCKS: int = 2  # Number of blocks the secure backend keeps ready on a background thread
+
+# Session store configuration
+SESSION_STORE_ENABLED: bool = False  # Set as True to restore the balance and slots after a restart
+SESSION_DIRECTORY: str = "../data/session"  # Directory to store the session journal and snapshot
+SESSION_GROUP_COMMIT_PULLS: int = 16  # Number of pulls whose journal records share one fsync
+SESSION_GROUP_COMMIT_MS: float = 200  # Longest time in milliseconds a journal record waits for its fsync
+SESSION_SNAPSHOT_INTERVAL: int = 1000  # Number of pulls between snapshots, must be at least 1
+
+# Warehouse configuration
+WAREHOUSE_ENABLED: bool = False  # Set as True to record every pull in a SQLite database for later queries
+WAREHOUSE_FILE: str = "../data/warehouse.sqlite3"  # SQLite database of the recorded pulls, relative to src
+WAREHOUSE_BATCH_PULLS: int = 256  # Number of pulls written to the database in one transaction
+WAREHOUSE_FLUSH_MS: float = 1000  # Longest time in milliseconds a recorded pull waits to be written
+
+# Replay configuration
+REPLAY_PULL_INTERVAL_MS: int = 1500  # Time between pulls at 1x speed when the recording has no timestamps
+REPLAY_MAX_GAP_MS: int = 5000  # Longest time between pulls at 1x speed, longer pauses of the player are shortened
+REPLAY_FAST_FACTOR: float = 10  # Speed factor of the fast playback speed
+
+# Floor configuration
+FLOOR_MACHINES: int = 50  # Number of machines shown in the floor view
+FLOOR_FRAME_MS: int = 16  # Target time between two frames of the floor view
+FLOOR_SPIN_MS: int = 1200  # Time the reels of a floor machine spin, the reels stop one after another
+FLOOR_AUTOPLAY_DELAY_MS: int = 800  # Time a floor machine shows a result before it pulls again when autoplaying
+FLOOR_FONT_NAME: str = "Courier"  # Font of the floor view, its size is scaled to the machines
+FLOOR_HEADER_HEIGHT: int = 30  # Height of the line showing the frame rate above the machines
+
+# Analytics cache configuration
+ANALYTICS_CACHE_ENABLED: bool = True  # Set as False to recompute the game math on every launch
+ANALYTICS_CACHE_DIRECTORY: str = "../data/cache"  # Directory to store computed game math
+ANALYTICS_CACHE_MAX_ENTRIES: int = 256  # Number of cached results kept, the least recently used are removed
+
+# Config profile configuration
+CONFIG_PROFILE: str | None = None  # TOML or JSON profile overriding game values of this file, relative to src, or None
+CONFIG_PROFILE_POLL_MS: int = 1000  # Milliseconds between checks of the profile for changes, applied between pulls
+
+# Analysis configuration
+BANKROLL_TARGET_MONEY: int = 10000  # Balance at which the player is assumed to stop, must be above DEFAULT_MONEY
+BANKROLL_TOLERANCE: float = 1e-9  # Remaining probability at which bankroll analysis stops
+VOLATILITY_CONFIDENCE: float = 0.9  # Confidence level for volatility index and intervals, between 0 and 1
+DISTRIBUTION_EPSILON: float = 1e-15  # Tail probability below which distribution values are dropped
+OPTIMIZER_BATCH_SIZE: int = 5000  # Number of candidate configurations scored by a worker at once
+OPTIMIZER_RESULTS: int = 10  # Number of ranked configurations reported by the optimizer
+FAIRNESS_SPINS: int = 1_000_000  # Number of spins generated by the fairness test suite
+FAIRNESS_BATCH_SIZE: int = 100_000  # Number of spins generated at once by the fairness test suite
+FAIRNESS_ALPHA: float = 0.01  # Significance level below which a fairness test fails, between 0 and 1
+SIMULATION_BATCH_PULLS: int = 100_000  # Number of pulls of every shard of an open-ended simulation
+SIMULATION_RTP_PRECISION: float = 0.1  # Half width of the RTP interval in percentage points at which a simulation stops
+SIMULATION_CONFIDENCE: float = 0.95  # Confidence level of the RTP interval of a simulation, between 0 and 1
+SIMULATION_MAX_PULLS: int = 100_000_000  # Number of pulls after which a simulation stops anyway
+SIMULATION_PORT: int = 8765  # TCP port on which a simulation coordinator waits for remote workers
+
+# Cabinet protocol configuration
+PROTOCOL_SOCKET_PATH: str = "../data/machine.sock"  # Unix domain socket of the headless machine, relative to src
+PROTOCOL_RECEIVE_SIZE: int = 65_536  # Largest number of bytes read from a connection at once
+PROTOCOL_PIPELINE_DEPTH: int = 64  # Number of requests a client sends before reading their replies
+PROTOCOL_MAX_PENDING_BYTES: int = 1_048_576  # Unsent reply bytes at which a client's requests wait and its events drop
+PROTOCOL_BENCHMARK_PULLS: int = 100_000  # Number of pulls made by the protocol benchmark
+
+# Load generator configuration
+LOADGEN_PLAYERS: int = 1000  # Number of simulated players
+LOADGEN_PULLS_PER_SECOND: float = 2000  # Total pulls per second of all players
+LOADGEN_DURATION: float = 10  # Seconds during which pulls are scheduled
+LOADGEN_WORKERS: int = 4  # Number of service worker threads
+LATENCY_PRECISION_BITS: int = 8  # Significant bits kept for every latency, 8 bits is better than 1% precision
+MODELS_BENCHMARK_MACHINES: int = 10_000  # Number of machines created by the memory benchmark of the models
+TERMINALS_COUNT: int = 64  # Number of terminals sharing one bank in the thread stress test
+TERMINALS_THREADS: int = 8  # Number of threads pulling on the terminals
+TERMINALS_PULLS: int = 10_000  # Number of pulls of every terminal
+TERMINALS_CHUNK_PULLS: int = 100  # Number of pulls a thread makes on a terminal before moving to another one
 
 # Icon configuration
 ICON_FILE_PNG: str = "slot_machine_logo.png"
@@ -0,0 +1,220 @@
+"""
+This module provides frame timing and input latency diagnostics for the game window.
+
+The Diagnostics class records how long every redraw of the slots takes, the
+frames dropped by time-budgeted spins, and the latency from the pull key press
+to the display of the result. It shows live figures in a small overlay next to
+the RTP display and keeps the timings as trace events, which are written in
+the Chrome trace event format so they can be opened in about://tracing or
+Perfetto.
+"""
+
+import json
+import os
+from collections import deque
+from time import perf_counter, strftime, localtime
+from turtle import Turtle
+from events import EventBus, PullStarted, ReelsStopped, OUTCOME_EVENTS
+from config import (
+    DIAGNOSTICS_X_POSITION, DIAGNOSTICS_Y_POSITION, DIAGNOSTICS_FONT, DIAGNOSTICS_COLOR,
+    DIAGNOSTICS_REFRESH_MS, DIAGNOSTICS_TRACE_EVENTS, DIAGNOSTICS_TRACE_DIRECTORY, RTP_ALIGNMENT
+)
+
+# Process and thread identifiers of the trace events, the game draws on a single thread
+_TRACE_PID: int = os.getpid()
+_TRACE_TID: int = 1
+
+
+class Diagnostics(Turtle):
+    """
+    Represents the diagnostics overlay and the recorded trace events.
+
+    Attributes:
+        frames (deque[float]): The end times of the frames drawn in the last second.
+        last_frame_ms (float): The render time of the latest frame in milliseconds.
+        max_frame_ms (float): The longest render time of the current or latest pull in milliseconds.
+        skipped_frames (int): The number of frames dropped by the latest spin.
+        last_latency_ms (float | None): The latency from the latest pull key press to its result, None if unknown.
+        trace_events (deque[dict]): The recorded trace events, oldest first.
+    """
+
+    def __init__(self, trace_events: int = DIAGNOSTICS_TRACE_EVENTS) -> None:
+        """
+        Initialize the diagnostics overlay.
+
+        Args:
+            trace_events (int): The number of trace events kept, older events are dropped.
+        """
+        super().__init__()
+        self.color(DIAGNOSTICS_COLOR)
+        self.penup()
+        self.hideturtle()
+        self.frames: deque[float] = deque()
+        self.last_frame_ms: float = 0.0
+        self.max_frame_ms: float = 0.0
+        self.skipped_frames: int = 0
+        self.last_latency_ms: float | None = None
+        self.trace_events: deque[dict] = deque(maxlen=trace_events)
+        self._origin: float = perf_counter()
+        self._input_time: float | None = None
+        self._pull_started: float | None = None
+        self._spin_started: float | None = None
+        self._last_refresh: float = 0.0
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the Diagnostics object.
+
+        Returns:
+            str: A string representation of the Diagnostics object.
+        """
+        return f"Diagnostics(fps={self.fps():.1f}, trace_events={len(self.trace_events)})"
+
+    def subscribe(self, event_bus: EventBus) -> None:
+        """
+        Trace the pulls published on an event bus.
+
+        The diagnostics should subscribe after the displays, so the result is
+        timed once it has been drawn.
+
+        Args:
+            event_bus (EventBus): The bus publishing the pull events.
+        """
+        event_bus.subscribe(self.pull_started, PullStarted)
+        event_bus.subscribe(self.reels_stopped, ReelsStopped)
+        event_bus.subscribe(self.result_shown, *OUTCOME_EVENTS)
+
+    def _trace(self, name: str, started: float, ended: float, **arguments: object) -> None:
+        """
+        Record a complete trace event.
+
+        Args:
+            name (str): The name of the event.
+            started (float): The start time as returned by "perf_counter".
+            ended (float): The end time as returned by "perf_counter".
+            **arguments (object): Extra values shown with the event.
+        """
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1_000_000, 1),
+            "dur": round((ended - started) * 1_000_000, 1),
+            "pid": _TRACE_PID,
+            "tid": _TRACE_TID
+        }
+        if arguments:
+            event["args"] = arguments
+        self.trace_events.append(event)
+
+    def fps(self) -> float:
+        """
+        Get the number of frames drawn during the last second.
+
+        Returns:
+            float: The frames per second.
+        """
+        horizon = perf_counter() - 1
+        while self.frames and self.frames[0] < horizon:
+            self.frames.popleft()
+        return float(len(self.frames))
+
+    def input_received(self) -> None:
+        """
+        Record the press of the pull key.
+        """
+        self._input_time = perf_counter()
+
+    def pull_started(self, event: PullStarted) -> None:
+        """
+        Record the start of a pull.
+
+        Args:
+            event (PullStarted): The published event.
+        """
+        self._pull_started = self._spin_started = perf_counter()
+        self.max_frame_ms = 0.0
+
+    def record_frame(self, started: float, ended: float) -> None:
+        """
+        Record the redraw of the slots.
+
+        Args:
+            started (float): The start time of the redraw as returned by "perf_counter".
+            ended (float): The end time of the redraw as returned by "perf_counter".
+        """
+        self.frames.append(ended)
+        self.last_frame_ms = (ended - started) * 1000
+        self.max_frame_ms = max(self.max_frame_ms, self.last_frame_ms)
+        self._trace("update_slots", started, ended)
+        if (ended - self._last_refresh) * 1000 >= DIAGNOSTICS_REFRESH_MS:
+            self.show()
+
+    def record_skipped_frames(self, skipped: int) -> None:
+        """
+        Record the frames dropped by a time-budgeted spin.
+
+        Args:
+            skipped (int): The number of skipped frames.
+        """
+        self.skipped_frames = skipped
+
+    def reels_stopped(self, event: ReelsStopped) -> None:
+        """
+        Record the end of the spin of a pull.
+
+        Args:
+            event (ReelsStopped): The published event.
+        """
+        if self._spin_started is not None:
+            self._trace("spin", self._spin_started, perf_counter(), pull=event.pull_number,
+                        skipped_frames=self.skipped_frames)
+            self._spin_started = None
+
+    def result_shown(self, event: object) -> None:
+        """
+        Record the display of the result of a pull.
+
+        Args:
+            event (object): The published outcome event.
+        """
+        now = perf_counter()
+        pull_number = getattr(event, "pull_number", 0)
+        if self._pull_started is not None:
+            self._trace("pull", self._pull_started, now, pull=pull_number, outcome=type(event).__name__)
+            self._pull_started = None
+        if self._input_time is not None:
+            self.last_latency_ms = (now - self._input_time) * 1000
+            self._trace("input_to_result", self._input_time, now, pull=pull_number)
+            self._input_time = None
+        self.show()
+
+    def show(self) -> None:
+        """
+        Draw the overlay with the current figures.
+        """
+        self._last_refresh = perf_counter()
+        latency = f"{self.last_latency_ms:.0f} ms" if self.last_latency_ms is not None else "-"
+        self.clear()
+        self.goto(DIAGNOSTICS_X_POSITION, DIAGNOSTICS_Y_POSITION)
+        self.write(f"FPS {self.fps():.0f}  frame {self.last_frame_ms:.1f} ms (max {self.max_frame_ms:.1f})\n"
+                   f"dropped {self.skipped_frames}  input to result {latency}",
+                   align=RTP_ALIGNMENT, font=DIAGNOSTICS_FONT)
+
+    def write_trace(self, directory: str = DIAGNOSTICS_TRACE_DIRECTORY) -> str | None:
+        """
+        Write the recorded trace events as a Chrome trace file.
+
+        Args:
+            directory (str): The directory of the trace file, relative to the source directory.
+
+        Returns:
+            str | None: The path of the written file, or None if there were no events.
+        """
+        if not self.trace_events:
+            return None
+        trace_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+        os.makedirs(trace_directory, exist_ok=True)
+        trace_file = os.path.join(trace_directory, f"trace_{strftime('%Y%m%d_%H%M%S', localtime())}.json")
+        with open(trace_file, mode="w", encoding="utf-8") as trace:
+            json.dump({"traceEvents": list(self.trace_events), "displayTimeUnit": "ms"}, trace)
+        return trace_file
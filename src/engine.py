@@ -0,0 +1,278 @@
+"""
+This module defines the Engine class, a headless version of the slot machine.
+
+The Engine class follows the same pull flow as the Machine class (pay the pull
+cost, spin the slots for a random number of cycles, check for a win or a
+jackpot and pay the prize) without any graphics, so it can be driven by tools
+and servers that have no screen.
+"""
+
+from dataclasses import dataclass
+from slot import SlotValue, get_slot_values
+from rng import RandomBackend, create_random_backend
+from game_math import Paytable, Evaluation
+from progressive import ProgressiveJackpot
+from session_store import SessionStore, Checkpoint
+from models import MachineModel, Wallet
+from config import (
+    DEFAULT_MONEY, MIN_PULL_CYCLES, MAX_PULL_CYCLES, USE_SYMBOLS,
+    JACKPOT_WINNING_SYMBOL, JACKPOT_WINNING_NUMBER
+)
+
+
+@dataclass(frozen=True)
+class PullResult:
+    """
+    Represents the result of a single pull.
+
+    Attributes:
+        pull_number (int): The number of the pull, starting from 1.
+        reels (tuple[int, ...]): The index of the value shown on each main slot.
+        values (tuple[SlotValue, ...]): The value shown on each main slot.
+        outcome (str): The outcome of the pull (loss, win or jackpot).
+        pull_cost (int): The cost of the pull.
+        payout (int): The amount paid to the player, not counting the pull cost.
+        balance (int): The player's money after the pull.
+    """
+    pull_number: int
+    reels: tuple[int, ...]
+    values: tuple[SlotValue, ...]
+    outcome: str
+    pull_cost: int
+    payout: int
+    balance: int
+
+    @property
+    def net(self) -> int:
+        """
+        Get the change of the player's money caused by the pull.
+
+        Returns:
+            int: The payout minus the pull cost.
+        """
+        return self.payout - self.pull_cost
+
+
+class Engine:
+    """
+    Represents a slot machine without graphics.
+
+    The game state is kept in a compact MachineModel, so many engines fit in
+    one process. Engines hosted together can share one random backend.
+
+    Attributes:
+        paytable (Paytable): The paytable describing the prizes and costs.
+        values (tuple[SlotValue, ...]): The possible values of each slot.
+        jackpot_value (SlotValue): The value that wins the jackpot.
+        jackpot_index (int): The index of the value that wins the jackpot.
+        model (MachineModel): The reels, wallet and pull count.
+        jackpot_pool (ProgressiveJackpot | None): The shared progressive jackpot pool, or None for a fixed jackpot.
+        rng (RandomBackend): The random backend used for spinning.
+        session_store (SessionStore | None): The store checkpointing every pull, or None.
+    """
+
+    __slots__ = ("paytable", "values", "jackpot_value", "jackpot_index", "model", "jackpot_pool", "rng",
+                 "session_store")
+
+    def __init__(self, money: int = DEFAULT_MONEY, paytable: Paytable = Paytable(),
+                 jackpot_pool: ProgressiveJackpot | None = None, rng: RandomBackend | None = None,
+                 session_store: SessionStore | None = None, model: MachineModel | None = None,
+                 wallet: Wallet | None = None) -> None:
+        """
+        Initialize a new Engine instance.
+
+        Args:
+            money (int): The player's starting money.
+            paytable (Paytable): The paytable describing the prizes and costs.
+            jackpot_pool (ProgressiveJackpot | None): The shared progressive jackpot pool, or None for a fixed jackpot.
+            rng (RandomBackend | None): The random backend, or None to create a new one of the configured kind.
+            session_store (SessionStore | None): The store checkpointing every pull, or None.
+                The session saved in the store is restored.
+            model (MachineModel | None): The state to continue from, for example one loaded from a
+                MachineBank, or None to start a new machine with the given money.
+            wallet (Wallet | None): The wallet a new machine plays from, for example a SharedWallet
+                shared by machines played on other threads, or None for its own wallet with the given money.
+
+        Raises:
+            ValueError: If the paytable does not have as many values as the configured slot values,
+                or the jackpot value is not one of them.
+        """
+        self.paytable: Paytable = paytable
+        self.values: tuple[SlotValue, ...] = get_slot_values()
+        self.jackpot_value: SlotValue = JACKPOT_WINNING_SYMBOL if USE_SYMBOLS else JACKPOT_WINNING_NUMBER
+        if paytable.number_of_values != len(self.values):
+            raise ValueError(f"The paytable has {paytable.number_of_values} values, "
+                             f"but {len(self.values)} slot values are configured.")
+        if self.jackpot_value not in self.values:
+            raise ValueError(f"The jackpot value {self.jackpot_value!r} is not one of the slot values.")
+        self.jackpot_index: int = self.values.index(self.jackpot_value)
+        self.rng: RandomBackend = rng if rng is not None else create_random_backend()
+        if model is None:
+            model = MachineModel(self.rng.indices(len(self.values), paytable.number_of_slots), money, self.values,
+                                 wallet=wallet)
+        self.model: MachineModel = model
+        self.jackpot_pool: ProgressiveJackpot | None = jackpot_pool
+        self.session_store: SessionStore | None = session_store
+        if session_store is not None:
+            self.restore_session(session_store)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the Engine object.
+
+        Returns:
+            str: A string representation of the Engine object.
+        """
+        return f"Engine(slots={len(self.reels)}, balance={self.balance}, pulls={self.pulls})"
+
+    @property
+    def reels(self) -> list[int]:
+        """
+        Get the index of the value shown on each main slot.
+
+        Returns:
+            list[int]: The reel indices.
+        """
+        return self.model.reel_indices
+
+    @reels.setter
+    def reels(self, indices: list[int] | tuple[int, ...]) -> None:
+        """
+        Set the index of the value shown on each main slot.
+
+        Args:
+            indices (list[int] | tuple[int, ...]): The new reel indices, one per reel.
+        """
+        self.model.reel_indices = indices
+
+    @property
+    def balance(self) -> int:
+        """
+        Get the player's current money.
+
+        Returns:
+            int: The balance.
+        """
+        return self.model.wallet.money
+
+    @balance.setter
+    def balance(self, money: int) -> None:
+        """
+        Set the player's current money.
+
+        Args:
+            money (int): The new balance.
+        """
+        self.model.wallet.money = money
+
+    @property
+    def pulls(self) -> int:
+        """
+        Get the number of pulls played.
+
+        Returns:
+            int: The number of pulls.
+        """
+        return self.model.pulls
+
+    @pulls.setter
+    def pulls(self, pulls: int) -> None:
+        """
+        Set the number of pulls played.
+
+        Args:
+            pulls (int): The new number of pulls.
+        """
+        self.model.pulls = pulls
+
+    @property
+    def slot_values(self) -> tuple[SlotValue, ...]:
+        """
+        Get the value shown on each main slot.
+
+        Returns:
+            tuple[SlotValue, ...]: The values of the main slots.
+        """
+        return self.model.slot_values
+
+    def checkpoint(self) -> Checkpoint:
+        """
+        Get the full state of the session.
+
+        Returns:
+            Checkpoint: The state, including the random backend state.
+        """
+        return Checkpoint(self.pulls, self.balance, tuple(self.reels), self.rng.getstate())
+
+    def restore_session(self, session_store: SessionStore) -> None:
+        """
+        Restore the session saved in a session store.
+
+        The random backend is restored from the snapshot and then advanced by
+        spinning once for every pull journaled after it. A secure random
+        backend has no state to restore.
+
+        Args:
+            session_store (SessionStore): The store to restore from.
+        """
+        recovery = session_store.recover()
+        if recovery.snapshot is not None and recovery.snapshot.rng_state is not None:
+            self.rng.setstate(recovery.snapshot.rng_state)
+            for _ in range(recovery.pulls_since_snapshot):
+                self.spin()
+        if recovery.latest is not None:
+            self.pulls = recovery.latest.pull_number
+            self.balance = recovery.latest.balance
+            self.reels = list(recovery.latest.reels)
+        if recovery.snapshot is None:
+            session_store.snapshot(self.checkpoint())
+
+    def spin(self) -> None:
+        """
+        Spin the slots for a random number of cycles, as the animation of a pull does.
+
+        The values of all cycles are drawn with a single call, and only the last
+        cycle is kept since nothing shows the cycles in between.
+        """
+        reels = self.model.reels
+        cycles = self.rng.randint(MIN_PULL_CYCLES, MAX_PULL_CYCLES)
+        for reel, index in zip(reels, self.rng.indices(len(self.values), cycles * len(reels))[-len(reels):]):
+            reel.index = index
+
+    def evaluate(self) -> Evaluation:
+        """
+        Find the winning ways of the current slot configuration.
+
+        Returns:
+            Evaluation: The winning ways, with the ways of the jackpot value counted separately.
+        """
+        return self.paytable.evaluate(self.model.reel_indices, self.jackpot_index)
+
+    def pull(self) -> PullResult:
+        """
+        Simulate a pull of the slot machine.
+
+        Returns:
+            PullResult: The result of the pull.
+        """
+        model = self.model
+        pull_cost = self.paytable.pull_cost
+        model.wallet.decrease_money(pull_cost)
+        if self.jackpot_pool is not None:
+            self.jackpot_pool.contribute(pull_cost)
+
+        self.spin()
+        evaluation = self.evaluate()
+
+        if evaluation.jackpot_ways and self.jackpot_pool is not None:
+            payout = evaluation.ways * self.paytable.win_prize + self.jackpot_pool.award()
+        else:
+            payout = self.paytable.payout(evaluation)
+
+        balance = model.wallet.increase_money(payout)
+        model.pulls += 1
+        reels = model.reel_indices
+        if self.session_store is not None and self.session_store.append(model.pulls, balance, reels):
+            self.session_store.snapshot(self.checkpoint())
+        return PullResult(model.pulls, tuple(reels), model.slot_values, evaluation.outcome, pull_cost, payout,
+                          balance)
@@ -0,0 +1,247 @@
+"""
+This module defines the events published during a pull and the EventBus delivering them.
+
+A pull publishes a typed event at every step (the pull started, the reels
+stopped, the player won, won the jackpot or lost, the balance changed). Consumers
+subscribe to the event types they need:
+
+- Synchronous subscribers run during the pull, in the order they subscribed.
+  They are meant for rendering, which has to happen before the next frame.
+- Asynchronous subscribers get the events through a bounded queue and run on
+  their own thread, so slow sinks such as logging, metrics or persistence do
+  not add to the pull time.
+"""
+
+import atexit
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from queue import Queue
+from threading import Thread
+from time import time
+from typing import Any
+from config import EVENT_QUEUE_SIZE
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    The base class of all events published during a pull.
+
+    Attributes:
+        timestamp (float): The time the event happened in seconds since the epoch,
+            kept so asynchronous subscribers record when it happened, not when they got it.
+    """
+    timestamp: float = field(default_factory=time, kw_only=True)
+
+
+@dataclass(frozen=True)
+class PullStarted(Event):
+    """
+    Published when a pull has been paid for and the reels start spinning.
+
+    Attributes:
+        pull_number (int): The number of the pull, starting from 1.
+        cycles (int): The number of cycles the reels will spin, 0 if they spin for SPIN_DURATION_MS instead.
+        pull_cost (int): The cost of the pull.
+        balance (int): The player's money after paying for the pull.
+    """
+    pull_number: int
+    cycles: int
+    pull_cost: int
+    balance: int
+
+
+@dataclass(frozen=True)
+class ReelsStopped(Event):
+    """
+    Published when the reels have stopped spinning.
+
+    Attributes:
+        pull_number (int): The number of the pull.
+        values (tuple[Any, ...]): The final value of each main slot.
+    """
+    pull_number: int
+    values: tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Won(Event):
+    """
+    Published when a pull wins the regular prize.
+
+    Attributes:
+        pull_number (int): The number of the pull.
+        values (tuple[Any, ...]): The final value of each main slot.
+        amount (int): The amount won, not counting the pull cost.
+        balance (int): The player's money after the pull.
+    """
+    pull_number: int
+    values: tuple[Any, ...]
+    amount: int
+    balance: int
+
+
+@dataclass(frozen=True)
+class JackpotWon(Event):
+    """
+    Published when a pull wins the jackpot.
+
+    Attributes:
+        pull_number (int): The number of the pull.
+        values (tuple[Any, ...]): The final value of each main slot.
+        amount (int): The amount won, not counting the pull cost.
+        balance (int): The player's money after the pull.
+    """
+    pull_number: int
+    values: tuple[Any, ...]
+    amount: int
+    balance: int
+
+
+@dataclass(frozen=True)
+class Lost(Event):
+    """
+    Published when a pull wins nothing.
+
+    Attributes:
+        pull_number (int): The number of the pull.
+        values (tuple[Any, ...]): The final value of each main slot.
+        amount (int): The amount lost, which is the pull cost.
+        balance (int): The player's money after the pull.
+    """
+    pull_number: int
+    values: tuple[Any, ...]
+    amount: int
+    balance: int
+
+
+@dataclass(frozen=True)
+class BalanceChanged(Event):
+    """
+    Published once the player's money has been settled at the end of a pull.
+
+    Attributes:
+        balance (int): The player's money after the pull.
+        change (int): The change of the player's money caused by the pull.
+    """
+    balance: int
+    change: int
+
+
+# Events that end a pull, exactly one of them is published per completed pull
+OUTCOME_EVENTS: tuple[type[Event], ...] = (Won, JackpotWon, Lost)
+
+Handler = Callable[[Any], None]
+
+
+class _AsyncSubscriber(Thread):
+    """
+    A background thread delivering queued events to one handler.
+    """
+
+    def __init__(self, handler: Handler, queue_size: int) -> None:
+        """
+        Initialize a new _AsyncSubscriber instance.
+
+        Args:
+            handler (Handler): The function called with every event.
+            queue_size (int): The number of events that can wait before publishing blocks.
+        """
+        super().__init__(daemon=True)
+        self.handler: Handler = handler
+        self.events: Queue[Event | None] = Queue(maxsize=queue_size)
+        self.errors: int = 0
+
+    def run(self) -> None:
+        """
+        Deliver events until the stop request arrives.
+        """
+        while (event := self.events.get()) is not None:
+            try:
+                self.handler(event)
+            except Exception as error:  # A failing sink must not stop the delivery of later events
+                self.errors += 1
+                print(f"Event subscriber {self.handler!r} failed: {error!r}", file=sys.stderr)
+
+
+class EventBus:
+    """
+    Represents the delivery of pull events to synchronous and asynchronous subscribers.
+
+    Attributes:
+        queue_size (int): The number of events an asynchronous subscriber can have waiting.
+            Publishing blocks while a queue is full, so no event is dropped.
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE) -> None:
+        """
+        Initialize a new EventBus instance without subscribers.
+
+        Args:
+            queue_size (int): The number of events an asynchronous subscriber can have waiting.
+        """
+        self.queue_size: int = queue_size
+        self._handlers: dict[type[Event], list[Handler]] = {}
+        self._async_subscribers: list[_AsyncSubscriber] = []
+        self._closed: bool = False
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the EventBus object.
+
+        Returns:
+            str: A string representation of the EventBus object.
+        """
+        handlers = sum(len(handlers) for handlers in self._handlers.values())
+        return f"EventBus(handlers={handlers}, async_subscribers={len(self._async_subscribers)})"
+
+    def subscribe(self, handler: Handler, *event_types: type[Event]) -> None:
+        """
+        Call a handler during the pull for every event of the given types.
+
+        Args:
+            handler (Handler): The function called with every event.
+            *event_types (type[Event]): The event types to deliver, all types if none are given.
+        """
+        for event_type in event_types or tuple(Event.__subclasses__()):
+            self._handlers.setdefault(event_type, []).append(handler)
+
+    def subscribe_async(self, handler: Handler, *event_types: type[Event]) -> None:
+        """
+        Call a handler on its own thread for every event of the given types.
+
+        The handler gets the events in the order they were published.
+
+        Args:
+            handler (Handler): The function called with every event.
+            *event_types (type[Event]): The event types to deliver, all types if none are given.
+        """
+        if not self._async_subscribers:
+            atexit.register(self.close)
+        subscriber = _AsyncSubscriber(handler, self.queue_size)
+        subscriber.start()
+        self._async_subscribers.append(subscriber)
+        self.subscribe(subscriber.events.put, *event_types)
+
+    def publish(self, event: Event) -> None:
+        """
+        Deliver an event to all subscribers of its type.
+
+        Args:
+            event (Event): The event to deliver.
+        """
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+
+    def close(self) -> None:
+        """
+        Deliver all queued events and stop the asynchronous subscribers.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for subscriber in self._async_subscribers:
+            subscriber.events.put(None)
+        for subscriber in self._async_subscribers:
+            subscriber.join()
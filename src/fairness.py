@@ -0,0 +1,342 @@
+"""
+This module provides a statistical fairness test suite for the slot values.
+
+Spins are generated in large batches through "draw_slot_values", the same code
+path "Slot.randomize_slot" uses, with the values of all reels drawn in the same
+interleaved order as a pull draws them. Every batch only updates running
+counters, so millions of spins need constant memory. The suite reports the
+following tests with their p-values:
+
+- Chi-square test of the value frequencies of every reel.
+- Serial correlation between the values of consecutive spins of every reel.
+- Chi-square serial test of pairs of consecutive spins of every reel.
+- Chi-square independence test of every pair of reels.
+- Wald-Wolfowitz runs test above and below the median of every reel.
+
+Run this module directly to run the suite for the values and random backend in
+config.py.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from itertools import combinations
+from math import erfc, exp, lgamma, log, sqrt
+from slot import SlotValue, get_slot_values, draw_slot_values
+from rng import RANDOM_BACKENDS, create_random_backend, set_random_backend
+from config import NUMBER_OF_SLOTS, FAIRNESS_SPINS, FAIRNESS_BATCH_SIZE, FAIRNESS_ALPHA, RNG_BACKEND
+
+
+@dataclass(frozen=True)
+class FairnessResult:
+    """
+    Represents the result of one statistical test.
+
+    Attributes:
+        name (str): The name of the test.
+        statistic (float): The test statistic.
+        degrees_of_freedom (int | None): The degrees of freedom of a chi-square test, None for normal tests.
+        p_value (float): The probability of a statistic at least this extreme for a fair generator.
+    """
+    name: str
+    statistic: float
+    degrees_of_freedom: int | None
+    p_value: float
+
+    def passed(self, alpha: float = FAIRNESS_ALPHA) -> bool:
+        """
+        Check if the test passed at the given significance level.
+
+        Args:
+            alpha (float): The significance level.
+
+        Returns:
+            bool: True if the p-value is not below the significance level, False otherwise.
+        """
+        return self.p_value >= alpha
+
+
+def _regularized_upper_gamma(a: float, x: float) -> float:
+    """
+    Calculate the regularized upper incomplete gamma function Q(a, x).
+
+    A series is used for small x and a continued fraction for large x.
+
+    Args:
+        a (float): The shape parameter.
+        x (float): The lower limit of integration.
+
+    Returns:
+        float: The value of Q(a, x).
+    """
+    if x <= 0:
+        return 1.0
+    log_prefix = a * log(x) - x - lgamma(a)
+
+    if x < a + 1:
+        term = total = 1 / a
+        denominator = a
+        while abs(term) > abs(total) * 1e-15:
+            denominator += 1
+            term *= x / denominator
+            total += term
+        return max(0.0, 1 - total * exp(log_prefix))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    fraction = d
+    for i in range(1, 10_000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        fraction *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return exp(log_prefix) * fraction
+
+
+def chi_square_p_value(statistic: float, degrees_of_freedom: int) -> float:
+    """
+    Calculate the p-value of a chi-square statistic.
+
+    Args:
+        statistic (float): The chi-square statistic.
+        degrees_of_freedom (int): The degrees of freedom.
+
+    Returns:
+        float: The probability of a statistic at least this large.
+    """
+    return _regularized_upper_gamma(degrees_of_freedom / 2, statistic / 2)
+
+
+def normal_p_value(z: float) -> float:
+    """
+    Calculate the two-sided p-value of a standard normal statistic.
+
+    Args:
+        z (float): The z statistic.
+
+    Returns:
+        float: The probability of a statistic at least this far from zero.
+    """
+    return erfc(abs(z) / sqrt(2))
+
+
+def _chi_square(observed: list[int], expected: float) -> float:
+    """
+    Calculate the chi-square statistic of counts with the same expected count.
+
+    Args:
+        observed (list[int]): The observed counts.
+        expected (float): The expected count of every category.
+
+    Returns:
+        float: The chi-square statistic.
+    """
+    return sum((count - expected) ** 2 for count in observed) / expected
+
+
+class _ReelCounters:
+    """
+    Running counters of one reel, updated batch by batch.
+    """
+
+    def __init__(self, number_of_values: int) -> None:
+        """
+        Initialize the counters of a reel.
+
+        Args:
+            number_of_values (int): The number of possible values.
+        """
+        self.number_of_values: int = number_of_values
+        self.median: float = (number_of_values - 1) / 2
+        self.frequencies: list[int] = [0] * number_of_values
+        self.pairs: list[int] = [0] * number_of_values ** 2
+        self.count: int = 0
+        self.total: int = 0
+        self.total_squares: int = 0
+        self.lag_products: int = 0
+        self.first: int | None = None
+        self.last: int | None = None
+        self.runs: int = 0
+        self.above: int = 0
+        self.below: int = 0
+        self.last_side: bool | None = None
+        self.pending_pair: int | None = None
+
+    def update(self, indices: list[int]) -> None:
+        """
+        Add a batch of consecutive value indices of the reel.
+
+        Args:
+            indices (list[int]): The value indices in the order they were drawn.
+        """
+        for index in indices:
+            self.frequencies[index] += 1
+        self.count += len(indices)
+        self.total += sum(indices)
+        self.total_squares += sum(index * index for index in indices)
+
+        previous = [self.last] + indices[:-1] if self.last is not None else indices[:-1]
+        following = indices if self.last is not None else indices[1:]
+        self.lag_products += sum(a * b for a, b in zip(previous, following))
+        if self.first is None and indices:
+            self.first = indices[0]
+        self.last = indices[-1] if indices else self.last
+
+        # Non-overlapping pairs, carrying an unpaired value over to the next batch
+        stream = [self.pending_pair] + indices if self.pending_pair is not None else indices
+        for a, b in zip(stream[::2], stream[1::2]):
+            self.pairs[a * self.number_of_values + b] += 1
+        self.pending_pair = stream[-1] if len(stream) % 2 else None
+
+        # Runs above and below the median, values equal to the median are skipped
+        for index in indices:
+            if index == self.median:
+                continue
+            side = index > self.median
+            if side:
+                self.above += 1
+            else:
+                self.below += 1
+            if side != self.last_side:
+                self.runs += 1
+                self.last_side = side
+
+    def results(self, reel: int) -> list[FairnessResult]:
+        """
+        Calculate the per-reel test results.
+
+        Args:
+            reel (int): The number of the reel, used in the test names.
+
+        Returns:
+            list[FairnessResult]: The frequency, serial correlation, serial pairs and runs test results.
+        """
+        results = []
+        values = self.number_of_values
+
+        frequency_statistic = _chi_square(self.frequencies, self.count / values)
+        results.append(FairnessResult(f"Reel {reel} frequency", frequency_statistic, values - 1,
+                                      chi_square_p_value(frequency_statistic, values - 1)))
+
+        # Lag-1 serial correlation, approximately normal with variance 1/n
+        n = self.count
+        mean = self.total / n
+        variance = self.total_squares / n - mean * mean
+        lag_n = n - 1
+        if variance > 0 and lag_n > 0 and self.first is not None and self.last is not None:
+            covariance = (self.lag_products - mean * (2 * self.total - self.first - self.last)) / lag_n + mean * mean
+            correlation = covariance / variance
+        else:
+            correlation = 0.0
+        z = correlation * sqrt(lag_n)
+        results.append(FairnessResult(f"Reel {reel} serial correlation", correlation, None, normal_p_value(z)))
+
+        pair_count = sum(self.pairs)
+        pairs_statistic = _chi_square(self.pairs, pair_count / values ** 2)
+        results.append(FairnessResult(f"Reel {reel} serial pairs", pairs_statistic, values ** 2 - 1,
+                                      chi_square_p_value(pairs_statistic, values ** 2 - 1)))
+
+        above, below = self.above, self.below
+        total = above + below
+        expected_runs = 2 * above * below / total + 1
+        runs_variance = (expected_runs - 1) * (expected_runs - 2) / (total - 1)
+        runs_z = (self.runs - expected_runs) / sqrt(runs_variance) if runs_variance > 0 else 0.0
+        results.append(FairnessResult(f"Reel {reel} runs", runs_z, None, normal_p_value(runs_z)))
+
+        return results
+
+
+def run_suite(spins: int = FAIRNESS_SPINS, number_of_reels: int = NUMBER_OF_SLOTS,
+              values: tuple[SlotValue, ...] | None = None,
+              batch_size: int = FAIRNESS_BATCH_SIZE) -> list[FairnessResult]:
+    """
+    Generate spins in batches and run all fairness tests on them.
+
+    Args:
+        spins (int): The number of spins to generate.
+        number_of_reels (int): The number of reels of every spin.
+        values (tuple[SlotValue, ...] | None): The possible slot values, None for the configured ones.
+        batch_size (int): The number of spins generated at once.
+
+    Returns:
+        list[FairnessResult]: The results of all tests.
+    """
+    values = values if values is not None else get_slot_values()
+    number_of_values = len(values)
+    index_of = {value: index for index, value in enumerate(values)}
+    reels = [_ReelCounters(number_of_values) for _ in range(number_of_reels)]
+    cross_counts = {pair: [0] * number_of_values ** 2 for pair in combinations(range(number_of_reels), 2)}
+
+    remaining = spins
+    while remaining:
+        batch = min(batch_size, remaining)
+        remaining -= batch
+        drawn = [index_of[value] for value in draw_slot_values(values, batch * number_of_reels)]
+        columns = [drawn[reel::number_of_reels] for reel in range(number_of_reels)]
+
+        for reel, column in zip(reels, columns):
+            reel.update(column)
+        for (first, second), counts in cross_counts.items():
+            for a, b in zip(columns[first], columns[second]):
+                counts[a * number_of_values + b] += 1
+
+    results = []
+    for number, reel in enumerate(reels, start=1):
+        results.extend(reel.results(number))
+
+    degrees_of_freedom = (number_of_values - 1) ** 2
+    for (first, second), counts in cross_counts.items():
+        # Expected counts follow from the marginal frequencies of both reels
+        statistic = 0.0
+        for a in range(number_of_values):
+            for b in range(number_of_values):
+                expected = reels[first].frequencies[a] * reels[second].frequencies[b] / spins
+                if expected:
+                    statistic += (counts[a * number_of_values + b] - expected) ** 2 / expected
+        results.append(FairnessResult(f"Reels {first + 1} and {second + 1} independence", statistic,
+                                      degrees_of_freedom, chi_square_p_value(statistic, degrees_of_freedom)))
+
+    return results
+
+
+def main() -> None:
+    """
+    Run the fairness suite and print the results.
+    """
+    parser = argparse.ArgumentParser(description="Statistical fairness tests of the slot values.")
+    parser.add_argument("--spins", type=int, default=FAIRNESS_SPINS, help="Number of spins to generate.")
+    parser.add_argument("--alpha", type=float, default=FAIRNESS_ALPHA, help="Significance level.")
+    parser.add_argument("--batch-size", type=int, default=FAIRNESS_BATCH_SIZE, help="Spins generated at once.")
+    parser.add_argument("--backend", choices=RANDOM_BACKENDS, default=RNG_BACKEND, help="Random backend to test.")
+    arguments = parser.parse_args()
+    if arguments.spins < 1:
+        parser.error("--spins must be at least 1.")
+    if arguments.batch_size < 1:
+        parser.error("--batch-size must be at least 1.")
+
+    set_random_backend(create_random_backend(arguments.backend))
+
+    results = run_suite(arguments.spins, batch_size=arguments.batch_size)
+    print(f"{'Test':<34} {'Statistic':>12} {'DF':>5} {'p-value':>10}  Result")
+    for result in results:
+        degrees_of_freedom = "" if result.degrees_of_freedom is None else str(result.degrees_of_freedom)
+        print(f"{result.name:<34} {result.statistic:>12.4f} {degrees_of_freedom:>5} {result.p_value:>10.4f}  "
+              f"{'PASS' if result.passed(arguments.alpha) else 'FAIL'}")
+
+    # With many tests some failures are expected by chance, the count is reported for the certification record
+    failures = sum(not result.passed(arguments.alpha) for result in results)
+    print(f"{failures} of {len(results)} tests below alpha = {arguments.alpha}")
+    sys.exit(0 if failures == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+This module provides an exclusive lock shared between processes through a lock file.
+
+It is used for the rare updates of files and memory that several game processes
+share, such as the progressive jackpot pool and the log manifest.
+"""
+
+import sys
+from threading import Lock
+from typing import IO, Any
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    An exclusive lock shared between processes through a lock file.
+
+    Threads of one process first take a thread lock, so they never share or
+    replace each other's open lock file.
+    """
+
+    def __init__(self, lock_path: str) -> None:
+        """
+        Initialize a new FileLock instance.
+
+        Args:
+            lock_path (str): The path of the lock file.
+        """
+        self._lock_path: str = lock_path
+        self._file: IO[bytes] | None = None
+        self._thread_lock: Lock = Lock()
+
+    def __enter__(self) -> "FileLock":
+        """
+        Acquire the lock, waiting until it is free.
+
+        Returns:
+            FileLock: The acquired lock.
+        """
+        self._thread_lock.acquire()
+        self._file = open(self._lock_path, mode="a+b")
+        if sys.platform == "win32":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Release the lock.
+        """
+        if self._file is not None:
+            if sys.platform == "win32":
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
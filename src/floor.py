@@ -0,0 +1,384 @@
+"""
+This module provides a floor view showing many independent machines in one window.
+
+Every machine on the floor is a headless Engine with its own reels and
+balance, drawn in a cell of a grid. Instead of a set of Turtles per slot, the
+floor creates one canvas text item for every slot, balance and message once,
+and a single timer drives all machines: each frame advances every machine,
+changes the text of only the items whose text changed and refreshes the
+canvas once for all of them.
+
+The result of a pull is decided as soon as it starts, the reels then spin for
+FLOOR_SPIN_MS and stop one after another, as they do on the main screen.
+
+Controls:
+- Space: pull on every machine that is not spinning.
+- A: turn autoplay on or off.
+- Escape: exit.
+
+Run this module directly to open the floor view.
+"""
+
+import argparse
+from math import ceil, inf, sqrt
+from random import Random
+from time import perf_counter
+from turtle import Screen, mainloop
+from typing import Any
+from engine import Engine, PullResult
+from game_math import row_offsets, WIN_OUTCOME, JACKPOT_OUTCOME
+from rng import get_random_backend
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_BG_COLOR, KEY_TO_PULL, KEY_TO_EXIT,
+    NUMBER_OF_SLOTS, NUMBER_OF_ROWS, MAIN_SLOT_DISPLAY_COLOR, SECONDARY_SLOT_DISPLAY_COLOR,
+    FRAME_COLOR, DEFAULT_MONEY_COLOR, LOW_MONEY_COLOR, MESSAGES_COLOR, DIAGNOSTICS_COLOR,
+    FLOOR_MACHINES, FLOOR_FRAME_MS, FLOOR_SPIN_MS, FLOOR_AUTOPLAY_DELAY_MS, FLOOR_FONT_NAME,
+    FLOOR_HEADER_HEIGHT
+)
+
+# Lines of a machine cell below the reels: the balance and the message
+_TEXT_LINES: int = 2
+
+
+class FloorMachine:
+    """
+    Represents one machine on the floor and its canvas items.
+
+    Attributes:
+        engine (Engine): The game state of the machine.
+        slot_items (list[list[int]]): The canvas items of every column, from the top row to the bottom row.
+        balance_item (int): The canvas item showing the balance.
+        message_item (int): The canvas item showing the result of the latest pull.
+        result (PullResult | None): The result of the pull being spun, or None while idle.
+        spin_started (float): The time the current or latest spin started.
+        next_pull (float): The time of the next autoplayed pull.
+    """
+
+    __slots__ = ("engine", "slot_items", "balance_item", "message_item", "result", "spin_started", "next_pull")
+
+    def __init__(self, engine: Engine, slot_items: list[list[int]], balance_item: int, message_item: int) -> None:
+        """
+        Initialize a new FloorMachine instance.
+
+        Args:
+            engine (Engine): The game state of the machine.
+            slot_items (list[list[int]]): The canvas items of every column, from the top row to the bottom row.
+            balance_item (int): The canvas item showing the balance.
+            message_item (int): The canvas item showing the result of the latest pull.
+        """
+        self.engine: Engine = engine
+        self.slot_items: list[list[int]] = slot_items
+        self.balance_item: int = balance_item
+        self.message_item: int = message_item
+        self.result: PullResult | None = None
+        self.spin_started: float = 0.0
+        self.next_pull: float = 0.0
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the FloorMachine object.
+
+        Returns:
+            str: A string representation of the FloorMachine object.
+        """
+        return f"FloorMachine(balance={self.engine.balance}, pulls={self.engine.pulls}, spinning={self.spinning})"
+
+    @property
+    def spinning(self) -> bool:
+        """
+        Check whether the reels of the machine are spinning.
+
+        Returns:
+            bool: True while a pull is shown.
+        """
+        return self.result is not None
+
+
+class Floor:
+    """
+    Represents the floor view and its shared renderer.
+
+    Attributes:
+        screen (Any): The turtle screen the floor is drawn on.
+        machines (list[FloorMachine]): The machines on the floor.
+        autoplay (bool): Whether the machines pull by themselves.
+        frames (int): The number of frames drawn.
+        render_time (float): The total time spent drawing frames in seconds.
+        elapsed (float): The time from the first to the latest frame in seconds.
+    """
+
+    def __init__(self, screen: Any, machines: int = FLOOR_MACHINES, autoplay: bool = True) -> None:
+        """
+        Initialize the floor and create the canvas items of every machine.
+
+        Args:
+            screen (Any): The turtle screen to draw on, with its updates turned off.
+            machines (int): The number of machines.
+            autoplay (bool): Whether the machines pull by themselves.
+        """
+        self.screen: Any = screen
+        self.machines: list[FloorMachine] = []
+        self.autoplay: bool = autoplay
+        self.frames: int = 0
+        self.render_time: float = 0.0
+        self.elapsed: float = 0.0
+        self._first_frame: float | None = None
+        self._canvas: Any = screen.getcanvas()
+        self._texts: dict[int, tuple[str, str]] = {}
+        self._animation_random: Random = Random()
+        self._offsets: list[int] = sorted(row_offsets(NUMBER_OF_ROWS), reverse=True)
+        self._second_started: float = perf_counter()
+        self._second_frames: int = 0
+        self._fps_item: int = self._canvas.create_text(-SCREEN_WIDTH / 2 + 10, -SCREEN_HEIGHT / 2 + 10,
+                                                       anchor="nw", fill=DIAGNOSTICS_COLOR,
+                                                       font=(FLOOR_FONT_NAME, -(FLOOR_HEADER_HEIGHT // 2)))
+        self._layout(machines)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the Floor object.
+
+        Returns:
+            str: A string representation of the Floor object.
+        """
+        return f"Floor(machines={len(self.machines)}, autoplay={self.autoplay}, fps={self.fps():.1f})"
+
+    def _layout(self, machines: int) -> None:
+        """
+        Arrange the machines in a grid filling the screen below the header and create their canvas items.
+
+        Args:
+            machines (int): The number of machines.
+        """
+        height = SCREEN_HEIGHT - FLOOR_HEADER_HEIGHT
+        lines = NUMBER_OF_ROWS + _TEXT_LINES
+        # Choose the number of columns so the cells are about as wide as their content needs
+        cell_aspect = NUMBER_OF_SLOTS * 1.5 / lines
+        columns = max(1, min(machines, round(sqrt(machines * SCREEN_WIDTH / height / cell_aspect))))
+        grid_rows = ceil(machines / columns)
+        cell_width = SCREEN_WIDTH / columns
+        cell_height = height / grid_rows
+        padding = min(cell_width, cell_height) * 0.05
+        line_height = (cell_height - padding * 2) / lines
+        font_size = max(6, int(min(line_height, (cell_width - padding * 2) / NUMBER_OF_SLOTS) * 0.6))
+        font = (FLOOR_FONT_NAME, -font_size)
+        shared_rng = get_random_backend()
+
+        for index in range(machines):
+            left = -SCREEN_WIDTH / 2 + (index % columns) * cell_width
+            top = -SCREEN_HEIGHT / 2 + FLOOR_HEADER_HEIGHT + (index // columns) * cell_height
+            self._canvas.create_rectangle(left + padding, top + padding, left + cell_width - padding,
+                                          top + padding + line_height * NUMBER_OF_ROWS, outline=FRAME_COLOR)
+            engine = Engine(rng=shared_rng)
+            slot_items = []
+            for column in range(NUMBER_OF_SLOTS):
+                x = left + padding + (cell_width - padding * 2) * (column + 0.5) / NUMBER_OF_SLOTS
+                slot_items.append([
+                    self._canvas.create_text(x, top + padding + line_height * (row + 0.5), font=font,
+                                             fill=MAIN_SLOT_DISPLAY_COLOR if offset == 0
+                                             else SECONDARY_SLOT_DISPLAY_COLOR)
+                    for row, offset in enumerate(self._offsets)
+                ])
+            center = left + cell_width / 2
+            balance_item = self._canvas.create_text(center, top + padding + line_height * (NUMBER_OF_ROWS + 0.5),
+                                                    font=font)
+            message_item = self._canvas.create_text(center, top + padding + line_height * (NUMBER_OF_ROWS + 1.5),
+                                                    font=font, fill=MESSAGES_COLOR)
+            machine = FloorMachine(engine, slot_items, balance_item, message_item)
+            for column, reel in enumerate(engine.reels):
+                self._show_column(machine, column, reel)
+            self._show_balance(machine, engine.balance)
+            self.machines.append(machine)
+
+    def _set_text(self, item: int, text: str, fill: str | None = None) -> None:
+        """
+        Change the text of a canvas item, unless it already shows it.
+
+        Args:
+            item (int): The canvas item.
+            text (str): The text to show.
+            fill (str | None): The color of the text, or None to keep the current color.
+        """
+        shown = self._texts.get(item)
+        fill = fill if fill is not None else (shown[1] if shown is not None else "")
+        if shown == (text, fill):
+            return
+        self._texts[item] = (text, fill)
+        if fill:
+            self._canvas.itemconfigure(item, text=text, fill=fill)
+        else:
+            self._canvas.itemconfigure(item, text=text)
+
+    def _show_column(self, machine: FloorMachine, column: int, index: int) -> None:
+        """
+        Show a reel stopped at a value on every row of a column.
+
+        Args:
+            machine (FloorMachine): The machine.
+            column (int): The index of the column.
+            index (int): The index of the value on the main row.
+        """
+        values = machine.engine.values
+        for item, offset in zip(machine.slot_items[column], self._offsets):
+            self._set_text(item, str(values[(index + offset) % len(values)]))
+
+    def _show_balance(self, machine: FloorMachine, balance: int) -> None:
+        """
+        Show the balance of a machine.
+
+        Args:
+            machine (FloorMachine): The machine.
+            balance (int): The balance to show.
+        """
+        color = LOW_MONEY_COLOR if balance < machine.engine.paytable.pull_cost else DEFAULT_MONEY_COLOR
+        self._set_text(machine.balance_item, f"${balance}", color)
+
+    def pull(self, machine: FloorMachine, now: float) -> None:
+        """
+        Start a pull on a machine, if it has enough money.
+
+        Args:
+            machine (FloorMachine): The machine.
+            now (float): The current time as returned by "perf_counter".
+        """
+        if machine.engine.balance < machine.engine.paytable.pull_cost:
+            self._set_text(machine.message_item, "No money")
+            machine.next_pull = inf
+            return
+        machine.result = machine.engine.pull()
+        machine.spin_started = now
+        self._show_balance(machine, machine.result.balance - machine.result.payout)
+        self._set_text(machine.message_item, "")
+
+    def pull_all(self) -> None:
+        """
+        Start a pull on every machine that is not spinning.
+        """
+        now = perf_counter()
+        for machine in self.machines:
+            if not machine.spinning:
+                self.pull(machine, now)
+
+    def toggle_autoplay(self) -> None:
+        """
+        Turn autoplay on or off.
+        """
+        self.autoplay = not self.autoplay
+
+    def advance(self, machine: FloorMachine, now: float) -> None:
+        """
+        Update the canvas items of a machine for the current time.
+
+        Args:
+            machine (FloorMachine): The machine.
+            now (float): The current time as returned by "perf_counter".
+        """
+        result = machine.result
+        if result is None:
+            if self.autoplay and now >= machine.next_pull:
+                self.pull(machine, now)
+            return
+
+        elapsed_ms = (now - machine.spin_started) * 1000
+        values = machine.engine.values
+        for column, index in enumerate(result.reels):
+            if elapsed_ms < FLOOR_SPIN_MS * (column + 1) / NUMBER_OF_SLOTS:
+                index = self._animation_random.randrange(len(values))
+            self._show_column(machine, column, index)
+        if elapsed_ms < FLOOR_SPIN_MS:
+            return
+
+        if result.outcome == JACKPOT_OUTCOME:
+            message = f"JACKPOT ${result.payout - result.pull_cost}"
+        elif result.outcome == WIN_OUTCOME:
+            message = f"Won ${result.payout - result.pull_cost}"
+        else:
+            message = f"Lost ${result.pull_cost}"
+        self._set_text(machine.message_item, message)
+        self._show_balance(machine, result.balance)
+        machine.result = None
+        machine.next_pull = now + FLOOR_AUTOPLAY_DELAY_MS / 1000
+
+    def fps(self) -> float:
+        """
+        Get the average number of frames per second since the first frame.
+
+        Returns:
+            float: The frames per second, 0 before the second frame.
+        """
+        return (self.frames - 1) / self.elapsed if self.elapsed else 0.0
+
+    def frame(self) -> None:
+        """
+        Advance every machine and refresh the canvas once.
+        """
+        started = perf_counter()
+        for machine in self.machines:
+            self.advance(machine, started)
+        self.screen.update()
+
+        ended = perf_counter()
+        if self._first_frame is None:
+            self._first_frame = started
+        self.frames += 1
+        self.render_time += ended - started
+        self.elapsed = started - self._first_frame
+        self._second_frames += 1
+        if ended - self._second_started >= 1:
+            fps = self._second_frames / (ended - self._second_started)
+            self._set_text(self._fps_item, f"{len(self.machines)} machines  FPS {fps:.0f}  "
+                                           f"frame {(ended - started) * 1000:.1f} ms  "
+                                           f"autoplay {'on' if self.autoplay else 'off'}")
+            self._second_started = ended
+            self._second_frames = 0
+
+    def run(self, frames: int | None = None) -> None:
+        """
+        Draw frames on a single timer, every FLOOR_FRAME_MS as long as a frame takes less.
+
+        Args:
+            frames (int | None): The number of frames to draw before closing the screen, or None to keep drawing.
+        """
+        def tick() -> None:
+            started = perf_counter()
+            self.frame()
+            if frames is not None and self.frames >= frames:
+                self.screen.bye()
+                return
+            self.screen.ontimer(tick, max(1, FLOOR_FRAME_MS - int((perf_counter() - started) * 1000)))
+
+        self.screen.ontimer(tick, FLOOR_FRAME_MS)
+
+
+def main() -> None:
+    """
+    Open the floor view.
+    """
+    parser = argparse.ArgumentParser(description="Floor view showing many slot machines in one window.")
+    parser.add_argument("--machines", type=int, default=FLOOR_MACHINES, help="Number of machines.")
+    parser.add_argument("--no-autoplay", action="store_true", help="Pull only when the pull key is pressed.")
+    parser.add_argument("--frames", type=int, default=None, help="Draw a number of frames, then print the FPS.")
+    arguments = parser.parse_args()
+
+    screen = Screen()
+    screen.setup(width=SCREEN_WIDTH, height=SCREEN_HEIGHT)
+    screen.bgcolor(SCREEN_BG_COLOR)
+    screen.title(f"{SCREEN_TITLE} - Floor")
+    screen.tracer(0)
+
+    floor = Floor(screen, arguments.machines, not arguments.no_autoplay)
+    screen.update()
+    screen.listen()
+    screen.onkey(floor.pull_all, KEY_TO_PULL)
+    screen.onkey(floor.toggle_autoplay, "a")
+    screen.onkey(screen.bye, KEY_TO_EXIT)
+    floor.run(arguments.frames)
+
+    mainloop()
+    if floor.frames:
+        print(f"Frames: {floor.frames}, average FPS: {floor.fps():.1f}, "
+              f"average frame time: {floor.render_time / floor.frames * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+This module provides the closed-form game math of the Slot Machine game.
+
+It describes a single pull as a small set of outcomes (loss, regular win and
+jackpot) with their probabilities and net results, without depending on any
+graphical objects. Analysis tools build on these outcomes instead of
+instantiating the Turtle-backed "Money" class.
+
+Every reel shows a column of consecutive values of its strip, with the main
+row in the middle. In line mode only the main row counts and all main slots
+must match. In ways mode a value wins once for every combination of one of its
+positions on each reel, so the number of ways of a value is the product of its
+counts in the reel columns and no combination has to be enumerated.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from math import gcd
+from slot import get_slot_values
+from config import (
+    NUMBER_OF_SLOTS, PULL_COST, WIN_PRIZE,
+    JACKPOT_ENABLED, JACKPOT_PRIZE_MULTIPLIER, NUMBER_OF_ROWS, WIN_MODE
+)
+
+# Outcome names
+LOSS_OUTCOME: str = "loss"
+WIN_OUTCOME: str = "win"
+JACKPOT_OUTCOME: str = "jackpot"
+
+# Win modes
+LINE_WIN_MODE: str = "line"
+WAYS_WIN_MODE: str = "ways"
+
+
+def row_offsets(number_of_rows: int) -> tuple[int, ...]:
+    """
+    Get the offsets of the rows from the main row on the reel strip, from the top row to the bottom row.
+
+    The main row is the middle row, or the lower of the two middle rows when
+    the number of rows is even, as in the 4-row 1024-ways grid.
+
+    Args:
+        number_of_rows (int): The number of rows.
+
+    Returns:
+        tuple[int, ...]: The offset of every row, 0 for the main row.
+    """
+    half = number_of_rows // 2
+    return tuple(range(half, half - number_of_rows, -1))
+
+
+def grid_columns(reels: Sequence[int], number_of_values: int, number_of_rows: int) -> list[tuple[int, ...]]:
+    """
+    Get the value indices shown in every reel column.
+
+    Args:
+        reels (Sequence[int]): The value index of every main slot.
+        number_of_values (int): The number of possible values on each slot.
+        number_of_rows (int): The number of rows.
+
+    Returns:
+        list[tuple[int, ...]]: The value indices of every column, from the top row to the bottom row.
+    """
+    offsets = row_offsets(number_of_rows)
+    return [tuple((index + offset) % number_of_values for offset in offsets) for index in reels]
+
+
+def count_ways(columns: Sequence[Sequence[int]]) -> dict[int, int]:
+    """
+    Count the winning ways of every value showing on all reels.
+
+    Each value is counted once per column and the counts are multiplied, which
+    takes O(reels x values) instead of enumerating the rows ** reels paths.
+
+    Args:
+        columns (Sequence[Sequence[int]]): The value indices of every reel column.
+
+    Returns:
+        dict[int, int]: The number of ways of every winning value index.
+    """
+    ways: dict[int, int] = {}
+    for index in columns[0]:
+        ways[index] = ways.get(index, 0) + 1
+    for column in columns[1:]:
+        counts: dict[int, int] = {}
+        for index in column:
+            if index in ways:
+                counts[index] = counts.get(index, 0) + 1
+        ways = {index: ways[index] * count for index, count in counts.items()}
+        if not ways:
+            break
+    return ways
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """
+    Represents the winning ways of a single spin.
+
+    Attributes:
+        ways (int): The number of ways paying the regular prize.
+        jackpot_ways (int): The number of ways paying the jackpot prize.
+    """
+    ways: int
+    jackpot_ways: int
+
+    @property
+    def outcome(self) -> str:
+        """
+        Get the outcome of the spin.
+
+        Returns:
+            str: The outcome (loss, win or jackpot).
+        """
+        if self.jackpot_ways:
+            return JACKPOT_OUTCOME
+        return WIN_OUTCOME if self.ways else LOSS_OUTCOME
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """
+    Represents one possible result of a single pull.
+
+    Attributes:
+        name (str): The name of the outcome (loss, win or jackpot).
+        probability (float): The probability of the outcome on a single pull.
+        payout (int): The amount paid to the player, not counting the pull cost.
+        net (int): The change of the player's money, which is the payout minus the pull cost.
+    """
+    name: str
+    probability: float
+    payout: int
+    net: int
+
+
+@dataclass(frozen=True)
+class Paytable:
+    """
+    Represents the parameters that determine the game math.
+
+    Attributes:
+        pull_cost (int): The cost of each pull.
+        win_prize (int): The amount of money won for a successful pull.
+        jackpot_enabled (bool): Flag signaling if jackpot is enabled or disabled.
+        jackpot_multiplier (int): Number by which the prize would be multiplied if jackpot is hit.
+        number_of_values (int): The number of possible values on each slot.
+        number_of_slots (int): The number of main slots.
+        number_of_rows (int): The number of rows shown on every reel.
+        win_mode (str): Whether only the main row pays (line) or every way across the rows (ways).
+    """
+    pull_cost: int = PULL_COST
+    win_prize: int = WIN_PRIZE
+    jackpot_enabled: bool = JACKPOT_ENABLED
+    jackpot_multiplier: int = JACKPOT_PRIZE_MULTIPLIER
+    number_of_values: int = len(get_slot_values())
+    number_of_slots: int = NUMBER_OF_SLOTS
+    number_of_rows: int = NUMBER_OF_ROWS
+    win_mode: str = WIN_MODE
+
+    @property
+    def jackpot_prize(self) -> int:
+        """
+        Get the jackpot prize amount.
+
+        Returns:
+            int: The jackpot prize amount.
+        """
+        return self.win_prize * self.jackpot_multiplier
+
+    def jackpot_chance(self) -> float:
+        """
+        Calculate the chance of winning a jackpot.
+
+        Returns:
+            float: The jackpot winning chance.
+        """
+        if self.win_mode == WAYS_WIN_MODE:
+            shown = min(self.number_of_rows, self.number_of_values) / self.number_of_values
+            return shown ** self.number_of_slots
+        return 1 / (self.number_of_values ** self.number_of_slots)
+
+    def win_chance(self) -> float:
+        """
+        Calculate the chance of winning (including jackpot if enabled).
+
+        Returns:
+            float: The winning chance.
+        """
+        if self.win_mode == WAYS_WIN_MODE:
+            return sum(outcome.probability for outcome in self.outcomes() if outcome.payout > 0)
+        return self.number_of_values / (self.number_of_values ** self.number_of_slots)
+
+    def regular_win_chance(self) -> float:
+        """
+        Calculate the chance of winning without hitting the jackpot.
+
+        Returns:
+            float: The regular winning chance.
+        """
+        if self.jackpot_enabled:
+            return self.win_chance() - self.jackpot_chance()
+        return self.win_chance()
+
+    def evaluate(self, reels: Sequence[int], jackpot_index: int) -> Evaluation:
+        """
+        Find the winning ways of a spin.
+
+        Args:
+            reels (Sequence[int]): The value index of every main slot.
+            jackpot_index (int): The index of the value that wins the jackpot.
+
+        Returns:
+            Evaluation: The winning ways of the spin.
+        """
+        if self.win_mode == WAYS_WIN_MODE:
+            ways = count_ways(grid_columns(reels, self.number_of_values, self.number_of_rows))
+        else:
+            first_reel = reels[0]
+            ways = {first_reel: 1} if all(index == first_reel for index in reels) else {}
+        jackpot_ways = ways.pop(jackpot_index, 0) if self.jackpot_enabled else 0
+        return Evaluation(sum(ways.values()), jackpot_ways)
+
+    def payout(self, evaluation: Evaluation) -> int:
+        """
+        Calculate the prize of a spin with a fixed jackpot.
+
+        Args:
+            evaluation (Evaluation): The winning ways of the spin.
+
+        Returns:
+            int: The amount paid to the player, not counting the pull cost.
+        """
+        return evaluation.ways * self.win_prize + evaluation.jackpot_ways * self.jackpot_prize
+
+    def _ways_outcomes(self) -> tuple[Outcome, ...]:
+        """
+        Get all possible outcomes of a single pull in ways mode.
+
+        The distribution is built reel by reel, keeping the probability of every
+        combination of ways the values have so far, which stays small because
+        most values drop out after a few reels.
+
+        Returns:
+            tuple[Outcome, ...]: The outcomes ordered by increasing net result.
+        """
+        columns = grid_columns(range(self.number_of_values), self.number_of_values, self.number_of_rows)
+        column_counts = [count_ways([column]) for column in columns]
+        column_probability = 1 / self.number_of_values
+        states: dict[tuple[tuple[int, int], ...], float] = {(): 1.0}
+        for reel in range(self.number_of_slots):
+            next_states: dict[tuple[tuple[int, int], ...], float] = {}
+            for state, probability in states.items():
+                ways = dict(state)
+                for counts in column_counts:
+                    if reel == 0:
+                        next_state = tuple(sorted(counts.items()))
+                    else:
+                        next_state = tuple(sorted((index, ways[index] * count)
+                                                  for index, count in counts.items() if index in ways))
+                    next_states[next_state] = next_states.get(next_state, 0.0) + probability * column_probability
+            states = next_states
+
+        # All values are alike under rotation of the strip, so any index can stand for the jackpot value
+        payouts: dict[tuple[str, int], float] = {}
+        for state, probability in states.items():
+            ways = dict(state)
+            jackpot_ways = ways.pop(0, 0) if self.jackpot_enabled else 0
+            evaluation = Evaluation(sum(ways.values()), jackpot_ways)
+            key = (evaluation.outcome, self.payout(evaluation))
+            payouts[key] = payouts.get(key, 0.0) + probability
+        outcomes = [Outcome(name, probability, payout, payout - self.pull_cost)
+                    for (name, payout), probability in payouts.items()]
+        return tuple(sorted(outcomes, key=lambda outcome: outcome.net))
+
+    def outcomes(self) -> tuple[Outcome, ...]:
+        """
+        Get all possible outcomes of a single pull.
+
+        Returns:
+            tuple[Outcome, ...]: The outcomes ordered by increasing net result.
+        """
+        if self.win_mode == WAYS_WIN_MODE:
+            return self._ways_outcomes()
+        outcomes = [
+            Outcome(LOSS_OUTCOME, 1 - self.win_chance(), 0, -self.pull_cost),
+            Outcome(WIN_OUTCOME, self.regular_win_chance(), self.win_prize, self.win_prize - self.pull_cost)
+        ]
+        if self.jackpot_enabled:
+            outcomes.append(Outcome(JACKPOT_OUTCOME, self.jackpot_chance(), self.jackpot_prize,
+                                    self.jackpot_prize - self.pull_cost))
+        return tuple(sorted(outcomes, key=lambda outcome: outcome.net))
+
+    def rtp(self) -> float:
+        """
+        Calculate the Return to Player (RTP) for the paytable.
+
+        In ways mode every row position of a reel shows a value with the same
+        probability, so a value is expected to show rows / values times per
+        column and (rows / values) ** reels ways per spin.
+
+        Returns:
+            float: The RTP as a percentage.
+        """
+        if self.win_mode == WAYS_WIN_MODE:
+            expected_ways = (self.number_of_rows / self.number_of_values) ** self.number_of_slots
+            prizes = self.win_prize * (self.number_of_values - 1)
+            prizes += self.jackpot_prize if self.jackpot_enabled else self.win_prize
+            return expected_ways * prizes / self.pull_cost * 100
+        total_expected_return = sum(outcome.probability * outcome.payout for outcome in self.outcomes())
+        return (total_expected_return / self.pull_cost) * 100
+
+    def money_unit(self) -> int:
+        """
+        Get the greatest common divisor of all amounts that can change the player's money.
+
+        Every balance reachable from a starting amount differs from it by a multiple
+        of this unit, so analyses can work with much smaller integer states.
+
+        Returns:
+            int: The money unit.
+        """
+        unit = 0
+        for outcome in self.outcomes():
+            unit = gcd(unit, abs(outcome.net))
+        return unit or 1
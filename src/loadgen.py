@@ -0,0 +1,380 @@
+"""
+This module provides a synthetic load generator for a headless slot machine service.
+
+Many simulated players send pull requests to a locally hosted service made of
+worker threads, each serving its own share of players with "Engine" instances.
+Requests arrive open loop: their start times follow a Poisson schedule that does
+not wait for earlier responses, and every latency is measured from the scheduled
+start time. A slow service therefore shows up as growing latency instead of as
+fewer requests (coordinated omission).
+
+Latencies are recorded in an HDR-style histogram with a fixed relative precision,
+and the results can be written as CSV or JSON.
+
+Run this module directly to generate load and print a report.
+"""
+
+import argparse
+import csv
+import json
+from dataclasses import dataclass, field
+from queue import SimpleQueue
+from random import Random
+from threading import Thread
+from time import perf_counter, sleep
+from engine import Engine
+from config import (
+    LOADGEN_PLAYERS, LOADGEN_PULLS_PER_SECOND, LOADGEN_DURATION,
+    LOADGEN_WORKERS, LATENCY_PRECISION_BITS
+)
+
+# Percentiles reported by the load generator
+REPORTED_PERCENTILES: tuple[float, ...] = (50.0, 90.0, 99.0, 99.9, 99.99, 100.0)
+
+
+class LatencyHistogram:
+    """
+    Represents an HDR-style histogram of latencies in microseconds.
+
+    Values are grouped into buckets whose width grows with the value, so every
+    recorded value is kept with the same relative precision in constant memory.
+
+    Attributes:
+        precision_bits (int): The number of significant bits kept for every value.
+        counts (dict[int, int]): The number of values recorded in each bucket.
+        total_count (int): The number of recorded values.
+        total (int): The sum of recorded values.
+        maximum (int): The largest recorded value.
+    """
+
+    def __init__(self, precision_bits: int = LATENCY_PRECISION_BITS) -> None:
+        """
+        Initialize a new LatencyHistogram instance.
+
+        Args:
+            precision_bits (int): The number of significant bits kept for every value.
+        """
+        self.precision_bits: int = precision_bits
+        self.counts: dict[int, int] = {}
+        self.total_count: int = 0
+        self.total: int = 0
+        self.maximum: int = 0
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the LatencyHistogram object.
+
+        Returns:
+            str: A string representation of the LatencyHistogram object.
+        """
+        return f"LatencyHistogram(count={self.total_count}, buckets={len(self.counts)}, maximum={self.maximum})"
+
+    def _bucket(self, value: int) -> int:
+        """
+        Get the bucket index of a value.
+
+        Args:
+            value (int): The value in microseconds.
+
+        Returns:
+            int: The bucket index.
+        """
+        shift = max(0, value.bit_length() - self.precision_bits)
+        return (shift << self.precision_bits) + (value >> shift)
+
+    def _highest_value(self, bucket: int) -> int:
+        """
+        Get the highest value that falls into a bucket.
+
+        Args:
+            bucket (int): The bucket index.
+
+        Returns:
+            int: The highest value of the bucket in microseconds.
+        """
+        shift = bucket >> self.precision_bits
+        mantissa = bucket & ((1 << self.precision_bits) - 1)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """
+        Record a value.
+
+        Args:
+            value (int): The value in microseconds.
+        """
+        value = max(0, value)
+        bucket = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total_count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add all values recorded by another histogram with the same precision.
+
+        Args:
+            other (LatencyHistogram): The histogram to add.
+        """
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.total_count += other.total_count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def mean(self) -> float:
+        """
+        Calculate the mean of recorded values.
+
+        Returns:
+            float: The mean in microseconds.
+        """
+        return self.total / self.total_count if self.total_count else 0.0
+
+    def percentile(self, percentile: float) -> int:
+        """
+        Get the value below or at which the given percentage of values fall.
+
+        Args:
+            percentile (float): The percentage between 0 and 100.
+
+        Returns:
+            int: The value in microseconds, accurate to the histogram precision.
+        """
+        if not self.total_count:
+            return 0
+        target = max(1, round(percentile / 100 * self.total_count))
+        cumulative = 0
+        for bucket in sorted(self.counts):
+            cumulative += self.counts[bucket]
+            if cumulative >= target:
+                return min(self._highest_value(bucket), self.maximum)
+        return self.maximum
+
+    def distribution(self) -> list[tuple[int, int, float]]:
+        """
+        Get the cumulative distribution of recorded values.
+
+        Returns:
+            list[tuple[int, int, float]]: The highest value of each bucket, its count and the
+                cumulative percentage of values up to it.
+        """
+        rows = []
+        cumulative = 0
+        for bucket in sorted(self.counts):
+            cumulative += self.counts[bucket]
+            rows.append((self._highest_value(bucket), self.counts[bucket], cumulative / self.total_count * 100))
+        return rows
+
+
+@dataclass
+class LoadReport:
+    """
+    Represents the results of a load test.
+
+    Attributes:
+        players (int): The number of simulated players.
+        target_rate (float): The requested number of pulls per second.
+        duration (float): The time between the first scheduled pull and the last response in seconds.
+        scheduled (int): The number of scheduled pulls.
+        completed (int): The number of pulls that completed successfully.
+        errors (int): The number of pulls that raised an error.
+        histogram (LatencyHistogram): The latencies of all completed pulls.
+    """
+    players: int
+    target_rate: float
+    duration: float
+    scheduled: int
+    completed: int = 0
+    errors: int = 0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Get the number of completed pulls per second.
+
+        Returns:
+            float: The throughput.
+        """
+        return self.completed / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Get the share of pulls that raised an error.
+
+        Returns:
+            float: The error rate between 0 and 1.
+        """
+        finished = self.completed + self.errors
+        return self.errors / finished if finished else 0.0
+
+    def summary(self) -> dict[str, float | int]:
+        """
+        Get the main figures of the report.
+
+        Returns:
+            dict[str, float | int]: The figures, with latencies in microseconds.
+        """
+        figures: dict[str, float | int] = {
+            "players": self.players,
+            "target_rate": self.target_rate,
+            "duration": self.duration,
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "errors": self.errors,
+            "throughput": self.throughput,
+            "error_rate": self.error_rate,
+            "mean_latency_us": self.histogram.mean()
+        }
+        for percentile in REPORTED_PERCENTILES:
+            figures[f"p{percentile:g}_latency_us"] = self.histogram.percentile(percentile)
+        return figures
+
+
+# A request is (player index, scheduled start time), None stops the worker
+Request = tuple[int, float] | None
+
+
+class _ServiceWorker(Thread):
+    """
+    A worker thread of the headless service, serving its own share of players.
+    """
+
+    def __init__(self, engines: dict[int, Engine]) -> None:
+        """
+        Initialize a new _ServiceWorker instance.
+
+        Args:
+            engines (dict[int, Engine]): The engines of the players served by this worker.
+        """
+        super().__init__(daemon=True)
+        self.engines: dict[int, Engine] = engines
+        self.requests: SimpleQueue[Request] = SimpleQueue()
+        self.histogram: LatencyHistogram = LatencyHistogram()
+        self.completed: int = 0
+        self.errors: int = 0
+        self.finished_at: float = 0.0
+
+    def run(self) -> None:
+        """
+        Serve requests until the stop request arrives.
+        """
+        while (request := self.requests.get()) is not None:
+            player, scheduled_at = request
+            try:
+                self.engines[player].pull()
+            except Exception:  # Any failure of the service counts as an error
+                self.errors += 1
+            else:
+                self.completed += 1
+                self.finished_at = perf_counter()
+                self.histogram.record(int((self.finished_at - scheduled_at) * 1_000_000))
+
+
+def run_load(players: int = LOADGEN_PLAYERS, pulls_per_second: float = LOADGEN_PULLS_PER_SECOND,
+             duration: float = LOADGEN_DURATION, workers: int = LOADGEN_WORKERS,
+             seed: int | None = None) -> LoadReport:
+    """
+    Generate open-loop load against a locally hosted headless service.
+
+    Args:
+        players (int): The number of simulated players.
+        pulls_per_second (float): The total number of pulls per second of all players.
+        duration (float): The time during which pulls are scheduled in seconds.
+        workers (int): The number of service worker threads.
+        seed (int | None): The seed of the arrival schedule, None for a random one.
+
+    Returns:
+        LoadReport: The results of the load test.
+    """
+    schedule_rng = Random(seed)
+    service = [_ServiceWorker({player: Engine() for player in range(worker, players, workers)})
+               for worker in range(workers)]
+    for worker in service:
+        worker.start()
+
+    report = LoadReport(players, pulls_per_second, duration, 0)
+    started_at = perf_counter()
+    scheduled_at = started_at
+    end_at = started_at + duration
+
+    while True:
+        scheduled_at += schedule_rng.expovariate(pulls_per_second)
+        if scheduled_at >= end_at:
+            break
+        delay = scheduled_at - perf_counter()
+        if delay > 0:
+            sleep(delay)
+        player = schedule_rng.randrange(players)
+        service[player % workers].requests.put((player, scheduled_at))
+        report.scheduled += 1
+
+    for worker in service:
+        worker.requests.put(None)
+    for worker in service:
+        worker.join()
+        report.completed += worker.completed
+        report.errors += worker.errors
+        report.histogram.merge(worker.histogram)
+
+    last_response = max((worker.finished_at for worker in service), default=end_at)
+    report.duration = max(last_response, end_at) - started_at
+    return report
+
+
+def write_csv(report: LoadReport, file_path: str) -> None:
+    """
+    Write the latency distribution of a report to a CSV file.
+
+    Args:
+        report (LoadReport): The report to write.
+        file_path (str): The path of the CSV file.
+    """
+    with open(file_path, mode="w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["latency_us", "count", "cumulative_percent"])
+        writer.writerows(report.histogram.distribution())
+
+
+def write_json(report: LoadReport, file_path: str) -> None:
+    """
+    Write the summary and latency distribution of a report to a JSON file.
+
+    Args:
+        report (LoadReport): The report to write.
+        file_path (str): The path of the JSON file.
+    """
+    with open(file_path, mode="w", encoding="utf-8") as json_file:
+        json.dump({"summary": report.summary(), "distribution": report.histogram.distribution()},
+                  json_file, indent=2)
+
+
+def main() -> None:
+    """
+    Generate load with the given parameters and print a report.
+    """
+    parser = argparse.ArgumentParser(description="Open-loop load generator for a headless slot machine service.")
+    parser.add_argument("--players", type=int, default=LOADGEN_PLAYERS, help="Number of simulated players.")
+    parser.add_argument("--rate", type=float, default=LOADGEN_PULLS_PER_SECOND, help="Total pulls per second.")
+    parser.add_argument("--duration", type=float, default=LOADGEN_DURATION, help="Seconds of scheduled load.")
+    parser.add_argument("--workers", type=int, default=LOADGEN_WORKERS, help="Number of service worker threads.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the arrival schedule.")
+    parser.add_argument("--csv", help="Optional path of a CSV file for the latency distribution.")
+    parser.add_argument("--json", help="Optional path of a JSON file for the summary and distribution.")
+    arguments = parser.parse_args()
+
+    report = run_load(arguments.players, arguments.rate, arguments.duration, arguments.workers, arguments.seed)
+    for name, value in report.summary().items():
+        print(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+
+    if arguments.csv:
+        write_csv(report, arguments.csv)
+    if arguments.json:
+        write_json(report, arguments.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,207 @@ This module provides a "Logger" class that can be used to log messages to a file
 The logging can be configured to use either a simple or detailed logging mode,
 which is controlled by the "LOGGER_SIMPLE_MODE" variable in the "config" module.
 
+Log files are rotated when they grow past "LOG_MAX_BYTES" or get older than
+"LOG_MAX_AGE_SECONDS". Rotated files are compressed with gzip on a background
+thread, so logging never waits for compression, and a manifest in the log
+directory lists every segment for analytics tools.
+
+In summary mode ("LOGGER_PULL_SUMMARY") the records logged during a pull are
+gathered in memory and a single summary record is written when the pull ends.
+The full trace of the pull can still be written next to it ("LOGGER_PULL_TRACE").
+
+In JSON mode ("LOGGER_JSON_MODE") every record is one JSON object per line with
+typed fields. Game events are logged with "Logger.log_event", whose field layouts
+are listed in "EVENT_LAYOUTS" and compiled once into string templates, so encoding
+a record does not build a dictionary.
+
 The "loggable" decorator can be used to automatically log the calling and return
 of a function.
 """
 
-from os import path, makedirs
-from time import strftime, localtime
+import atexit
+import gzip
+import json
+import shutil
+from os import path, makedirs, remove, replace, getpid
+from queue import SimpleQueue
+from threading import RLock, Thread, get_ident
+from time import strftime, localtime, time, perf_counter
 from functools import wraps
 from typing import Callable, Any
-from config import LOGGER_ON, LOGGER_SIMPLE_MODE, LOG_DIRECTORY
+from file_lock import FileLock
+from config import (
+    LOGGER_ON, LOGGER_SIMPLE_MODE, LOGGER_JSON_MODE, LOGGER_PULL_SUMMARY, LOGGER_PULL_TRACE,
+    LOG_DIRECTORY, LOG_MAX_BYTES, LOG_MAX_AGE_SECONDS,
+    LOG_MAX_SEGMENTS, LOG_COMPRESS_ROTATED, LOG_MANIFEST_FILE
+)
+
+# Event used for plain messages in JSON mode
+MESSAGE_EVENT: str = "message"
+
+# Field names and types of every event, in the order their values are passed to "Logger.log_event"
+EVENT_LAYOUTS: dict[str, tuple[tuple[str, type], ...]] = {
+    MESSAGE_EVENT: (("message", str),),
+    "pull_started": (("cycles", int), ("balance", int)),
+    "won": (("slots", list), ("amount", int), ("balance", int)),
+    "jackpot_won": (("slots", list), ("amount", int), ("balance", int)),
+    "lost": (("slots", list), ("amount", int), ("balance", int)),
+    "winning_checked": (("slots", list), ("matched", bool)),
+    "jackpot_checked": (("jackpot_value", str), ("matched", bool)),
+    "pull_summary": (("cycles", int), ("frames", int), ("slots", list), ("outcome", str), ("amount", int),
+                     ("balance", int), ("phases_ms", dict), ("records", int))
+}
+
+
+def _encode_json(value: Any) -> str:
+    """
+    Encode any JSON-compatible value, keeping Unicode symbols readable.
+
+    Args:
+        value (Any): The value to encode.
+
+    Returns:
+        str: The JSON text of the value.
+    """
+    return json.dumps(value, ensure_ascii=False)
+
+
+# Encoders of the field types used in event layouts
+_FIELD_ENCODERS: dict[type, Callable[[Any], str]] = {
+    int: str,
+    float: repr,
+    bool: lambda value: "true" if value else "false",
+    str: lambda value: _encode_json(str(value)),
+    list: lambda value: _encode_json(list(value)),
+    dict: _encode_json
+}
+
+
+class _EventEncoder:
+    """
+    A precompiled JSON encoder for one event layout.
+    """
+
+    __slots__ = ("template", "encoders")
+
+    def __init__(self, event: str, layout: tuple[tuple[str, type], ...]) -> None:
+        """
+        Compile the template and field encoders of an event.
+
+        Args:
+            event (str): The name of the event.
+            layout (tuple[tuple[str, type], ...]): The names and types of the event fields.
+        """
+        fields = "".join(f",{_encode_json(name)}:%s" for name, _ in layout)
+        self.template: str = ('{"ts":%s,"event":' + _encode_json(event).replace("%", "%%")
+                              + ',"function":%s' + fields + "}\n")
+        self.encoders: tuple[Callable[[Any], str], ...] = tuple(_FIELD_ENCODERS[kind] for _, kind in layout)
+
+    def encode(self, timestamp: float, function_name: str, values: tuple[Any, ...]) -> str:
+        """
+        Encode one record of the event.
+
+        Args:
+            timestamp (float): The time of the record in seconds since the epoch.
+            function_name (str): The name of the function logging the event.
+            values (tuple[Any, ...]): The field values in layout order.
+
+        Returns:
+            str: The JSON line of the record.
+        """
+        return self.template % (repr(timestamp), _encode_json(function_name),
+                                *[encode(value) for encode, value in zip(self.encoders, values)])
+
+
+_EVENT_ENCODERS: dict[str, _EventEncoder] = {event: _EventEncoder(event, layout)
+                                             for event, layout in EVENT_LAYOUTS.items()}
+
+
+class _SegmentArchiver(Thread):
+    """
+    A background thread that compresses rotated log files and maintains the manifest.
+
+    Every finished segment is compressed, added to the manifest, and the oldest
+    segments beyond the retention limit are deleted. Several game processes may
+    share the log directory, so the manifest is only updated under a file lock.
+    """
+
+    def __init__(self, log_directory: str, compress: bool, max_segments: int,
+                 report: Callable[[str], None]) -> None:
+        """
+        Initialize a new _SegmentArchiver instance.
+
+        Args:
+            log_directory (str): The directory holding the log files and manifest.
+            compress (bool): Indicates whether rotated files are compressed.
+            max_segments (int): The number of segments kept, 0 to keep all.
+            report (Callable[[str], None]): The function logging a segment that could not be archived.
+        """
+        super().__init__(daemon=True)
+        self.manifest_file: str = path.join(log_directory, LOG_MANIFEST_FILE)
+        self.compress: bool = compress
+        self.max_segments: int = max_segments
+        self.report: Callable[[str], None] = report
+        self.segments: SimpleQueue[dict[str, Any] | None] = SimpleQueue()
+        self._manifest_lock: FileLock = FileLock(f"{self.manifest_file}.lock")
+
+    def run(self) -> None:
+        """
+        Archive segments until the stop request arrives.
+        """
+        while (segment := self.segments.get()) is not None:
+            try:
+                self.archive(segment)
+            except Exception as error:  # A failed segment must not stop the archiving of the next ones
+                self.report(f"Archiving log segment {segment['file']} failed: {error!r}")
+
+    def archive(self, segment: dict[str, Any]) -> None:
+        """
+        Compress a finished segment and record it in the manifest.
+
+        Args:
+            segment (dict[str, Any]): The segment's file path, start and end times and size.
+        """
+        log_file = segment["file"]
+        if not path.exists(log_file):
+            return
+
+        if self.compress:
+            with open(log_file, mode="rb") as source, gzip.open(f"{log_file}.gz", mode="wb") as target:
+                shutil.copyfileobj(source, target)
+            remove(log_file)
+            log_file = f"{log_file}.gz"
+
+        entry = dict(segment, file=path.basename(log_file), compressed=self.compress,
+                     stored_bytes=path.getsize(log_file))
+
+        with self._manifest_lock:
+            manifest = self.read_manifest()
+            manifest.append(entry)
+            if self.max_segments and len(manifest) > self.max_segments:
+                for expired in manifest[:-self.max_segments]:
+                    expired_file = path.join(path.dirname(self.manifest_file), expired["file"])
+                    if path.exists(expired_file):
+                        remove(expired_file)
+                manifest = manifest[-self.max_segments:]
+
+            temporary_file = f"{self.manifest_file}.{getpid()}.{get_ident()}.tmp"
+            with open(temporary_file, mode="w", encoding="utf-8") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+            replace(temporary_file, self.manifest_file)
+
+    def read_manifest(self) -> list[dict[str, Any]]:
+        """
+        Read the list of archived segments.
+
+        Returns:
+            list[dict[str, Any]]: The manifest entries, oldest first.
+        """
+        try:
+            with open(self.manifest_file, mode="r", encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except (FileNotFoundError, ValueError):
+            return []
 
 
 class Logger:
@@ -23,11 +215,19 @@ class Logger:
     Attributes:
         logger_on (bool): Indicates whether logging is enabled.
         simple_mode (bool): Indicates whether to use simple or detailed logging mode.
-        log_file (str): The path to the log file.
+        json_mode (bool): Indicates whether to write JSON lines instead of text.
+        summary_mode (bool): Indicates whether to write one summary record per pull.
+        trace_mode (bool): Indicates whether to also write every record of a pull in summary mode.
+        log_file (str): The path to the current log file.
+        max_bytes (int): The size at which the log file is rotated, 0 to disable.
+        max_age_seconds (float): The age at which the log file is rotated, 0 to disable.
     """
 
     def __init__(self, log_directory: str = LOG_DIRECTORY, logger_on: bool = LOGGER_ON,
-                 simple_mode: bool = LOGGER_SIMPLE_MODE) -> None:
+                 simple_mode: bool = LOGGER_SIMPLE_MODE, max_bytes: int = LOG_MAX_BYTES,
+                 max_age_seconds: float = LOG_MAX_AGE_SECONDS, max_segments: int = LOG_MAX_SEGMENTS,
+                 compress_rotated: bool = LOG_COMPRESS_ROTATED, json_mode: bool = LOGGER_JSON_MODE,
+                 summary_mode: bool = LOGGER_PULL_SUMMARY, trace_mode: bool = LOGGER_PULL_TRACE) -> None:
         """
         Initialize a new Logger instance.
 
@@ -35,20 +235,52 @@ class Logger:
             log_directory (str): The directory to store the log file.
             logger_on (bool): Indicates whether logging is enabled.
             simple_mode (bool): Indicates whether to use simple or detailed logging mode.
+            max_bytes (int): The size at which the log file is rotated, 0 to disable.
+            max_age_seconds (float): The age at which the log file is rotated, 0 to disable.
+            max_segments (int): The number of rotated log files kept, 0 to keep all.
+            compress_rotated (bool): Indicates whether rotated log files are compressed.
+            json_mode (bool): Indicates whether to write JSON lines instead of text.
+            summary_mode (bool): Indicates whether to write one summary record per pull.
+            trace_mode (bool): Indicates whether to also write every record of a pull in summary mode.
         """
         self.logger_on: bool = logger_on
         self.simple_mode: bool = simple_mode
+        self.json_mode: bool = json_mode
+        self.summary_mode: bool = summary_mode
+        self.trace_mode: bool = trace_mode
+
+        # State of the pull being summarized
+        self._summarizing: bool = False
+        self._pull_records: int = 0
+        self._pull_trace: list[str] = []
+        self._phases: dict[str, float] = {}
+        self._phase_started: float = 0.0
+        self.max_bytes: int = max_bytes
+        self.max_age_seconds: float = max_age_seconds
+
+        # Records may be written from event subscriber threads
+        self._write_lock: RLock = RLock()
 
         # Get the project root directory
         project_root = path.dirname(path.abspath(__file__))
-        log_directory = path.join(project_root, log_directory)
+        self._log_directory: str = path.join(project_root, log_directory)
 
         # Ensure the log directory exists
-        if logger_on and not path.exists(log_directory):
-            makedirs(log_directory)
+        if logger_on and not path.exists(self._log_directory):
+            makedirs(self._log_directory)
+
+        self._session_timestamp: str = strftime('%Y%m%d_%H%M%S', localtime())
+        self._segment_index: int = 0
+        self._segment_started: float = time()
+        self._segment_bytes: int = 0
+        self._extension: str = "jsonl" if json_mode else "log"
+        self.log_file: str = path.join(self._log_directory, f"log_{self._session_timestamp}.{self._extension}")
 
-        timestamp = strftime('%Y%m%d_%H%M%S', localtime())
-        self.log_file: str = path.join(log_directory, f"log_{timestamp}.log")
+        self._archiver: _SegmentArchiver | None = None
+        if logger_on and (max_bytes or max_age_seconds):
+            self._archiver = _SegmentArchiver(self._log_directory, compress_rotated, max_segments, self.log)
+            self._archiver.start()
+            atexit.register(self.close)
 
     def __str__(self) -> str:
         """
@@ -66,10 +298,11 @@ class Logger:
         Returns:
             str: A string representation of the Logger object.
         """
-        return f"Logger(log_file='{self.log_file}', logger_on={self.logger_on}, simple_mode={self.simple_mode})"
+        return (f"Logger(log_file='{self.log_file}', logger_on={self.logger_on}, simple_mode={self.simple_mode}, "
+                f"json_mode={self.json_mode})")
 
     def log(self, message: str, function_name: str = "", return_value: str | None = None,
-            args: tuple = (), kwargs: dict[str, Any] | None = None) -> None:
+            args: tuple = (), kwargs: dict[str, Any] | None = None, timestamp: float | None = None) -> None:
         """
         Log a message using the appropriate logging mode.
 
@@ -79,31 +312,142 @@ class Logger:
             return_value (str | None): The return value of the function being logged (optional).
             args (tuple): The arguments passed to the function being logged (optional).
             kwargs (dict[str, Any] | None): The keyword arguments passed to the function being logged (optional).
+            timestamp (float | None): The time of the record in seconds since the epoch, or None for now.
         """
+        if self._summarizing:
+            self._pull_records += 1
+            if not self.trace_mode:
+                return
+
         if kwargs is None:
             kwargs = {}
 
-        if self.simple_mode:
-            self._log_simple(message)
+        if self.json_mode:
+            self._log_json(MESSAGE_EVENT, function_name, (message,), timestamp)
+        elif self.simple_mode:
+            self._log_simple(message, timestamp)
         else:
-            self._log_detailed(message, function_name, return_value, args, kwargs)
+            self._log_detailed(message, function_name, return_value, args, kwargs, timestamp)
+
+    def log_event(self, event: str, message: str, *values: Any, function_name: str = "",
+                  timestamp: float | None = None) -> None:
+        """
+        Log a game event with typed fields.
+
+        In JSON mode the values are written as the fields of the event layout,
+        otherwise the message is logged as text.
+
+        Args:
+            event (str): The name of the event, one of "EVENT_LAYOUTS".
+            message (str): The text logged in simple and detailed mode.
+            *values (Any): The field values in the order of the event layout.
+            function_name (str): The name of the function logging the event (optional).
+            timestamp (float | None): The time of the event in seconds since the epoch, or None for now.
+        """
+        if self.json_mode:
+            if self._summarizing:
+                self._pull_records += 1
+                if not self.trace_mode:
+                    return
+            self._log_json(event, function_name, values, timestamp)
+        else:
+            self.log(message, function_name, timestamp=timestamp)
+
+    def begin_pull(self) -> None:
+        """
+        Start gathering the records of a pull in summary mode.
+        """
+        if not self.summary_mode:
+            return
+        self._summarizing = True
+        self._pull_records = 0
+        self._pull_trace = []
+        self._phases = {}
+        self._phase_started = perf_counter()
+
+    def mark_phase(self, phase: str) -> None:
+        """
+        Add the time since the previous phase mark to the given phase of the pull.
+
+        Args:
+            phase (str): The name of the phase that just ended.
+        """
+        if not self._summarizing:
+            return
+        now = perf_counter()
+        self._phases[phase] = self._phases.get(phase, 0.0) + (now - self._phase_started) * 1000
+        self._phase_started = now
+
+    def end_pull(self, cycles: int, frames: int, slots: list, outcome: str, amount: int, balance: int) -> None:
+        """
+        Write the summary record of a pull, preceded by its trace if trace mode is on.
+
+        Args:
+            cycles (int): The number of cycles the slots spun, 0 if they spun for a duration.
+            frames (int): The number of frames drawn while the slots spun.
+            slots (list): The final values of the main slots.
+            outcome (str): The outcome of the pull.
+            amount (int): The amount won or lost.
+            balance (int): The player's money after the pull.
+        """
+        if not self._summarizing:
+            return
+        self._summarizing = False
+
+        for log_message in self._pull_trace:
+            self._write(log_message)
+        self._pull_trace = []
+
+        phases = {phase: round(duration, 3) for phase, duration in self._phases.items()}
+        phases_text = ", ".join(f"{phase} {duration:.1f} ms" for phase, duration in phases.items())
+        self.log_event("pull_summary",
+                       f"Pull summary: {cycles} cycles, {frames} frames, slots {slots}, {outcome} ${amount}, "
+                       f"balance ${balance}, phases: {phases_text}, {self._pull_records} records",
+                       cycles, frames, slots, outcome, amount, balance, phases, self._pull_records,
+                       function_name="pull")
 
-    def _log_simple(self, message: str) -> None:
+    def _log_json(self, event: str, function_name: str, values: tuple[Any, ...],
+                  timestamp: float | None = None) -> None:
+        """
+        Log a record in JSON mode.
+
+        Args:
+            event (str): The name of the event.
+            function_name (str): The name of the function logging the event.
+            values (tuple[Any, ...]): The field values in the order of the event layout.
+            timestamp (float | None): The time of the record in seconds since the epoch, or None for now.
+        """
+        if self.logger_on:
+            self._emit(_EVENT_ENCODERS[event].encode(timestamp if timestamp is not None else time(),
+                                                     function_name, values))
+
+    def _emit(self, log_message: str) -> None:
+        """
+        Write a formatted message, or keep it for the trace of the pull being summarized.
+
+        Args:
+            log_message (str): The formatted message including the line ending.
+        """
+        if self._summarizing:
+            self._pull_trace.append(log_message)
+        else:
+            self._write(log_message)
+
+    def _log_simple(self, message: str, timestamp: float | None = None) -> None:
         """
         Log a message in simple mode.
 
         Args:
             message (str): The message to be logged.
+            timestamp (float | None): The time of the record in seconds since the epoch, or None for now.
         """
         if self.logger_on:
-            timestamp = strftime('%Y-%m-%d %H:%M:%S', localtime())
-            log_message = f"{timestamp} - {message}\n"
-
-            with open(self.log_file, mode="a", encoding="utf-8") as log_file:
-                log_file.write(log_message)
+            time_text = strftime('%Y-%m-%d %H:%M:%S', localtime(timestamp))
+            log_message = f"{time_text} - {message}\n"
+            self._emit(log_message)
 
     def _log_detailed(self, message: str, function_name: str, return_value: str | None,
-                      args: tuple, kwargs: dict[str, Any]) -> None:
+                      args: tuple, kwargs: dict[str, Any], timestamp: float | None = None) -> None:
         """
         Log a message in detailed mode.
 
@@ -113,17 +457,67 @@ class Logger:
             return_value (str | None): The return value of the function being logged.
             args (tuple): The arguments passed to the function being logged.
             kwargs (dict[str, Any]): The keyword arguments passed to the function being logged.
+            timestamp (float | None): The time of the record in seconds since the epoch, or None for now.
         """
         if self.logger_on:
-            timestamp = strftime('%Y-%m-%d %H:%M:%S', localtime())
+            time_text = strftime('%Y-%m-%d %H:%M:%S', localtime(timestamp))
             arg_str = ', '.join(repr(arg) for arg in args)
             kwarg_str = ', '.join(f"{key}={repr(value)}" for key, value in kwargs.items())
-            log_message = (f"{timestamp} - {function_name}(args=({arg_str}), "
+            log_message = (f"{time_text} - {function_name}(args=({arg_str}), "
                            f"kwargs={{{kwarg_str}}}): {message} "
                            f"Return value: {repr(return_value)}\n")
+            self._emit(log_message)
+
+    def _write(self, log_message: str) -> None:
+        """
+        Append a formatted message to the current log file, rotating it first if it is due.
+
+        Args:
+            log_message (str): The formatted message including the line ending.
+        """
+        with self._write_lock:
+            if self._archiver is not None and self._segment_bytes and (
+                    (self.max_bytes and self._segment_bytes >= self.max_bytes)
+                    or (self.max_age_seconds and time() - self._segment_started >= self.max_age_seconds)):
+                self.rotate()
 
             with open(self.log_file, mode="a", encoding="utf-8") as log_file:
                 log_file.write(log_message)
+            self._segment_bytes += len(log_message.encode("utf-8"))
+
+    def rotate(self) -> None:
+        """
+        Start a new log file and hand the finished one to the background archiver.
+        """
+        with self._write_lock:
+            if self._archiver is None:
+                return
+
+            self._archiver.segments.put({
+                "file": self.log_file,
+                "started": self._segment_started,
+                "ended": time(),
+                "bytes": self._segment_bytes
+            })
+
+            self._segment_index += 1
+            self._segment_started = time()
+            self._segment_bytes = 0
+            self.log_file = path.join(self._log_directory,
+                                      f"log_{self._session_timestamp}_{self._segment_index}.{self._extension}")
+
+    def close(self) -> None:
+        """
+        Archive the current log file and wait for the background archiver to finish.
+        """
+        with self._write_lock:
+            if self._archiver is None:
+                return
+            if self._segment_bytes:
+                self.rotate()
+            archiver, self._archiver = self._archiver, None
+        archiver.segments.put(None)
+        archiver.join()
 
 
 def loggable(get_logger: Callable) -> Callable:
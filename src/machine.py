@@ -5,19 +5,30 @@ The Machine class manages the collection of slots, handles the pull mechanism,
 and determines winning conditions.
 """
 
+from threading import Lock
 from turtle import Turtle
-from random import randint
-from slot import Slot
+from random import Random
+from time import perf_counter, sleep
+from slot import Slot, SlotValue, draw_slot_values
+from rng import get_random_backend
 from money import Money
 from messages import Instructions, Messages
 from logger import Logger, loggable
+from progressive import ProgressiveJackpot
+from session_store import SessionStore, Checkpoint
+from game_math import Paytable, Evaluation, LOSS_OUTCOME, WIN_OUTCOME, JACKPOT_OUTCOME, row_offsets
+from events import EventBus, PullStarted, ReelsStopped, Won, JackpotWon, Lost, BalanceChanged
+from subscribers import subscribe_display, subscribe_logger
+from diagnostics import Diagnostics
+from profiles import GameConfig, ProfileWatcher, compile_config
 from config import (
     DEFAULT_SLOT_SIZE, NUMBER_OF_SLOTS, SLOT_SHAPE,
     VERTICAL_SHAPE_STRETCH, HORIZONTAL_SHAPE_STRETCH, OUTLINE_SIZE,
-    STARTING_Y_POSITION, TOP_SECONDARY_SLOT, BOTTOM_SECONDARY_SLOT,
+    STARTING_Y_POSITION, NUMBER_OF_ROWS,
     MAIN_SLOT_COLOR, SECONDARY_SLOT_COLOR, MAIN_SLOT_OUTLINE_COLOR,
     SECONDARY_SLOT_OUTLINE_COLOR, MAIN_SLOT_DISPLAY_COLOR,
     SECONDARY_SLOT_DISPLAY_COLOR, MIN_PULL_CYCLES, MAX_PULL_CYCLES,
+    SPIN_DURATION_MS, SPIN_FRAME_MS, SPIN_REEL_STAGGER_MS,
     FRAME_COLOR, FRAME_PADDING_FACTOR, FRAME_PEN_SIZE
 )
 
@@ -34,12 +45,23 @@ class Machine:
         instructions (Instructions): The instructions display object.
         messages (Messages): The messages display object.
         main_slots (list[Slot]): The list of main slot objects.
-        top_secondary_slots (list[Slot]): The list of top secondary slot objects.
-        bottom_secondary_slots (list[Slot]): The list of bottom secondary slot objects.
+        secondary_slots (dict[int, list[Slot]]): The secondary slot objects of every row by its offset
+            from the main row, positive above it.
+        game_config (GameConfig): The compiled game values in use, replaced between pulls on a reload.
+        paytable (Paytable): The paytable deciding the winning ways and prizes of a spin.
         processing (bool): Indicates whether the machine is currently processing a pull.
+        jackpot_pool (ProgressiveJackpot | None): The shared progressive jackpot pool, or None for a fixed jackpot.
+        session_store (SessionStore | None): The store checkpointing every pull, or None.
+        pulls (int): The number of pulls played in the session.
+        events (EventBus): The bus publishing the events of every pull.
+        diagnostics (Diagnostics | None): The frame timing and latency diagnostics, or None.
+        profile_watcher (ProfileWatcher | None): The config profile reloaded when it changes, or None.
     """
 
-    def __init__(self, money: Money, instructions: Instructions, messages: Messages, logger: Logger) -> None:
+    def __init__(self, money: Money, instructions: Instructions, messages: Messages, logger: Logger,
+                 jackpot_pool: ProgressiveJackpot | None = None, session_store: SessionStore | None = None,
+                 event_bus: EventBus | None = None, diagnostics: Diagnostics | None = None,
+                 profile_watcher: ProfileWatcher | None = None) -> None:
         """
         Initialize a new Machine instance.
 
@@ -47,16 +69,43 @@ class Machine:
             money (Money): The money management object for this machine.
             instructions (Instructions): The instructions display object.
             messages (Messages): The messages display object.
+            jackpot_pool (ProgressiveJackpot | None): The shared progressive jackpot pool, or None for a fixed jackpot.
+            session_store (SessionStore | None): The store checkpointing every pull, or None.
+                The session saved in the store is restored.
+            event_bus (EventBus | None): The bus publishing the events of every pull, or None to create one
+                with the money, messages and instructions displays and the logger subscribed.
+            diagnostics (Diagnostics | None): The frame timing and latency diagnostics, or None.
+                They are subscribed to the event bus after the displays.
+            profile_watcher (ProfileWatcher | None): The config profile to play with and to reload when it
+                changes, or None to play with the values of config.py.
         """
         self.money: Money = money
         self.instructions: Instructions = instructions
         self.messages: Messages = messages
         self.logger: Logger = logger
         self.main_slots: list[Slot] = []
-        self.top_secondary_slots: list[Slot] = []
-        self.bottom_secondary_slots: list[Slot] = []
-        self.processing: bool = False
+        self.secondary_slots: dict[int, list[Slot]] = {}
+        self.profile_watcher: ProfileWatcher | None = profile_watcher
+        self.game_config: GameConfig = (profile_watcher.game_config if profile_watcher is not None
+                                        else compile_config())
+        self.paytable: Paytable = self.game_config.paytable
+        self._pull_lock: Lock = Lock()
+        self.jackpot_pool: ProgressiveJackpot | None = jackpot_pool
+        self.session_store: SessionStore | None = session_store
+        self.pulls: int = 0
+        self._animation_random: Random = Random()
+        if event_bus is None:
+            event_bus = EventBus()
+            subscribe_display(event_bus, money, instructions, messages)
+            subscribe_logger(event_bus, logger)
+        self.events: EventBus = event_bus
+        self.diagnostics: Diagnostics | None = diagnostics
+        if diagnostics is not None:
+            diagnostics.subscribe(event_bus)
         self.create_machine()
+        self.apply_config(self.game_config)
+        if session_store is not None:
+            self.restore_session(session_store)
 
     def __str__(self) -> str:
         """
@@ -77,6 +126,16 @@ class Machine:
         """
         return f"Machine(slots={len(self.main_slots)}, processing={self.processing})"
 
+    @property
+    def processing(self) -> bool:
+        """
+        Check whether the machine is currently processing a pull.
+
+        Returns:
+            bool: True while a pull is in progress.
+        """
+        return self._pull_lock.locked()
+
     @loggable(lambda self, *args, **kwargs: self.logger)
     def create_machine(self) -> None:
         """
@@ -94,30 +153,26 @@ class Machine:
         # Calculate the centered starting x position
         starting_x_position = -total_width / 2 + slot_width / 2
 
-        # Calculate the vertical positions for top and bottom slots
-        top_y_position = STARTING_Y_POSITION + slot_height
-        bottom_y_position = STARTING_Y_POSITION - slot_height
-
         # Calculate frame dimensions
-        total_height = slot_height * 3  # For top, main, and bottom slots
+        total_height = slot_height * NUMBER_OF_ROWS  # For the main row and the secondary rows
         frame_padding = slot_width * FRAME_PADDING_FACTOR
         frame_width = total_width + frame_padding * 2
         frame_height = total_height + frame_padding * 2
 
-        # Calculate the centered frame position
+        # Calculate the frame position around the rows, which sit half a row higher when their number is even
         frame_x = -frame_width / 2
-        frame_y = STARTING_Y_POSITION - total_height / 2 - frame_padding
+        frame_y = STARTING_Y_POSITION + (row_offsets(NUMBER_OF_ROWS)[-1] - 0.5) * slot_height - frame_padding
 
         # Create the frame
         self.create_frame(frame_x, frame_y, frame_width, frame_height)
 
         for slot in range(NUMBER_OF_SLOTS):
-            # Adding top secondary slots
-            self.add_slot(starting_x_position + slot * slot_width, top_y_position,
-                          SECONDARY_SLOT_DISPLAY_COLOR, secondary_slot=TOP_SECONDARY_SLOT)
-            # Adding bottom secondary slots
-            self.add_slot(starting_x_position + slot * slot_width, bottom_y_position,
-                          SECONDARY_SLOT_DISPLAY_COLOR, secondary_slot=BOTTOM_SECONDARY_SLOT)
+            # Adding secondary slots above and below the main slot
+            for row_offset in row_offsets(NUMBER_OF_ROWS):
+                if row_offset:
+                    self.add_slot(starting_x_position + slot * slot_width,
+                                  STARTING_Y_POSITION + row_offset * slot_height,
+                                  SECONDARY_SLOT_DISPLAY_COLOR, row_offset=row_offset)
 
         for slot in range(NUMBER_OF_SLOTS):
             # Adding main slots
@@ -151,7 +206,7 @@ class Machine:
             frame.left(90)
 
     @loggable(lambda self, *args, **kwargs: self.logger)
-    def add_slot(self, x_position: float, y_position: float, color: str, secondary_slot: str | None = None) -> None:
+    def add_slot(self, x_position: float, y_position: float, color: str, row_offset: int = 0) -> None:
         """
         Add a slot to the machine.
 
@@ -159,10 +214,10 @@ class Machine:
             x_position (float): The x-coordinate for the slot's position.
             y_position (float): The y-coordinate for the slot's position.
             color (str): The color of the slot's text.
-            secondary_slot (str | None): Indicates if this is a secondary slot and its position (top or bottom).
+            row_offset (int): The offset of the slot's row from the main row, 0 for a main slot.
         """
         self.logger.log(f"Adding a slot at ({x_position}, {y_position}) "
-                        f"with color {color} and secondary slot type {secondary_slot}")
+                        f"with color {color} and row offset {row_offset}")
         new_slot_graphics = Turtle()
         new_slot_graphics.shape(SLOT_SHAPE)
         new_slot_graphics.shapesize(VERTICAL_SHAPE_STRETCH, HORIZONTAL_SHAPE_STRETCH, OUTLINE_SIZE)
@@ -170,34 +225,146 @@ class Machine:
         new_slot_graphics.setx(x_position)
         new_slot_graphics.sety(y_position)
 
-        new_slot = Slot(x_position, y_position, color, secondary_slot)
+        new_slot = Slot(x_position, y_position, color, row_offset)
 
-        if secondary_slot == TOP_SECONDARY_SLOT:
-            new_slot_graphics.color(SECONDARY_SLOT_COLOR, SECONDARY_SLOT_OUTLINE_COLOR)
-            self.top_secondary_slots.append(new_slot)
-        elif secondary_slot == BOTTOM_SECONDARY_SLOT:
+        if row_offset:
             new_slot_graphics.color(SECONDARY_SLOT_COLOR, SECONDARY_SLOT_OUTLINE_COLOR)
-            self.bottom_secondary_slots.append(new_slot)
+            self.secondary_slots.setdefault(row_offset, []).append(new_slot)
         else:
             new_slot_graphics.color(MAIN_SLOT_COLOR, MAIN_SLOT_OUTLINE_COLOR)
             self.main_slots.append(new_slot)
 
-    @loggable(lambda self, *args, **kwargs: self.logger)
-    def update_slots(self) -> None:
+    def slot_values(self) -> list[SlotValue | None]:
         """
-        Update all machine slots.
+        Get the values of the main slots.
+
+        Returns:
+            list[SlotValue | None]: The value of each main slot.
         """
-        self.logger.log("Updating all slots.")
+        return [slot.value for slot in self.main_slots]
+
+    def reel_indices(self) -> list[int]:
+        """
+        Get the index of the value shown on each main slot.
+
+        Returns:
+            list[int]: The index of each main slot's value in the slot values.
+        """
+        symbol_indices = self.game_config.symbol_indices
+        indices: list[int] = []
         for slot in self.main_slots:
-            slot.update_slot()
+            value = slot.value
+            assert value is not None  # Only secondary slots have no value of their own
+            indices.append(symbol_indices[value])
+        return indices
 
-        for index, slot in enumerate(self.top_secondary_slots):
-            value = self.main_slots[index].value
-            slot.update_slot(secondary_slot=TOP_SECONDARY_SLOT, main_slot_value=value)
+    @loggable(lambda self, *args, **kwargs: self.logger)
+    def update_slots(self, columns: list[int] | None = None) -> None:
+        """
+        Update all machine slots, or only the slots of some columns.
 
-        for index, slot in enumerate(self.bottom_secondary_slots):
+        Args:
+            columns (list[int] | None): The indices of the columns to update, None to update all of them.
+        """
+        self.logger.log("Updating all slots." if columns is None else f"Updating slots of columns {columns}.")
+        started = perf_counter()
+        for index in range(len(self.main_slots)) if columns is None else columns:
             value = self.main_slots[index].value
-            slot.update_slot(secondary_slot=BOTTOM_SECONDARY_SLOT, main_slot_value=value)
+            self.main_slots[index].update_slot()
+            for row_offset, slots in self.secondary_slots.items():
+                slots[index].update_slot(row_offset, main_slot_value=value)
+        if self.diagnostics is not None:
+            self.diagnostics.record_frame(started, perf_counter())
+
+    def draw_spin(self) -> tuple[int, list[SlotValue]]:
+        """
+        Draw the random values of a pull from the shared random backend.
+
+        With a spin duration the reels only need their final values, and the
+        values shown while spinning are drawn separately for the animation.
+        Otherwise a random number of cycles is drawn with the values of every
+        cycle. Restoring a session repeats exactly these draws.
+
+        Returns:
+            tuple[int, list[SlotValue]]: The number of cycles, 0 with a spin duration, and the drawn values
+                in the order the slots show them.
+        """
+        number_of_slots = len(self.main_slots)
+        values = self.main_slots[0].values
+        if SPIN_DURATION_MS:
+            return 0, draw_slot_values(values, number_of_slots)
+        pull_cycles = get_random_backend().randint(MIN_PULL_CYCLES, MAX_PULL_CYCLES)
+        return pull_cycles, draw_slot_values(values, pull_cycles * number_of_slots)
+
+    def spin_cycles(self, pull_cycles: int, spin_values: list[SlotValue]) -> None:
+        """
+        Show the drawn values of every cycle, one redraw per cycle.
+
+        Args:
+            pull_cycles (int): The number of cycles.
+            spin_values (list[SlotValue]): The values of all cycles in the order the slots show them.
+        """
+        number_of_slots = len(self.main_slots)
+        for cycle in range(pull_cycles):
+            cycle_values = spin_values[cycle * number_of_slots:(cycle + 1) * number_of_slots]
+            for slot, value in zip(self.main_slots, cycle_values):
+                slot.value = value
+            self.update_slots()
+            self.logger.log(f"Pull cycle {cycle + 1} completed.")
+
+    def spin_for_duration(self, final_values: list[SlotValue]) -> tuple[int, int]:
+        """
+        Animate the spin for the configured wall-clock duration, stopping the reels one after another.
+
+        Frames are scheduled every SPIN_FRAME_MS. When drawing a frame takes
+        longer than that, the frames whose time has passed are skipped, so the
+        spin ends on time on slow hosts instead of taking longer.
+
+        Args:
+            final_values (list[SlotValue]): The value each main slot stops on.
+
+        Returns:
+            tuple[int, int]: The number of drawn frames and the number of skipped frames.
+        """
+        number_of_slots = len(self.main_slots)
+        values = self.main_slots[0].values
+        duration = SPIN_DURATION_MS / 1000
+        frame_time = SPIN_FRAME_MS / 1000
+        stop_times = [duration - (number_of_slots - 1 - index) * SPIN_REEL_STAGGER_MS / 1000
+                      for index in range(number_of_slots)]
+
+        started = perf_counter()
+        frame = 0
+        drawn = 0
+        skipped = 0
+        stopped = 0
+        while (elapsed := perf_counter() - started) < duration:
+            # Skip the frames whose time has already passed
+            due_frame = int(elapsed / frame_time)
+            skipped += max(0, due_frame - frame)
+            frame = max(frame, due_frame)
+
+            moving = [index for index in range(stopped, number_of_slots) if elapsed < stop_times[index]]
+            newly_stopped = list(range(stopped, number_of_slots - len(moving)))
+            for index in newly_stopped:
+                self.main_slots[index].value = final_values[index]
+            for index in moving:
+                self.main_slots[index].value = values[self._animation_random.randrange(len(values))]
+            self.update_slots(newly_stopped + moving)
+            stopped += len(newly_stopped)
+            drawn += 1
+
+            frame += 1
+            delay = frame * frame_time - (perf_counter() - started)
+            if delay > 0:
+                sleep(delay)
+
+        for slot, value in zip(self.main_slots, final_values):
+            slot.value = value
+        self.update_slots(list(range(stopped, number_of_slots)))
+        drawn += 1
+        self.logger.log(f"Spin finished after {drawn} drawn frames, {skipped} skipped.")
+        return drawn, skipped
 
     @loggable(lambda self, *args, **kwargs: self.logger)
     def pull(self) -> None:
@@ -205,93 +372,194 @@ class Machine:
         Simulate a pull of the slot machine.
 
         This method randomizes the slots, checks for winning conditions,
-        and updates the player's money accordingly.
+        updates the player's money and publishes the events of the pull,
+        which the displays and the logger are subscribed to.
         """
-        self.logger.log("Starting a pull sequence.")
-        if self.money.jackpot_enabled:
-            self.logger.log("Jackpot is enabled.")
-        else:
-            self.logger.log("Jackpot is disabled.")
-        if self.processing:
+        # Checking and taking the lock is one atomic step, so two threads can never both start a pull
+        if not self._pull_lock.acquire(blocking=False):
             self.logger.log("Pull attempted while machine is still processing.")
             return
 
-        self.processing = True
+        self.logger.begin_pull()
+        pull_cycles = 0
+        drawn_frames = 0
+        outcome = "incomplete"
+        amount = 0
 
         try:
+            self.logger.log("Starting a pull sequence.")
+            if self.money.jackpot_enabled:
+                self.logger.log("Jackpot is enabled.")
+            else:
+                self.logger.log("Jackpot is disabled.")
+
             pull_cost = self.money.pull_cost
             self.money.decrease_money(pull_cost)
+            if self.jackpot_pool is not None:
+                self.jackpot_pool.contribute(pull_cost)
+
+            pull_number = self.pulls + 1
+            pull_cycles, spin_values = self.draw_spin()
+            self.events.publish(PullStarted(pull_number, pull_cycles, pull_cost, self.money.money))
 
-            pull_cycles = randint(MIN_PULL_CYCLES, MAX_PULL_CYCLES)
-            self.logger.log(f"Starting pull sequence with {pull_cycles} cycles.")
-            self.instructions.hide_instructions()
-            self.messages.remove_messages()
-
-            for cycle in range(pull_cycles):
-                for slot in self.main_slots:
-                    slot.randomize_slot()
-                self.update_slots()
-                self.logger.log(f"Pull cycle {cycle + 1} completed.")
-
-            if self.check_winning():
-                if self.money.jackpot_enabled:
-                    if self.check_jackpot():
-                        jackpot_prize = self.money.win_prize * self.money.jackpot_multiplier
-                        self.money.increase_money(jackpot_prize)
-                        self.messages.player_won_jackpot_message(jackpot_prize - pull_cost)
-                        self.logger.log(f"Player won a jackpot! Prize: ${jackpot_prize - pull_cost}")
-                    else:
-                        win_prize = self.money.win_prize
-                        self.money.increase_money(win_prize)
-                        self.messages.player_won_message(win_prize - pull_cost)
-                        self.logger.log(f"Player won! Prize: ${win_prize - pull_cost}")
+            skipped_frames = 0
+            if SPIN_DURATION_MS:
+                drawn_frames, skipped_frames = self.spin_for_duration(spin_values)
+            else:
+                self.spin_cycles(pull_cycles, spin_values)
+                drawn_frames = pull_cycles
+            if self.diagnostics is not None:
+                self.diagnostics.record_skipped_frames(skipped_frames)
+            final_values = tuple(self.slot_values())
+            self.events.publish(ReelsStopped(pull_number, final_values))
+            self.logger.mark_phase("spin")
+
+            evaluation = self.evaluate()
+            self.logger.mark_phase("evaluate")
+
+            payout = evaluation.ways * self.paytable.win_prize
+            if evaluation.jackpot_ways:
+                if self.jackpot_pool is not None:
+                    payout += self.jackpot_pool.award()
                 else:
-                    win_prize = self.money.win_prize
-                    self.money.increase_money(win_prize)
-                    self.messages.player_won_message(win_prize - pull_cost)
-                    self.logger.log(f"Player won! Prize: ${win_prize - pull_cost}")
+                    payout += evaluation.jackpot_ways * self.paytable.jackpot_prize
+            outcome = evaluation.outcome
+            amount = payout - pull_cost if payout else pull_cost
+            self.money.increase_money(payout)
+
+            self.pulls += 1
+            self.save_pull()
+            self.logger.mark_phase("payout")
+
+            balance = self.money.money
+            self.events.publish(BalanceChanged(balance, payout - pull_cost))
+            if outcome == JACKPOT_OUTCOME:
+                self.events.publish(JackpotWon(pull_number, final_values, amount, balance))
+            elif outcome == WIN_OUTCOME:
+                self.events.publish(Won(pull_number, final_values, amount, balance))
             else:
-                self.messages.player_lost_message(pull_cost)
-                self.logger.log(f"Player lost. Cost: ${pull_cost}")
-
-            self.money.update_money()
-            self.instructions.show_instructions()
+                self.events.publish(Lost(pull_number, final_values, amount, balance))
+            self.logger.mark_phase("display")
 
         finally:
-            self.processing = False
             self.logger.log("Pull sequence completed.")
+            self.logger.end_pull(pull_cycles, drawn_frames, self.slot_values(), outcome, amount, self.money.money)
+            self._pull_lock.release()
 
-    @loggable(lambda self, *args, **kwargs: self.logger)
-    def check_winning(self) -> bool:
+    def apply_config(self, game_config: GameConfig) -> None:
         """
-        Check if the current slot configuration is a winning one.
+        Play with new game values, keeping the balance, the pull count and the position of every reel.
+
+        The slots and the money display are redrawn by the caller.
+
+        Args:
+            game_config (GameConfig): The compiled game values.
+        """
+        self.game_config = game_config
+        self.paytable = game_config.paytable
+        self.money.apply_config(game_config)
+        for slot in self.main_slots:
+            slot.set_values(game_config.slot_values)
+        for slots in self.secondary_slots.values():
+            for slot in slots:
+                slot.set_values(game_config.slot_values)
+
+    def reload_profile(self) -> bool:
+        """
+        Apply the config profile if it changed, unless a pull is in progress.
+
+        The profile is compiled before anything is changed and applied while no
+        pull can start, so every pull is played entirely with one configuration.
+        An invalid profile is logged and the current configuration stays in use.
 
         Returns:
-            bool: True if all slots have the same value, False otherwise.
+            bool: True if a new configuration was applied, False otherwise.
         """
-        self.logger.log("Checking for a winning condition.")
-        first_slot = self.main_slots[0]
-        for slot in self.main_slots[1:]:
-            if slot.value != first_slot.value:
-                self.logger.log(f"No match found. Slot values: {[slot.value for slot in self.main_slots]}")
+        if self.profile_watcher is None or not self._pull_lock.acquire(blocking=False):
+            return False
+        try:
+            try:
+                game_config = self.profile_watcher.poll()
+            except (OSError, ValueError) as error:
+                self.logger.log(f"Config profile {self.profile_watcher.profile_path} was not applied: {error}")
                 return False
-        self.logger.log(f"All slots matched! Slot values: {[slot.value for slot in self.main_slots]}")
-        return True
+            if game_config is None:
+                return False
+            self.apply_config(game_config)
+            self.update_slots()
+            self.money.update_money()
+            self.logger.log(f"Applied config profile {game_config.source} with RTP {game_config.rtp:.2f}%.")
+            return True
+        finally:
+            self._pull_lock.release()
+
+    def save_pull(self) -> None:
+        """
+        Record the finished pull in the session store, taking a snapshot when one is due.
+        """
+        if self.session_store is None:
+            return
+        reels = self.reel_indices()
+        if self.session_store.append(self.pulls, self.money.money, reels):
+            self.session_store.snapshot(Checkpoint(self.pulls, self.money.money, tuple(reels),
+                                                   get_random_backend().getstate()))
 
     @loggable(lambda self, *args, **kwargs: self.logger)
-    def check_jackpot(self) -> bool:
+    def restore_session(self, session_store: SessionStore) -> None:
         """
-        Check if the current slot configuration is a jackpot winning one.
+        Restore the balance, slot values and random state saved in a session store.
 
-        Returns:
-            bool: True if all slots have the same value and the value is also a jackpot value, False otherwise.
+        The random state is restored from the snapshot and then advanced by
+        repeating the random draws of every pull journaled after it. A secure
+        random backend has no state to restore.
+
+        Args:
+            session_store (SessionStore): The store to restore from.
         """
-        first_slot_value = self.main_slots[0].value
-        jackpot_value = (self.money.jackpot_winning_symbol
-                         if self.money.symbols_used
-                         else self.money.jackpot_winning_number)
+        recovery = session_store.recover()
+        random_backend = get_random_backend()
+        if recovery.snapshot is not None and recovery.snapshot.rng_state is not None:
+            random_backend.setstate(recovery.snapshot.rng_state)
+            for _ in range(recovery.pulls_since_snapshot):
+                self.draw_spin()
+
+        if recovery.latest is not None:
+            self.pulls = recovery.latest.pull_number
+            self.money.money = recovery.latest.balance
+            for slot, index in zip(self.main_slots, recovery.latest.reels):
+                slot.value = slot.values[index]
+            self.logger.log(f"Restored session after pull {self.pulls} with balance ${self.money.money}.")
+
+        if recovery.snapshot is None:
+            reels = tuple(self.reel_indices())
+            session_store.snapshot(Checkpoint(self.pulls, self.money.money, reels, random_backend.getstate()))
+
+    @loggable(lambda self, *args, **kwargs: self.logger)
+    def evaluate(self) -> Evaluation:
+        """
+        Find the winning ways of the current slot configuration.
+
+        In line mode all main slots must have the same value. In ways mode a
+        value wins once for every way through the rows showing it on all reels.
 
-        is_jackpot = first_slot_value == jackpot_value
-        self.logger.log(f"Jackpot {"matched" if is_jackpot else "not matched"}. "
-                        f"Jackpot value: {jackpot_value}")
-        return is_jackpot
+        Returns:
+            Evaluation: The winning ways, with the ways of the jackpot value counted separately.
+        """
+        self.logger.log("Checking for a winning condition.")
+        game_config = self.game_config
+        jackpot_value = game_config.jackpot_value
+        evaluation = self.paytable.evaluate(self.reel_indices(), game_config.jackpot_index)
+
+        if evaluation.outcome == LOSS_OUTCOME:
+            self.logger.log_event("winning_checked", f"No match found. Slot values: {self.slot_values()}",
+                                  self.slot_values(), False, function_name="evaluate")
+            return evaluation
+        self.logger.log_event("winning_checked", f"Found {evaluation.ways + evaluation.jackpot_ways} winning ways! "
+                                                 f"Slot values: {self.slot_values()}",
+                              self.slot_values(), True, function_name="evaluate")
+        if self.money.jackpot_enabled:
+            is_jackpot = evaluation.outcome == JACKPOT_OUTCOME
+            self.logger.log_event("jackpot_checked", f"Jackpot {'matched' if is_jackpot else 'not matched'}. "
+                                                     f"Jackpot value: {jackpot_value}",
+                                  jackpot_value, is_jackpot, function_name="evaluate")
+        return evaluation
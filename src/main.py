@@ -14,10 +14,20 @@ from machine import Machine
 from messages import Instructions, Messages
 from money import Money
 from logger import Logger
+from diagnostics import Diagnostics
+from events import EventBus
+from session_stats import SessionStats
+from subscribers import subscribe_display, subscribe_logger
+from progressive import ProgressiveJackpot
+from session_store import SessionStore
+from profiles import ProfileWatcher
+from warehouse import Warehouse
 from validation import validate_configurations
 from config import (
     SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, SCREEN_BG_COLOR,
-    KEY_TO_PULL, KEY_TO_EXIT, ICON_FILE_PNG, ICON_FILE_ICO
+    KEY_TO_PULL, KEY_TO_EXIT, ICON_FILE_PNG, ICON_FILE_ICO,
+    PROGRESSIVE_JACKPOT_ENABLED, SESSION_STORE_ENABLED, NUMBER_OF_SLOTS, DIAGNOSTICS_ENABLED,
+    SESSION_STATS_ENABLED, CONFIG_PROFILE, CONFIG_PROFILE_POLL_MS, WAREHOUSE_ENABLED
 )
 
 
@@ -43,16 +53,26 @@ class ScreenProtocol(Protocol):
 
     def update(self) -> None: ...
 
+    def ontimer(self, fun: Callable[[], None], t: int) -> None: ...
+
     def getcanvas(self) -> Any: ...
 
 
-def exit_program(screen: ScreenProtocol) -> NoReturn:
+def exit_program(screen: ScreenProtocol, machine: Machine) -> NoReturn:
     """
     Exit the program.
 
     Args:
         screen (ScreenType): The turtle screen to close.
+        machine (Machine): The slot machine object.
     """
+    machine.events.close()
+    if machine.diagnostics is not None:
+        trace_file = machine.diagnostics.write_trace()
+        if trace_file is not None:
+            machine.logger.log(f"Diagnostics trace written to {trace_file}.")
+    if machine.session_store is not None:
+        machine.session_store.close()
     screen.bye()
     sys.exit()
 
@@ -65,9 +85,33 @@ def play(screen: ScreenProtocol, machine: Machine) -> None:
         screen (ScreenType): The turtle screen for the game.
         machine (Machine): The slot machine object.
     """
+    def pull() -> None:
+        # Latency is measured from the key press, presses ignored during a pull are not timed
+        if machine.diagnostics is not None and not machine.processing:
+            machine.diagnostics.input_received()
+        machine.pull()
+
     screen.listen()
-    screen.onkey(machine.pull, KEY_TO_PULL)
-    screen.onkey(lambda: exit_program(screen), KEY_TO_EXIT)
+    screen.onkey(pull, KEY_TO_PULL)
+    screen.onkey(lambda: exit_program(screen, machine), KEY_TO_EXIT)
+
+
+def watch_profile(screen: ScreenProtocol, machine: Machine) -> None:
+    """
+    Check the config profile for changes periodically and apply them between pulls.
+
+    Args:
+        screen (ScreenType): The turtle screen for the game.
+        machine (Machine): The slot machine object.
+    """
+    def poll() -> None:
+        # An unexpected error must not stop the checks for the rest of the session
+        try:
+            machine.reload_profile()
+        finally:
+            screen.ontimer(poll, CONFIG_PROFILE_POLL_MS)
+
+    screen.ontimer(poll, CONFIG_PROFILE_POLL_MS)
 
 
 def set_icon(screen: ScreenProtocol):
@@ -100,7 +144,8 @@ def main() -> None:
     """
     try:
         validate_configurations()
-    except ValueError as e:
+        profile_watcher = ProfileWatcher(CONFIG_PROFILE) if CONFIG_PROFILE is not None else None
+    except (OSError, ValueError) as e:
         print(f"Configuration Error:\n{e}")
         sys.exit(1)  # Terminate the program immediately
 
@@ -117,7 +162,24 @@ def main() -> None:
     instructions = Instructions()
     messages = Messages()
     logger = Logger()
-    machine = Machine(money, instructions, messages, logger)
+    jackpot_pool = ProgressiveJackpot() if PROGRESSIVE_JACKPOT_ENABLED and money.jackpot_enabled else None
+    session_store = SessionStore(NUMBER_OF_SLOTS) if SESSION_STORE_ENABLED else None
+    event_bus = EventBus()
+    subscribe_display(event_bus, money, instructions, messages)
+    subscribe_logger(event_bus, logger)
+    if SESSION_STATS_ENABLED:
+        session_stats = SessionStats()
+        session_stats.subscribe(event_bus)
+        session_stats.show_stats()
+    diagnostics = Diagnostics() if DIAGNOSTICS_ENABLED else None
+    machine = Machine(money, instructions, messages, logger, jackpot_pool, session_store, event_bus, diagnostics,
+                      profile_watcher)
+    if WAREHOUSE_ENABLED:
+        # The warehouse writes the remaining pulls at exit
+        Warehouse().subscribe(event_bus, lambda: machine.paytable)
+    money.update_money()
+    if diagnostics is not None:
+        diagnostics.show()
     screen.update()
 
     screen.tracer(1)
@@ -125,6 +187,8 @@ def main() -> None:
 
     logger.log("Slot Machine game is starting...")
     play(screen, machine)
+    if profile_watcher is not None:
+        watch_profile(screen, machine)
 
     mainloop()
 
@@ -0,0 +1,408 @@
+"""
+This module defines compact model classes for hosting many machines in one process.
+
+The graphical classes keep their state in Turtle instances, each carrying a pen,
+a shape, an undo buffer and canvas items, so a single machine costs dozens of
+Turtles. The classes here keep only the game state:
+
+- Wallet: the player's money.
+- SharedWallet: money shared by machines played on different threads.
+- Reel: the index of the value shown on a main slot.
+- MachineModel: the reels, wallet and pull count of one machine.
+- MachineBank: the state of many machines packed into typed arrays, for parking
+  machines that are not being played.
+
+All classes use "__slots__", so their instances have no per-instance dictionary.
+
+Run this module directly to measure the memory used per machine.
+"""
+
+import argparse
+import tracemalloc
+from array import array
+from collections.abc import Callable, Sequence
+from random import Random
+from threading import Lock
+from typing import Any
+from slot import SlotValue, get_slot_values
+from config import DEFAULT_MONEY, NUMBER_OF_SLOTS, MODELS_BENCHMARK_MACHINES
+
+
+class Wallet:
+    """
+    Represents the player's money without any display.
+
+    Attributes:
+        money (int): The current amount of money the player has.
+    """
+
+    __slots__ = ("money",)
+
+    def __init__(self, money: int = DEFAULT_MONEY) -> None:
+        """
+        Initialize a new Wallet instance.
+
+        Args:
+            money (int): The player's starting money.
+        """
+        self.money: int = money
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the Wallet object.
+
+        Returns:
+            str: A string representation of the Wallet object.
+        """
+        return f"Wallet(money={self.money})"
+
+    def increase_money(self, amount: int) -> int:
+        """
+        Increase the player's money.
+
+        Args:
+            amount (int): The amount to add.
+
+        Returns:
+            int: The player's money after the increase.
+        """
+        self.money += amount
+        return self.money
+
+    def decrease_money(self, amount: int) -> int:
+        """
+        Decrease the player's money.
+
+        Args:
+            amount (int): The amount to subtract.
+
+        Returns:
+            int: The player's money after the decrease.
+        """
+        self.money -= amount
+        return self.money
+
+
+class SharedWallet(Wallet):
+    """
+    Represents money shared by several machines played on different threads, such as one bank of many terminals.
+
+    Every change is a read-modify-write made under a lock, so no concurrent
+    update is lost, and the lock is held only for that single change.
+    """
+
+    __slots__ = ("_lock",)
+
+    def __init__(self, money: int = DEFAULT_MONEY) -> None:
+        """
+        Initialize a new SharedWallet instance.
+
+        Args:
+            money (int): The starting money.
+        """
+        super().__init__(money)
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the SharedWallet object.
+
+        Returns:
+            str: A string representation of the SharedWallet object.
+        """
+        return f"SharedWallet(money={self.money})"
+
+    def increase_money(self, amount: int) -> int:
+        """
+        Increase the money atomically.
+
+        Args:
+            amount (int): The amount to add.
+
+        Returns:
+            int: The money right after this increase.
+        """
+        with self._lock:
+            self.money += amount
+            return self.money
+
+    def decrease_money(self, amount: int) -> int:
+        """
+        Decrease the money atomically.
+
+        Args:
+            amount (int): The amount to subtract.
+
+        Returns:
+            int: The money right after this decrease.
+        """
+        with self._lock:
+            self.money -= amount
+            return self.money
+
+
+class Reel:
+    """
+    Represents a main slot without any display.
+
+    Attributes:
+        values (tuple[SlotValue, ...]): The possible values, shared by all reels.
+        index (int): The index of the value currently shown.
+    """
+
+    __slots__ = ("values", "index")
+
+    def __init__(self, values: tuple[SlotValue, ...], index: int = 0) -> None:
+        """
+        Initialize a new Reel instance.
+
+        Args:
+            values (tuple[SlotValue, ...]): The possible values, shared by all reels.
+            index (int): The index of the value currently shown.
+        """
+        self.values: tuple[SlotValue, ...] = values
+        self.index: int = index
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the Reel object.
+
+        Returns:
+            str: A string representation of the Reel object.
+        """
+        return f"Reel(value={self.value})"
+
+    @property
+    def value(self) -> SlotValue:
+        """
+        Get the value currently shown.
+
+        Returns:
+            SlotValue: The value at the reel's index.
+        """
+        return self.values[self.index]
+
+
+class MachineModel:
+    """
+    Represents the game state of one machine without any display.
+
+    Attributes:
+        reels (list[Reel]): The main slots.
+        wallet (Wallet): The player's money.
+        pulls (int): The number of pulls played.
+    """
+
+    __slots__ = ("reels", "wallet", "pulls")
+
+    def __init__(self, reel_indices: Sequence[int], money: int = DEFAULT_MONEY,
+                 values: tuple[SlotValue, ...] | None = None, pulls: int = 0, wallet: Wallet | None = None) -> None:
+        """
+        Initialize a new MachineModel instance.
+
+        Args:
+            reel_indices (Sequence[int]): The index of the value shown on each main slot.
+            money (int): The player's money, ignored if a wallet is given.
+            values (tuple[SlotValue, ...] | None): The possible slot values, None for the configured ones.
+            pulls (int): The number of pulls played.
+            wallet (Wallet | None): The wallet to play from, for example one shared with other machines,
+                or None for a new one with the given money.
+        """
+        values = values if values is not None else get_slot_values()
+        self.reels: list[Reel] = [Reel(values, index) for index in reel_indices]
+        self.wallet: Wallet = wallet if wallet is not None else Wallet(money)
+        self.pulls: int = pulls
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the MachineModel object.
+
+        Returns:
+            str: A string representation of the MachineModel object.
+        """
+        return f"MachineModel(reels={self.reel_indices}, money={self.wallet.money}, pulls={self.pulls})"
+
+    @property
+    def reel_indices(self) -> list[int]:
+        """
+        Get the index of the value shown on each main slot.
+
+        Returns:
+            list[int]: The reel indices.
+        """
+        return [reel.index for reel in self.reels]
+
+    @reel_indices.setter
+    def reel_indices(self, indices: list[int] | tuple[int, ...]) -> None:
+        """
+        Set the index of the value shown on each main slot.
+
+        Args:
+            indices (list[int] | tuple[int, ...]): The new reel indices, one per reel.
+        """
+        for reel, index in zip(self.reels, indices):
+            reel.index = index
+
+    @property
+    def slot_values(self) -> tuple[SlotValue, ...]:
+        """
+        Get the value shown on each main slot.
+
+        Returns:
+            tuple[SlotValue, ...]: The values of the main slots.
+        """
+        return tuple(reel.value for reel in self.reels)
+
+
+class MachineBank:
+    """
+    Represents the game state of many machines packed into typed arrays.
+
+    Every machine takes one balance, one pull count and one reel index per
+    reel, with no object per machine. Machines are loaded into a MachineModel
+    to be played and stored back when they go idle.
+
+    Attributes:
+        number_of_reels (int): The number of reels of every machine.
+        values (tuple[SlotValue, ...]): The possible slot values, shared by all machines.
+        balances (array): The player's money of every machine.
+        pulls (array): The number of pulls played on every machine.
+        reels (array): The reel indices of all machines, one row of reels per machine.
+    """
+
+    __slots__ = ("number_of_reels", "values", "balances", "pulls", "reels")
+
+    def __init__(self, number_of_reels: int = NUMBER_OF_SLOTS, values: tuple[SlotValue, ...] | None = None) -> None:
+        """
+        Initialize an empty MachineBank instance.
+
+        Args:
+            number_of_reels (int): The number of reels of every machine.
+            values (tuple[SlotValue, ...] | None): The possible slot values, None for the configured ones.
+        """
+        self.number_of_reels: int = number_of_reels
+        self.values: tuple[SlotValue, ...] = values if values is not None else get_slot_values()
+        self.balances: array = array("q")
+        self.pulls: array = array("Q")
+        self.reels: array = array("H")
+
+    def __len__(self) -> int:
+        """
+        Get the number of machines in the bank.
+
+        Returns:
+            int: The number of machines.
+        """
+        return len(self.balances)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the MachineBank object.
+
+        Returns:
+            str: A string representation of the MachineBank object.
+        """
+        return f"MachineBank(machines={len(self)}, reels={self.number_of_reels})"
+
+    def add(self, reel_indices: list[int] | tuple[int, ...], money: int = DEFAULT_MONEY, pulls: int = 0) -> int:
+        """
+        Add a machine to the bank.
+
+        Args:
+            reel_indices (list[int] | tuple[int, ...]): The index of the value shown on each main slot.
+            money (int): The player's money.
+            pulls (int): The number of pulls played.
+
+        Returns:
+            int: The number of the new machine.
+
+        Raises:
+            ValueError: If the number of reel indices does not match the bank.
+        """
+        if len(reel_indices) != self.number_of_reels:
+            raise ValueError(f"Expected {self.number_of_reels} reel indices, got {len(reel_indices)}.")
+        self.balances.append(money)
+        self.pulls.append(pulls)
+        self.reels.extend(reel_indices)
+        return len(self.balances) - 1
+
+    def load(self, machine: int) -> MachineModel:
+        """
+        Load a machine from the bank into a model to be played.
+
+        Args:
+            machine (int): The number of the machine.
+
+        Returns:
+            MachineModel: The machine's state.
+        """
+        start = machine * self.number_of_reels
+        return MachineModel(self.reels[start:start + self.number_of_reels], self.balances[machine],
+                            self.values, self.pulls[machine])
+
+    def store(self, machine: int, model: MachineModel) -> None:
+        """
+        Store a played model back into the bank.
+
+        Args:
+            machine (int): The number of the machine.
+            model (MachineModel): The machine's state.
+        """
+        start = machine * self.number_of_reels
+        self.reels[start:start + self.number_of_reels] = array("H", model.reel_indices)
+        self.balances[machine] = model.wallet.money
+        self.pulls[machine] = model.pulls
+
+
+def measure_memory(create: Callable[[], Any], count: int) -> float:
+    """
+    Measure the memory allocated per object while creating many objects.
+
+    Args:
+        create (Callable[[], Any]): Creates one object.
+        count (int): The number of objects to create.
+
+    Returns:
+        float: The allocated bytes per object, as traced by "tracemalloc".
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [create() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+    return allocated / count
+
+
+def main() -> None:
+    """
+    Measure and print the memory used per machine by each way of hosting machines.
+    """
+    parser = argparse.ArgumentParser(description="Memory used per machine by the headless models.")
+    parser.add_argument("--machines", type=int, default=MODELS_BENCHMARK_MACHINES, help="Number of machines.")
+    arguments = parser.parse_args()
+
+    # Imported here so the models do not depend on the engine
+    from engine import Engine
+    from rng import create_random_backend
+
+    count = arguments.machines
+    rng = create_random_backend(source=Random(0))
+    reel_indices = [0] * NUMBER_OF_SLOTS
+    bank = MachineBank()
+
+    results = {
+        "MachineModel": measure_memory(lambda: MachineModel(reel_indices), count),
+        "Engine (shared random backend)": measure_memory(lambda: Engine(rng=rng), count),
+        "Engine (own random backend)": measure_memory(Engine, count),
+        "MachineBank": measure_memory(lambda: bank.add(reel_indices), count)
+    }
+
+    print(f"Bytes per machine for {count} machines:")
+    for name, bytes_per_machine in results.items():
+        print(f"{name:<32} {bytes_per_machine:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
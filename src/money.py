@@ -6,8 +6,12 @@ of the player's current money, and handles operations like increasing and
 decreasing the money amount.
 """
 
+from threading import Lock
 from turtle import Turtle
 from slot import get_slot_values
+from game_math import Paytable, WAYS_WIN_MODE
+from analytics_cache import get_analytics_cache
+from profiles import GameConfig
 from config import (
     MONEY_ALIGNMENT, MONEY_FONT, DEFAULT_MONEY_COLOR, LOW_MONEY_COLOR,
     MONEY_X_POSITION, MONEY_Y_POSITION, DEFAULT_MONEY, WIN_PRIZE, PULL_COST,
@@ -16,7 +20,7 @@ from config import (
     PULL_MESSAGES_X_POSITION, PULL_MESSAGES_Y_POSITION, JACKPOT_ENABLED,
     JACKPOT_WINNING_SYMBOL, JACKPOT_WINNING_NUMBER, JACKPOT_PRIZE_MULTIPLIER,
     JACKPOT_X_POSITION, JACKPOT_Y_POSITION, NUMBER_OF_SLOTS,
-    RTP_ALIGNMENT, RTP_X_POSITION, RTP_Y_POSITION
+    RTP_ALIGNMENT, RTP_X_POSITION, RTP_Y_POSITION, WIN_MODE
 )
 
 
@@ -36,6 +40,8 @@ class Money(Turtle):
         _jackpot_multiplier (int): Number by which the prize would be multiplied if jackpot is hit.
         _jackpot_winning_symbol (str): Jackpot winning symbol if slots are using symbols.
         _jackpot_winning_number (int): Jackpot winning number if slots are using numbers.
+        _money_lock (Lock): The lock making every change of the money atomic across threads.
+        _game_config (GameConfig | None): The compiled game values applied last, or None for the values of config.py.
     """
 
     def __init__(self) -> None:
@@ -44,6 +50,7 @@ class Money(Turtle):
         """
         super().__init__()
         self._money: int = DEFAULT_MONEY
+        self._money_lock: Lock = Lock()
         self._win_prize: int = WIN_PRIZE
         self._pull_cost: int = PULL_COST
         self._symbols_used: bool = USE_SYMBOLS
@@ -51,6 +58,7 @@ class Money(Turtle):
         self._jackpot_multiplier: int = JACKPOT_PRIZE_MULTIPLIER
         self._jackpot_winning_symbol: str = JACKPOT_WINNING_SYMBOL
         self._jackpot_winning_number: int = JACKPOT_WINNING_NUMBER
+        self._game_config: GameConfig | None = None
         self.color(DEFAULT_MONEY_COLOR)
         self.penup()
         self.speed(0)
@@ -93,7 +101,8 @@ class Money(Turtle):
         Args:
             new_amount (int): The new amount of money.
         """
-        self._money = new_amount
+        with self._money_lock:
+            self._money = new_amount
 
     @property
     def win_prize(self) -> int:
@@ -227,6 +236,9 @@ class Money(Turtle):
         Returns:
             float: The RTP as a percentage.
         """
+        if WIN_MODE == WAYS_WIN_MODE:
+            return Paytable(self.pull_cost, self.win_prize, self.jackpot_enabled, self.jackpot_multiplier).rtp()
+
         if self.jackpot_enabled:
             regular_win_chance = self.calculate_regular_win_chance()
             jackpot_chance = self.calculate_jackpot_chance()
@@ -242,6 +254,22 @@ class Money(Turtle):
 
         return rtp
 
+    def apply_config(self, game_config: GameConfig) -> None:
+        """
+        Use new game values, keeping the player's money.
+
+        Args:
+            game_config (GameConfig): The compiled game values.
+        """
+        self._win_prize = game_config.win_prize
+        self._pull_cost = game_config.pull_cost
+        self._symbols_used = game_config.use_symbols
+        self._jackpot_enabled = game_config.jackpot_enabled
+        self._jackpot_multiplier = game_config.jackpot_multiplier
+        self._jackpot_winning_symbol = game_config.jackpot_winning_symbol
+        self._jackpot_winning_number = game_config.jackpot_winning_number
+        self._game_config = game_config
+
     def increase_money(self, amount: int) -> None:
         """
         Increase the player's money by the specified amount.
@@ -249,7 +277,8 @@ class Money(Turtle):
         Args:
             amount (int): The amount to increase the money by.
         """
-        self.money += amount
+        with self._money_lock:
+            self._money += amount
 
     def decrease_money(self, amount: int) -> None:
         """
@@ -258,7 +287,8 @@ class Money(Turtle):
         Args:
             amount (int): The amount to decrease the money by.
         """
-        self.money -= amount
+        with self._money_lock:
+            self._money -= amount
 
     def update_money(self) -> None:
         """
@@ -329,7 +359,15 @@ class Money(Turtle):
     def show_rtp(self):
         """
         Display the current Return To Player (RPT) percentage.
+
+        The RTP is precomputed with the applied game values, or read from the analytics
+        cache, so it is computed only once per configuration.
         """
+        if self._game_config is not None:
+            rtp = self._game_config.rtp
+        else:
+            paytable = Paytable(self.pull_cost, self.win_prize, self.jackpot_enabled, self.jackpot_multiplier)
+            rtp = get_analytics_cache().value("rtp", paytable, self.calculate_rtp)
         self.goto(RTP_X_POSITION, RTP_Y_POSITION)
-        self.write(f"RTP:\n{round(self.calculate_rtp(), 2)}%",
+        self.write(f"RTP:\n{round(rtp, 2)}%",
                    align=RTP_ALIGNMENT, font=MONEY_MESSAGES_FONT)
@@ -0,0 +1,214 @@
+"""
+This module provides a paytable optimizer for the Slot Machine game.
+
+It searches over win prizes, jackpot multipliers, pull costs, numbers of slot
+values and numbers of slots for configurations that come closest to a target
+RTP and hit frequency. Candidates are scored with the closed-form game math,
+evaluated in parallel batches, checked against the same rules as
+"validate_configurations" and reported as a ranked list.
+
+Slots pick every value with the same probability, so there are no per-symbol
+reel weights to search over.
+
+Run this module directly to search around the values in config.py.
+"""
+
+import argparse
+import heapq
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, asdict
+from itertools import islice, product
+from typing import Iterable, Iterator
+from game_math import Paytable
+from slot import get_slot_values
+from validation import validate_paytable
+from config import (
+    NUMBER_OF_SLOTS, PULL_COST, WIN_PRIZE, JACKPOT_ENABLED,
+    JACKPOT_PRIZE_MULTIPLIER, OPTIMIZER_BATCH_SIZE, OPTIMIZER_RESULTS
+)
+
+# A candidate is (win_prize, jackpot_multiplier, pull_cost, number_of_values, number_of_slots)
+Candidate = tuple[int, int, int, int, int]
+
+
+@dataclass(frozen=True, order=True)
+class ScoredConfiguration:
+    """
+    Represents a valid configuration found by the optimizer.
+
+    Configurations are ordered by score, so a lower score ranks higher.
+
+    Attributes:
+        score (float): The relative distance from the targets, lower is better.
+        rtp (float): The RTP of the configuration as a percentage.
+        hit_frequency (float): The probability that a pull pays anything.
+        win_prize (int): The WIN_PRIZE value.
+        jackpot_multiplier (int): The JACKPOT_PRIZE_MULTIPLIER value.
+        pull_cost (int): The PULL_COST value.
+        number_of_values (int): The number of slot symbols or numbers.
+        number_of_slots (int): The NUMBER_OF_SLOTS value.
+    """
+    score: float
+    rtp: float
+    hit_frequency: float
+    win_prize: int
+    jackpot_multiplier: int
+    pull_cost: int
+    number_of_values: int
+    number_of_slots: int
+
+
+def score_batch(batch: list[Candidate], target_rtp: float, target_hit_frequency: float,
+                jackpot_enabled: bool, results: int) -> list[ScoredConfiguration]:
+    """
+    Score a batch of candidates and keep the best valid ones.
+
+    Args:
+        batch (list[Candidate]): The candidates to score.
+        target_rtp (float): The target RTP as a percentage.
+        target_hit_frequency (float): The target probability that a pull pays anything.
+        jackpot_enabled (bool): Flag signaling if jackpot is enabled or disabled.
+        results (int): The number of best configurations to keep.
+
+    Returns:
+        list[ScoredConfiguration]: The best valid configurations of the batch, best first.
+    """
+    scored: list[ScoredConfiguration] = []
+    for win_prize, jackpot_multiplier, pull_cost, number_of_values, number_of_slots in batch:
+        if validate_paytable(number_of_slots, pull_cost, win_prize, number_of_values, jackpot_multiplier):
+            continue
+
+        paytable = Paytable(pull_cost, win_prize, jackpot_enabled, jackpot_multiplier,
+                            number_of_values, number_of_slots)
+        rtp = paytable.rtp()
+        hit_frequency = paytable.win_chance()
+        score = abs(rtp - target_rtp) / target_rtp + abs(hit_frequency - target_hit_frequency) / target_hit_frequency
+        scored.append(ScoredConfiguration(score, rtp, hit_frequency, win_prize, jackpot_multiplier,
+                                          pull_cost, number_of_values, number_of_slots))
+
+    return heapq.nsmallest(results, scored)
+
+
+def batches(candidates: Iterable[Candidate], batch_size: int) -> Iterator[list[Candidate]]:
+    """
+    Split candidates into lists of at most batch_size candidates.
+
+    Args:
+        candidates (Iterable[Candidate]): The candidates to split.
+        batch_size (int): The maximum number of candidates per batch.
+
+    Yields:
+        list[Candidate]: The next batch of candidates.
+    """
+    iterator = iter(candidates)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def optimize(target_rtp: float, target_hit_frequency: float, win_prizes: Iterable[int],
+             jackpot_multipliers: Iterable[int], pull_costs: Iterable[int], numbers_of_values: Iterable[int],
+             numbers_of_slots: Iterable[int], jackpot_enabled: bool = JACKPOT_ENABLED,
+             results: int = OPTIMIZER_RESULTS, batch_size: int = OPTIMIZER_BATCH_SIZE,
+             workers: int | None = None) -> list[ScoredConfiguration]:
+    """
+    Search all combinations of the given values for the configurations closest to the targets.
+
+    The combinations are generated lazily and at most two batches per worker are
+    in flight, so large ranges use constant memory.
+
+    Args:
+        target_rtp (float): The target RTP as a percentage.
+        target_hit_frequency (float): The target probability that a pull pays anything.
+        win_prizes (Iterable[int]): The WIN_PRIZE values to try.
+        jackpot_multipliers (Iterable[int]): The JACKPOT_PRIZE_MULTIPLIER values to try.
+        pull_costs (Iterable[int]): The PULL_COST values to try.
+        numbers_of_values (Iterable[int]): The numbers of slot symbols or numbers to try.
+        numbers_of_slots (Iterable[int]): The NUMBER_OF_SLOTS values to try.
+        jackpot_enabled (bool): Flag signaling if jackpot is enabled or disabled.
+        results (int): The number of configurations to return.
+        batch_size (int): The number of candidates evaluated by a worker at once.
+        workers (int | None): The number of worker processes, None to use all processors.
+
+    Returns:
+        list[ScoredConfiguration]: The best valid configurations, best first.
+    """
+    if not jackpot_enabled:
+        # The multiplier has no effect, so there is no need to try more than one
+        jackpot_multipliers = [JACKPOT_PRIZE_MULTIPLIER]
+
+    candidates = product(list(win_prizes), list(jackpot_multipliers), list(pull_costs),
+                         list(numbers_of_values), list(numbers_of_slots))
+    best: list[ScoredConfiguration] = []
+    workers = workers or os.cpu_count() or 1
+    pending = batches(candidates, batch_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {executor.submit(score_batch, batch, target_rtp, target_hit_frequency, jackpot_enabled, results)
+                   for batch in islice(pending, workers * 2)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                best = heapq.nsmallest(results, best + future.result())
+            for batch in islice(pending, len(done)):
+                running.add(executor.submit(score_batch, batch, target_rtp, target_hit_frequency,
+                                            jackpot_enabled, results))
+
+    return best
+
+
+def parse_range(text: str) -> range:
+    """
+    Parse an inclusive range written as "start:stop:step", "start:stop" or a single value.
+
+    Args:
+        text (str): The text to parse.
+
+    Returns:
+        range: The parsed range including the stop value.
+    """
+    parts = [int(part) for part in text.split(":")]
+    if len(parts) == 1:
+        return range(parts[0], parts[0] + 1)
+    step = parts[2] if len(parts) > 2 else 1
+    return range(parts[0], parts[1] + 1, step)
+
+
+def main() -> None:
+    """
+    Search for configurations closest to the given targets and print them ranked.
+    """
+    parser = argparse.ArgumentParser(description="Search configurations for a target RTP and hit frequency.")
+    parser.add_argument("--rtp", type=float, required=True, help="Target RTP as a percentage.")
+    parser.add_argument("--hit-frequency", type=float, required=True, help="Target probability of a paying pull.")
+    parser.add_argument("--win-prizes", type=parse_range, default=range(WIN_PRIZE, WIN_PRIZE + 1))
+    parser.add_argument("--jackpot-multipliers", type=parse_range,
+                        default=range(JACKPOT_PRIZE_MULTIPLIER, JACKPOT_PRIZE_MULTIPLIER + 1))
+    parser.add_argument("--pull-costs", type=parse_range, default=range(PULL_COST, PULL_COST + 1))
+    parser.add_argument("--values", type=parse_range, default=range(len(get_slot_values()), len(get_slot_values()) + 1),
+                        help="Numbers of slot symbols or numbers.")
+    parser.add_argument("--slots", type=parse_range, default=range(NUMBER_OF_SLOTS, NUMBER_OF_SLOTS + 1))
+    parser.add_argument("--results", type=int, default=OPTIMIZER_RESULTS, help="Number of configurations to show.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--output", help="Optional path of a JSON file to write the ranked list to.")
+    arguments = parser.parse_args()
+
+    ranked = optimize(arguments.rtp, arguments.hit_frequency, arguments.win_prizes, arguments.jackpot_multipliers,
+                      arguments.pull_costs, arguments.values, arguments.slots,
+                      results=arguments.results, workers=arguments.workers)
+
+    print(f"{'Rank':>4} {'Score':>9} {'RTP':>9} {'Hit freq':>9} {'WIN_PRIZE':>9} {'Multiplier':>10} "
+          f"{'PULL_COST':>9} {'Values':>6} {'Slots':>5}")
+    for rank, configuration in enumerate(ranked, start=1):
+        print(f"{rank:>4} {configuration.score:>9.5f} {configuration.rtp:>8.3f}% {configuration.hit_frequency:>9.5f} "
+              f"{configuration.win_prize:>9} {configuration.jackpot_multiplier:>10} {configuration.pull_cost:>9} "
+              f"{configuration.number_of_values:>6} {configuration.number_of_slots:>5}")
+
+    if arguments.output:
+        with open(arguments.output, mode="w", encoding="utf-8") as output_file:
+            json.dump([asdict(configuration) for configuration in ranked], output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+This module compiles config profiles into frozen game configurations that can be swapped at runtime.
+
+A profile is a TOML or JSON file overriding some of the game values of
+config.py, using the names of the constants as keys, for example:
+
+    PULL_COST = 25
+    WIN_PRIZE = 400
+    JACKPOT_PRIZE_MULTIPLIER = 20
+
+A profile is validated and compiled once into a GameConfig, a frozen, slotted
+object holding the values together with the tables derived from them: the
+index of every slot value, the jackpot index, the paytable, its outcomes and
+the RTP. The running game only ever reads a complete GameConfig, so replacing
+it with a newly compiled one is a single reference swap made between pulls.
+
+Only the values that do not change the layout of the screen can be set by a
+profile, the number of slots and rows still need a restart.
+
+Run this module directly to validate a profile and show its derived tables.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tomllib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+from analytics_cache import get_analytics_cache
+from game_math import Paytable, Outcome
+from slot import SlotValue
+from validation import validate_paytable, validate_game_values
+from config import (
+    PULL_COST, WIN_PRIZE, JACKPOT_ENABLED, JACKPOT_PRIZE_MULTIPLIER, WIN_MODE, USE_SYMBOLS,
+    SLOT_SYMBOLS, SLOT_NUMBERS, JACKPOT_WINNING_SYMBOL, JACKPOT_WINNING_NUMBER, NUMBER_OF_SLOTS, NUMBER_OF_ROWS
+)
+
+# Type of every value a profile can set, tuples are given as arrays in the profile
+PROFILE_VALUE_TYPES: dict[str, type] = {
+    "PULL_COST": int,
+    "WIN_PRIZE": int,
+    "JACKPOT_ENABLED": bool,
+    "JACKPOT_PRIZE_MULTIPLIER": int,
+    "WIN_MODE": str,
+    "USE_SYMBOLS": bool,
+    "SLOT_SYMBOLS": str,
+    "SLOT_NUMBERS": int,
+    "JACKPOT_WINNING_SYMBOL": str,
+    "JACKPOT_WINNING_NUMBER": int
+}
+
+# Values of a profile given as arrays
+_TUPLE_VALUES: frozenset[str] = frozenset({"SLOT_SYMBOLS", "SLOT_NUMBERS"})
+
+
+@dataclass(frozen=True, slots=True)
+class GameConfig:
+    """
+    Represents the compiled game values and the tables derived from them.
+
+    Attributes:
+        pull_cost (int): The cost of each pull.
+        win_prize (int): The amount of money won for a successful pull.
+        jackpot_enabled (bool): Flag signaling if jackpot is enabled or disabled.
+        jackpot_multiplier (int): Number by which the prize would be multiplied if jackpot is hit.
+        win_mode (str): Whether only the main row pays (line) or every way across the rows (ways).
+        use_symbols (bool): Flag signaling if symbols are used in slots, otherwise numbers are used.
+        jackpot_winning_symbol (str): Jackpot winning symbol if slots are using symbols.
+        jackpot_winning_number (int): Jackpot winning number if slots are using numbers.
+        slot_values (tuple[SlotValue, ...]): The possible values of each slot.
+        symbol_indices (Mapping[SlotValue, int]): The index of every slot value.
+        jackpot_value (SlotValue): The value that wins the jackpot.
+        jackpot_index (int): The index of the value that wins the jackpot.
+        paytable (Paytable): The paytable deciding the winning ways and prizes of a spin.
+        outcomes (tuple[Outcome, ...]): The possible results of a single pull.
+        rtp (float): The Return to Player (RTP) as a percentage.
+        source (str | None): The path of the compiled profile, or None for the values of config.py.
+    """
+    pull_cost: int
+    win_prize: int
+    jackpot_enabled: bool
+    jackpot_multiplier: int
+    win_mode: str
+    use_symbols: bool
+    jackpot_winning_symbol: str
+    jackpot_winning_number: int
+    slot_values: tuple[SlotValue, ...]
+    symbol_indices: Mapping[SlotValue, int]
+    jackpot_value: SlotValue
+    jackpot_index: int
+    paytable: Paytable
+    outcomes: tuple[Outcome, ...]
+    rtp: float
+    source: str | None
+
+
+def default_settings() -> dict[str, Any]:
+    """
+    Get the game values of config.py that a profile can override.
+
+    Returns:
+        dict[str, Any]: The values by the names of their constants.
+    """
+    return {
+        "PULL_COST": PULL_COST,
+        "WIN_PRIZE": WIN_PRIZE,
+        "JACKPOT_ENABLED": JACKPOT_ENABLED,
+        "JACKPOT_PRIZE_MULTIPLIER": JACKPOT_PRIZE_MULTIPLIER,
+        "WIN_MODE": WIN_MODE,
+        "USE_SYMBOLS": USE_SYMBOLS,
+        "SLOT_SYMBOLS": SLOT_SYMBOLS,
+        "SLOT_NUMBERS": SLOT_NUMBERS,
+        "JACKPOT_WINNING_SYMBOL": JACKPOT_WINNING_SYMBOL,
+        "JACKPOT_WINNING_NUMBER": JACKPOT_WINNING_NUMBER
+    }
+
+
+def _has_type(value: Any, value_type: type) -> bool:
+    """
+    Check the type of a profile value, where a bool does not count as an int.
+
+    Args:
+        value (Any): The value.
+        value_type (type): The expected type.
+
+    Returns:
+        bool: True if the value has the expected type, False otherwise.
+    """
+    return isinstance(value, value_type) and (value_type is bool or not isinstance(value, bool))
+
+
+def _check_types(overrides: Mapping[str, Any]) -> list[str]:
+    """
+    Check the names and types of the values set by a profile.
+
+    Args:
+        overrides (Mapping[str, Any]): The values set by the profile.
+
+    Returns:
+        list[str]: The error messages, empty if all names and types are valid.
+    """
+    errors: list[str] = []
+    for name, value in overrides.items():
+        value_type = PROFILE_VALUE_TYPES.get(name)
+        if value_type is None:
+            errors.append(f"{name} cannot be set by a profile.")
+            continue
+        if name in _TUPLE_VALUES:
+            if not isinstance(value, (list, tuple)) or not all(_has_type(item, value_type) for item in value):
+                errors.append(f"{name} must be an array of {value_type.__name__}.")
+        elif not _has_type(value, value_type):
+            errors.append(f"{name} must be {value_type.__name__}.")
+    return errors
+
+
+def compile_config(overrides: Mapping[str, Any] | None = None, source: str | None = None) -> GameConfig:
+    """
+    Validate game values and compile them with their derived tables.
+
+    Args:
+        overrides (Mapping[str, Any] | None): The values replacing those of config.py, by the names of
+            their constants, or None to compile the values of config.py.
+        source (str | None): The path of the profile the values come from, used in error messages.
+
+    Returns:
+        GameConfig: The compiled configuration.
+
+    Raises:
+        ValueError: If any value is unknown, has the wrong type or is invalid.
+    """
+    overrides = overrides or {}
+    errors = _check_types(overrides)
+    if not errors:
+        settings = default_settings() | {name: tuple(value) if name in _TUPLE_VALUES else value
+                                         for name, value in overrides.items()}
+        slot_values = settings["SLOT_SYMBOLS"] if settings["USE_SYMBOLS"] else settings["SLOT_NUMBERS"]
+        errors = validate_paytable(NUMBER_OF_SLOTS, settings["PULL_COST"], settings["WIN_PRIZE"], len(slot_values),
+                                   settings["JACKPOT_PRIZE_MULTIPLIER"])
+        errors += validate_game_values(settings["WIN_MODE"], settings["SLOT_SYMBOLS"], settings["SLOT_NUMBERS"],
+                                       settings["JACKPOT_WINNING_SYMBOL"], settings["JACKPOT_WINNING_NUMBER"])
+    if errors:
+        location = source if source is not None else "config.py"
+        raise ValueError("\n".join(errors) + f"\n\nPlease update {location} to correct these issues.")
+
+    use_symbols = settings["USE_SYMBOLS"]
+    slot_values = settings["SLOT_SYMBOLS"] if use_symbols else settings["SLOT_NUMBERS"]
+    jackpot_value = settings["JACKPOT_WINNING_SYMBOL"] if use_symbols else settings["JACKPOT_WINNING_NUMBER"]
+    symbol_indices = {value: index for index, value in enumerate(slot_values)}
+    paytable = Paytable(settings["PULL_COST"], settings["WIN_PRIZE"], settings["JACKPOT_ENABLED"],
+                        settings["JACKPOT_PRIZE_MULTIPLIER"], len(slot_values), NUMBER_OF_SLOTS, NUMBER_OF_ROWS,
+                        settings["WIN_MODE"])
+    return GameConfig(
+        pull_cost=paytable.pull_cost,
+        win_prize=paytable.win_prize,
+        jackpot_enabled=paytable.jackpot_enabled,
+        jackpot_multiplier=paytable.jackpot_multiplier,
+        win_mode=paytable.win_mode,
+        use_symbols=use_symbols,
+        jackpot_winning_symbol=settings["JACKPOT_WINNING_SYMBOL"],
+        jackpot_winning_number=settings["JACKPOT_WINNING_NUMBER"],
+        slot_values=slot_values,
+        symbol_indices=MappingProxyType(symbol_indices),
+        jackpot_value=jackpot_value,
+        jackpot_index=symbol_indices[jackpot_value],
+        paytable=paytable,
+        outcomes=paytable.outcomes(),
+        rtp=get_analytics_cache().value("rtp", paytable, paytable.rtp),
+        source=source
+    )
+
+
+def resolve_profile_path(profile_path: str) -> str:
+    """
+    Resolve a profile path relative to the source directory, as the log directory is.
+
+    Args:
+        profile_path (str): The path to resolve.
+
+    Returns:
+        str: The absolute path.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), profile_path)
+
+
+def load_profile(profile_path: str) -> GameConfig:
+    """
+    Read a TOML or JSON profile and compile it.
+
+    Args:
+        profile_path (str): The path of the profile, relative to the source directory.
+
+    Returns:
+        GameConfig: The compiled configuration.
+
+    Raises:
+        OSError: If the profile cannot be read.
+        ValueError: If the profile is not valid TOML or JSON, or any of its values is invalid.
+    """
+    path = resolve_profile_path(profile_path)
+    with open(path, "rb") as profile:
+        content = profile.read()
+    if path.endswith(".toml"):
+        overrides = tomllib.loads(content.decode("utf-8"))
+    elif path.endswith(".json"):
+        overrides = json.loads(content)
+    else:
+        raise ValueError(f"Profile {path} must be a .toml or .json file.")
+    if not isinstance(overrides, dict):
+        raise ValueError(f"Profile {path} must map constant names to values.")
+    return compile_config(overrides, path)
+
+
+class ProfileWatcher:
+    """
+    Represents a profile checked for changes, compiled again whenever it changes.
+
+    Attributes:
+        profile_path (str): The path of the profile, relative to the source directory.
+        game_config (GameConfig): The latest valid configuration compiled from the profile.
+    """
+
+    def __init__(self, profile_path: str) -> None:
+        """
+        Initialize a new ProfileWatcher instance and compile the profile.
+
+        Args:
+            profile_path (str): The path of the profile, relative to the source directory.
+
+        Raises:
+            OSError: If the profile cannot be read.
+            ValueError: If the profile is invalid.
+        """
+        self.profile_path: str = profile_path
+        self._signature: tuple[int, int] | None = self._stat()
+        self.game_config: GameConfig = load_profile(profile_path)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the ProfileWatcher object.
+
+        Returns:
+            str: A string representation of the ProfileWatcher object.
+        """
+        return f"ProfileWatcher(profile_path={self.profile_path}, rtp={self.game_config.rtp:.2f})"
+
+    def _stat(self) -> tuple[int, int] | None:
+        """
+        Get the modification time and size of the profile.
+
+        Returns:
+            tuple[int, int] | None: The modification time in nanoseconds and the size, or None if it is missing.
+        """
+        try:
+            status = os.stat(resolve_profile_path(self.profile_path))
+        except OSError:
+            return None
+        return status.st_mtime_ns, status.st_size
+
+    def poll(self) -> GameConfig | None:
+        """
+        Compile the profile again if it changed since it was last compiled.
+
+        A profile that fails to compile is not read again until it changes once more,
+        and the previous configuration stays in use.
+
+        Returns:
+            GameConfig | None: The new configuration, or None if the profile did not change.
+
+        Raises:
+            OSError: If the changed profile cannot be read.
+            ValueError: If the changed profile is invalid.
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        self.game_config = load_profile(self.profile_path)
+        return self.game_config
+
+
+def main() -> None:
+    """
+    Validate a profile and print its derived tables.
+    """
+    parser = argparse.ArgumentParser(description="Validate and compile a config profile.")
+    parser.add_argument("profile", nargs="?", help="TOML or JSON profile, relative to the source directory. "
+                                                   "Without a profile the values of config.py are compiled.")
+    arguments = parser.parse_args()
+
+    try:
+        game_config = load_profile(arguments.profile) if arguments.profile else compile_config()
+    except (OSError, ValueError) as error:
+        print(f"Configuration Error:\n{error}")
+        sys.exit(1)
+
+    print(f"Paytable: {game_config.paytable}")
+    print(f"Jackpot value: {game_config.jackpot_value} (index {game_config.jackpot_index})")
+    print(f"RTP: {game_config.rtp:.4f}%")
+    for outcome in game_config.outcomes:
+        print(f"  {outcome.name}: probability {outcome.probability:.8f}, payout ${outcome.payout}, net ${outcome.net}")
+
+
+if __name__ == "__main__":
+    main()
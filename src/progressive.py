@@ -0,0 +1,395 @@
+"""
+This module provides a progressive jackpot pool shared by slot machine processes on one host.
+
+A configurable share of every pull cost is added to a pool that lives in
+"multiprocessing.shared_memory". Every process owns one counter slot in the
+shared block and is the only writer of it, so contributions need no lock.
+The pool value is the sum of all counters plus the base amount, minus what
+has been awarded. Only rare operations (claiming a slot and awarding the
+jackpot) take a file lock. The pool can be saved to a snapshot file and is
+recovered from it when the shared block has to be created again.
+
+All amounts inside the pool are stored in cents, so fractional contributions
+are not lost.
+
+Run this module directly to show the pool or to stress test it.
+"""
+
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from random import random
+from threading import Lock, get_ident
+from file_lock import FileLock
+from config import (
+    PROGRESSIVE_POOL_NAME, PROGRESSIVE_CONTRIBUTION_RATE, PROGRESSIVE_SEED,
+    PROGRESSIVE_MAX_MACHINES, PROGRESSIVE_SNAPSHOT_FILE, PROGRESSIVE_SNAPSHOT_INTERVAL
+)
+
+# Layout of the shared block, in 64-bit integers
+_MAGIC: int = 0x534C4F544A504F4C  # "SLOTJPOL"
+_MAGIC_INDEX: int = 0
+_MACHINES_INDEX: int = 1
+_BASE_INDEX: int = 2
+_AWARDED_INDEX: int = 3
+_REFILLED_INDEX: int = 4
+_JACKPOTS_INDEX: int = 5
+_HEADER_SIZE: int = 8
+_SLOT_SIZE: int = 2  # Process id and contributed cents
+_INTEGER_SIZE: int = 8
+
+
+def _process_alive(pid: int) -> bool:
+    """
+    Check if a process with the given id is still running.
+
+    Args:
+        pid (int): The process id.
+
+    Returns:
+        bool: True if the process is running or its state cannot be determined, False otherwise.
+    """
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _resolve_path(file_path: str) -> str:
+    """
+    Resolve a path relative to the source directory, as the log directory is.
+
+    Args:
+        file_path (str): The path to resolve.
+
+    Returns:
+        str: The absolute path.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), file_path)
+
+
+class ProgressiveJackpot:
+    """
+    Represents this process's connection to the shared progressive jackpot pool.
+
+    Attributes:
+        name (str): The name of the shared memory block.
+        contribution_rate (float): The share of every pull cost added to the pool.
+        seed (int): The pool value after a jackpot is won.
+        snapshot_file (str): The path of the snapshot file.
+        snapshot_interval (int): The number of contributions of this process between snapshots.
+        slot_index (int): The index of the counter slot owned by this process.
+    """
+
+    def __init__(self, name: str = PROGRESSIVE_POOL_NAME, contribution_rate: float = PROGRESSIVE_CONTRIBUTION_RATE,
+                 seed: int = PROGRESSIVE_SEED, max_machines: int = PROGRESSIVE_MAX_MACHINES,
+                 snapshot_file: str = PROGRESSIVE_SNAPSHOT_FILE,
+                 snapshot_interval: int = PROGRESSIVE_SNAPSHOT_INTERVAL) -> None:
+        """
+        Attach to the shared pool, creating it if it does not exist yet.
+
+        A new pool starts from the last snapshot if there is one, otherwise from the seed.
+
+        Args:
+            name (str): The name of the shared memory block.
+            contribution_rate (float): The share of every pull cost added to the pool.
+            seed (int): The pool value after a jackpot is won.
+            max_machines (int): The number of counter slots when the block is created.
+            snapshot_file (str): The path of the snapshot file, relative to the source directory.
+            snapshot_interval (int): The number of contributions of this process between snapshots.
+
+        Raises:
+            ValueError: If all counter slots are owned by running processes.
+        """
+        self.name: str = name
+        self.contribution_rate: float = contribution_rate
+        self.seed: int = seed
+        self.snapshot_file: str = _resolve_path(snapshot_file)
+        self.snapshot_interval: int = snapshot_interval
+        self._contributions_since_snapshot: int = 0
+        self._contribute_lock: Lock = Lock()
+
+        os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+        self._lock: FileLock = FileLock(f"{self.snapshot_file}.lock")
+
+        with self._lock:
+            try:
+                self._memory: SharedMemory = SharedMemory(name=name)
+                created = False
+            except FileNotFoundError:
+                self._memory = SharedMemory(name=name, create=True,
+                                            size=(_HEADER_SIZE + _SLOT_SIZE * max_machines) * _INTEGER_SIZE)
+                created = True
+            if sys.platform != "win32":
+                # The pool must outlive this process, so it is not left to the resource tracker
+                resource_tracker.unregister(self._memory._name, "shared_memory")  # type: ignore[attr-defined]
+
+            buffer = self._memory.buf
+            assert buffer is not None  # Only None once the block is closed
+            self._integers: memoryview = buffer.cast("q")
+            if created:
+                self._integers[_MACHINES_INDEX] = max_machines
+                self._integers[_BASE_INDEX] = self._load_snapshot()
+                self._integers[_MAGIC_INDEX] = _MAGIC
+            elif self._integers[_MAGIC_INDEX] != _MAGIC:
+                raise ValueError(f"Shared memory block {name} is not a progressive jackpot pool.")
+
+            self.slot_index: int = self._claim_slot()
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the ProgressiveJackpot object.
+
+        Returns:
+            str: A string representation of the ProgressiveJackpot object.
+        """
+        return (f"ProgressiveJackpot(name={self.name}, pool={self.pool}, "
+                f"contribution_rate={self.contribution_rate}, slot_index={self.slot_index})")
+
+    def _load_snapshot(self) -> int:
+        """
+        Get the pool value in cents from the snapshot file.
+
+        Returns:
+            int: The saved pool value, or the seed if there is no snapshot.
+        """
+        try:
+            with open(self.snapshot_file, mode="r", encoding="utf-8") as snapshot:
+                return int(json.load(snapshot)["pool_cents"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return self.seed * 100
+
+    def _claim_slot(self) -> int:
+        """
+        Claim a free counter slot for this process. Must be called with the lock held.
+
+        Slots of processes that are no longer running are reused, keeping their counters.
+
+        Returns:
+            int: The index of the claimed slot.
+
+        Raises:
+            ValueError: If all slots are owned by running processes.
+        """
+        pid = os.getpid()
+        for index in range(self._integers[_MACHINES_INDEX]):
+            pid_index = _HEADER_SIZE + index * _SLOT_SIZE
+            owner = self._integers[pid_index]
+            if owner == pid or not _process_alive(owner):
+                self._integers[pid_index] = pid
+                return index
+        raise ValueError("All progressive jackpot slots are in use.")
+
+    @property
+    def contributed_cents(self) -> int:
+        """
+        Get the sum of all contributions ever made to the pool.
+
+        Returns:
+            int: The contributions in cents.
+        """
+        return sum(self._integers[_HEADER_SIZE + index * _SLOT_SIZE + 1]
+                   for index in range(self._integers[_MACHINES_INDEX]))
+
+    @property
+    def pool_cents(self) -> int:
+        """
+        Get the current pool value in cents.
+
+        Returns:
+            int: The pool value in cents.
+        """
+        return (self._integers[_BASE_INDEX] + self._integers[_REFILLED_INDEX]
+                + self.contributed_cents - self._integers[_AWARDED_INDEX])
+
+    @property
+    def pool(self) -> int:
+        """
+        Get the current pool value in whole money units.
+
+        Returns:
+            int: The pool value.
+        """
+        return self.pool_cents // 100
+
+    def contribute(self, pull_cost: int) -> None:
+        """
+        Add this process's share of a pull cost to the pool.
+
+        Only this process writes to its counter slot, so only the threads of this
+        process have to be kept from losing each other's updates, and no file lock
+        is needed.
+
+        Args:
+            pull_cost (int): The cost of the pull.
+        """
+        counter_index = _HEADER_SIZE + self.slot_index * _SLOT_SIZE + 1
+        with self._contribute_lock:
+            self._integers[counter_index] += round(pull_cost * 100 * self.contribution_rate)
+            self._contributions_since_snapshot += 1
+            take_snapshot = (self.snapshot_interval > 0
+                             and self._contributions_since_snapshot >= self.snapshot_interval)
+            if take_snapshot:
+                self._contributions_since_snapshot = 0
+        if take_snapshot:
+            self.snapshot()
+
+    def award(self) -> int:
+        """
+        Award the pool to the player and refill it with the seed.
+
+        Returns:
+            int: The awarded amount in whole money units.
+        """
+        with self._lock:
+            amount = self.pool
+            self._integers[_AWARDED_INDEX] += amount * 100
+            self._integers[_REFILLED_INDEX] += self.seed * 100
+            self._integers[_JACKPOTS_INDEX] += 1
+        self.snapshot()
+        return amount
+
+    def state(self) -> dict[str, int]:
+        """
+        Get the accounting state of the pool.
+
+        Returns:
+            dict[str, int]: The pool counters in cents and the number of jackpots won.
+        """
+        return {
+            "pool_cents": self.pool_cents,
+            "base_cents": self._integers[_BASE_INDEX],
+            "contributed_cents": self.contributed_cents,
+            "refilled_cents": self._integers[_REFILLED_INDEX],
+            "awarded_cents": self._integers[_AWARDED_INDEX],
+            "jackpots": self._integers[_JACKPOTS_INDEX]
+        }
+
+    def snapshot(self) -> None:
+        """
+        Save the pool state to the snapshot file, replacing the previous snapshot atomically.
+        """
+        self._contributions_since_snapshot = 0
+        temporary_file = f"{self.snapshot_file}.{os.getpid()}.{get_ident()}.tmp"
+        with open(temporary_file, mode="w", encoding="utf-8") as snapshot:
+            json.dump(self.state(), snapshot)
+        os.replace(temporary_file, self.snapshot_file)
+
+    def close(self) -> None:
+        """
+        Detach this process from the pool, leaving the pool in place for other processes.
+        """
+        self._integers.release()
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """
+        Save a snapshot and remove the shared pool. Other processes must reattach afterwards.
+        """
+        self.snapshot()
+        self._integers.release()
+        self._memory.close()
+        if sys.platform != "win32":
+            # Unlinking unregisters the block, so it has to be registered again first
+            resource_tracker.register(self._memory._name, "shared_memory")  # type: ignore[attr-defined]
+        self._memory.unlink()
+
+
+def _stress_worker(name: str, snapshot_file: str, pulls: int, pull_cost: int, jackpot_chance: float) -> int:
+    """
+    Contribute to the pool many times and occasionally win the jackpot.
+
+    Args:
+        name (str): The name of the shared memory block.
+        snapshot_file (str): The path of the snapshot file.
+        pulls (int): The number of contributions to make.
+        pull_cost (int): The cost of each pull.
+        jackpot_chance (float): The chance of winning the jackpot on each pull.
+
+    Returns:
+        int: The sum of the jackpots paid to this process, in whole money units.
+    """
+    jackpot = ProgressiveJackpot(name=name, snapshot_file=snapshot_file, snapshot_interval=0)
+    paid = 0
+    for _ in range(pulls):
+        jackpot.contribute(pull_cost)
+        if random() < jackpot_chance:
+            paid += jackpot.award()
+    jackpot.close()
+    return paid
+
+
+def stress_test(processes: int = 8, pulls: int = 100_000, pull_cost: int = 50, jackpot_chance: float = 0.001) -> bool:
+    """
+    Check that no contribution is lost when many processes use the pool at once.
+
+    Args:
+        processes (int): The number of concurrent processes.
+        pulls (int): The number of contributions of each process.
+        pull_cost (int): The cost of each pull.
+        jackpot_chance (float): The chance of winning the jackpot on each pull.
+
+    Returns:
+        bool: True if the pool accounting balances exactly, False otherwise.
+    """
+    name = f"{PROGRESSIVE_POOL_NAME}_stress_{os.getpid()}"
+    snapshot_file = f"{PROGRESSIVE_SNAPSHOT_FILE}.stress"
+    pool = ProgressiveJackpot(name=name, snapshot_file=snapshot_file, max_machines=processes + 1, snapshot_interval=0)
+    start = pool.state()
+
+    with Pool(processes) as workers:
+        paid_cents = 100 * sum(workers.starmap(_stress_worker, [(name, snapshot_file, pulls, pull_cost,
+                                                                 jackpot_chance)] * processes))
+
+    end = pool.state()
+    expected_contributions = processes * pulls * round(pull_cost * 100 * pool.contribution_rate)
+    contributed = end["contributed_cents"] - start["contributed_cents"]
+    awarded = end["awarded_cents"] - start["awarded_cents"]
+    # Every jackpot paid by award() must be recorded once, and no award may overdraw the pool
+    balanced = paid_cents == awarded and end["pool_cents"] >= 0
+
+    print(f"Processes: {processes}, pulls per process: {pulls}, jackpots: {end['jackpots'] - start['jackpots']}")
+    print(f"Expected contributions: {expected_contributions} cents, recorded: {contributed} cents")
+    print(f"Paid jackpots: {paid_cents} cents, recorded: {awarded} cents, accounting balanced: {balanced}")
+
+    pool.unlink()
+    for leftover in (pool.snapshot_file, f"{pool.snapshot_file}.lock"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    return contributed == expected_contributions and balanced
+
+
+def main() -> None:
+    """
+    Show the pool state or run the stress test.
+    """
+    parser = argparse.ArgumentParser(description="Progressive jackpot pool shared between processes.")
+    parser.add_argument("--stress", action="store_true", help="Run the concurrency stress test.")
+    parser.add_argument("--processes", type=int, default=8, help="Number of processes for the stress test.")
+    parser.add_argument("--pulls", type=int, default=100_000, help="Pulls per process for the stress test.")
+    parser.add_argument("--unlink", action="store_true", help="Save a snapshot and remove the shared pool.")
+    arguments = parser.parse_args()
+
+    if arguments.stress:
+        sys.exit(0 if stress_test(arguments.processes, arguments.pulls) else 1)
+
+    jackpot = ProgressiveJackpot()
+    print(json.dumps(jackpot.state(), indent=2))
+    if arguments.unlink:
+        jackpot.unlink()
+    else:
+        jackpot.close()
+
+
+if __name__ == "__main__":
+    main()
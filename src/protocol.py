@@ -0,0 +1,650 @@
+"""
+This module provides a compact binary protocol for local front-ends of a headless machine.
+
+A cabinet UI or any other local client talks to one headless machine process
+over a Unix domain socket. Every message is a frame made of a fixed header
+(message type, request id, payload length) followed by a payload with a fixed
+"struct" layout, so reel indices and amounts travel as packed integers and a
+pull reply is packed with a single call.
+
+Clients may pipeline requests: they send many frames without waiting, and the
+server handles every complete frame of a read before sending all their replies
+with one write, in the order of the requests. A client can also subscribe to
+the pull events of the machine, which are pushed to it as event frames with
+request id 0, batched in the same way.
+
+The server never blocks on a client: replies a client does not read yet wait
+in its buffer and are sent when its socket is writable. Once that buffer holds
+PROTOCOL_MAX_PENDING_BYTES, no more of its requests are read and the pull
+events pushed to it are dropped until it catches up, so a subscriber that never
+reads costs at most that much memory; it sees the dropped events as a gap in
+the pull numbers. Clients send at most PROTOCOL_PIPELINE_DEPTH requests before
+reading their replies, so both sides never wait on each other's writes.
+
+Request payloads:
+
+- PULL_REQUEST: empty. Replied with PULL_REPLY.
+- BALANCE_REQUEST: empty. Replied with BALANCE_REPLY, the balance as an int64.
+- CONFIGURATION_REQUEST: empty. Replied with CONFIGURATION_REPLY, the paytable.
+- SUBSCRIBE_REQUEST: a bool turning the pull events on or off. Replied with an empty SUBSCRIBE_REPLY.
+
+A PULL_REPLY or PULL_EVENT payload holds the pull number, the outcome code, the
+pull cost, the payout and the balance, followed by one unsigned byte per reel
+with the index of the value shown on its main slot. Malformed requests are
+replied with an ERROR_REPLY holding an error code.
+
+Unix domain sockets are not available on every version of Windows.
+
+Run this module directly to serve the machine, or to benchmark the protocol.
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import struct
+from collections import deque
+from collections.abc import Iterator
+from typing import cast
+from multiprocessing import Process
+from time import perf_counter, sleep
+from engine import Engine, PullResult
+from game_math import Paytable, LOSS_OUTCOME, WIN_OUTCOME, JACKPOT_OUTCOME, LINE_WIN_MODE, WAYS_WIN_MODE
+from slot import get_slot_values
+from config import (
+    PROTOCOL_SOCKET_PATH, PROTOCOL_RECEIVE_SIZE, PROTOCOL_PIPELINE_DEPTH, PROTOCOL_MAX_PENDING_BYTES,
+    PROTOCOL_BENCHMARK_PULLS
+)
+
+# Message types of the requests
+PULL_REQUEST: int = 0x01
+BALANCE_REQUEST: int = 0x02
+CONFIGURATION_REQUEST: int = 0x03
+SUBSCRIBE_REQUEST: int = 0x04
+
+# Message types of the replies and of the pushed events
+PULL_REPLY: int = 0x81
+BALANCE_REPLY: int = 0x82
+CONFIGURATION_REPLY: int = 0x83
+SUBSCRIBE_REPLY: int = 0x84
+PULL_EVENT: int = 0x85
+ERROR_REPLY: int = 0xFF
+
+# Error codes of an ERROR_REPLY
+UNKNOWN_MESSAGE_ERROR: int = 1
+PAYLOAD_SIZE_ERROR: int = 2
+
+# Request id of the frames pushed without a request
+EVENT_REQUEST_ID: int = 0
+
+# Message type, request id and payload length of every frame
+FRAME_HEADER: struct.Struct = struct.Struct("<BIH")
+
+# Fixed part of a pull reply: pull number, outcome code, pull cost, payout and balance
+PULL_PAYLOAD: struct.Struct = struct.Struct("<IBiiq")
+
+# Number of slots, number of values, number of rows, win mode code, pull cost, win prize,
+# jackpot multiplier and whether the jackpot is enabled
+CONFIGURATION_PAYLOAD: struct.Struct = struct.Struct("<BBBBiii?")
+
+BALANCE_PAYLOAD: struct.Struct = struct.Struct("<q")
+SUBSCRIBE_PAYLOAD: struct.Struct = struct.Struct("<?")
+ERROR_PAYLOAD: struct.Struct = struct.Struct("<B")
+
+# Codes of the outcomes and win modes, the index in the tuple is the code
+OUTCOME_CODES: tuple[str, ...] = (LOSS_OUTCOME, WIN_OUTCOME, JACKPOT_OUTCOME)
+WIN_MODE_CODES: tuple[str, ...] = (LINE_WIN_MODE, WAYS_WIN_MODE)
+
+
+def resolve_socket_path(socket_path: str) -> str:
+    """
+    Resolve a socket path relative to the source directory, as the log directory is.
+
+    Args:
+        socket_path (str): The path to resolve.
+
+    Returns:
+        str: The normalized absolute path.
+    """
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), socket_path))
+
+
+def pull_struct(number_of_slots: int) -> struct.Struct:
+    """
+    Get the layout of a pull payload for a number of reels.
+
+    Args:
+        number_of_slots (int): The number of main slots.
+
+    Returns:
+        struct.Struct: The fixed part of the payload followed by one unsigned byte per reel.
+    """
+    return struct.Struct(PULL_PAYLOAD.format + "B" * number_of_slots)
+
+
+class MachineServer:
+    """
+    Represents a headless machine serving local clients over a Unix domain socket.
+
+    Attributes:
+        engine (Engine): The machine played by every client.
+        socket_path (str): The absolute path of the socket.
+        dropped_events (int): The number of pull events not pushed to subscribers whose buffer was full.
+    """
+
+    def __init__(self, engine: Engine | None = None, socket_path: str = PROTOCOL_SOCKET_PATH) -> None:
+        """
+        Initialize a new MachineServer instance and start listening.
+
+        Args:
+            engine (Engine | None): The machine to serve, or None for a new one.
+            socket_path (str): The path of the socket, relative to the source directory.
+                A stale socket file left by an earlier server is replaced.
+        """
+        self.engine: Engine = engine if engine is not None else Engine()
+        self.socket_path: str = resolve_socket_path(socket_path)
+        self.dropped_events: int = 0
+        paytable = self.engine.paytable
+        # A pull reply is packed with the frame header in a single call
+        self._pull_frame: struct.Struct = struct.Struct(FRAME_HEADER.format
+                                                        + pull_struct(paytable.number_of_slots).format[1:])
+        self._pull_payload_size: int = self._pull_frame.size - FRAME_HEADER.size
+        self._configuration: bytes = CONFIGURATION_PAYLOAD.pack(
+            paytable.number_of_slots, paytable.number_of_values, paytable.number_of_rows,
+            WIN_MODE_CODES.index(paytable.win_mode), paytable.pull_cost, paytable.win_prize,
+            paytable.jackpot_multiplier, paytable.jackpot_enabled
+        )
+        self._buffers: dict[socket.socket, bytearray] = {}
+        self._replies: dict[socket.socket, bytearray] = {}
+        self._subscribers: set[socket.socket] = set()
+
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._server: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen()
+        self._selector: selectors.BaseSelector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the MachineServer object.
+
+        Returns:
+            str: A string representation of the MachineServer object.
+        """
+        return (f"MachineServer(socket_path={self.socket_path}, clients={len(self._buffers)}, "
+                f"subscribers={len(self._subscribers)})")
+
+    def serve_forever(self) -> None:
+        """
+        Serve the clients until the process is stopped.
+        """
+        while True:
+            self.serve_once()
+
+    def serve_once(self, timeout: float | None = None) -> None:
+        """
+        Handle the requests received before a timeout and send as much of their replies as the clients accept.
+
+        Args:
+            timeout (float | None): The number of seconds to wait for a request, or None to wait for one.
+        """
+        for key, mask in self._selector.select(timeout):
+            if key.fileobj is self._server:
+                connection, _ = self._server.accept()
+                connection.setblocking(False)
+                self._buffers[connection] = bytearray()
+                self._replies[connection] = bytearray()
+                self._selector.register(connection, selectors.EVENT_READ)
+            elif mask & selectors.EVENT_READ:
+                self._receive(cast(socket.socket, key.fileobj))
+
+        # Writable clients need no handling of their own, their replies are sent here with the new ones
+        for connection in [connection for connection, replies in self._replies.items() if replies]:
+            self._send(connection)
+
+    def _send(self, connection: socket.socket) -> None:
+        """
+        Send as much of the queued replies of a connection as it accepts without blocking.
+
+        Connections with unsent replies wait for their socket to become writable,
+        and are not read while their unsent replies reach PROTOCOL_MAX_PENDING_BYTES.
+
+        Args:
+            connection (socket.socket): The connection to send to.
+        """
+        replies = self._replies[connection]
+        try:
+            sent = connection.send(replies)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._disconnect(connection)
+            return
+        del replies[:sent]
+
+        events = selectors.EVENT_WRITE if replies else 0
+        if len(replies) < PROTOCOL_MAX_PENDING_BYTES:
+            events |= selectors.EVENT_READ
+        if self._selector.get_key(connection).events != events:
+            self._selector.modify(connection, events)
+
+    def _receive(self, connection: socket.socket) -> None:
+        """
+        Read from a connection and handle every complete request frame.
+
+        Args:
+            connection (socket.socket): The connection to read from.
+        """
+        try:
+            data = connection.recv(PROTOCOL_RECEIVE_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._disconnect(connection)
+            return
+
+        buffer = self._buffers[connection]
+        buffer += data
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            message_type, request_id, payload_size = FRAME_HEADER.unpack_from(buffer, offset)
+            frame_end = offset + FRAME_HEADER.size + payload_size
+            if len(buffer) < frame_end:
+                break
+            self._handle(connection, message_type, request_id, bytes(buffer[offset + FRAME_HEADER.size:frame_end]))
+            offset = frame_end
+        del buffer[:offset]
+
+    def _handle(self, connection: socket.socket, message_type: int, request_id: int, payload: bytes) -> None:
+        """
+        Handle a request and queue its reply.
+
+        Args:
+            connection (socket.socket): The connection the request came from.
+            message_type (int): The message type of the request.
+            request_id (int): The request id, repeated in the reply.
+            payload (bytes): The payload of the request.
+        """
+        replies = self._replies[connection]
+        expected_size = SUBSCRIBE_PAYLOAD.size if message_type == SUBSCRIBE_REQUEST else 0
+        if message_type not in (PULL_REQUEST, BALANCE_REQUEST, CONFIGURATION_REQUEST, SUBSCRIBE_REQUEST):
+            replies += self._frame(ERROR_REPLY, request_id, ERROR_PAYLOAD.pack(UNKNOWN_MESSAGE_ERROR))
+        elif len(payload) != expected_size:
+            replies += self._frame(ERROR_REPLY, request_id, ERROR_PAYLOAD.pack(PAYLOAD_SIZE_ERROR))
+        elif message_type == PULL_REQUEST:
+            result = self.engine.pull()
+            replies += self._pack_pull(PULL_REPLY, request_id, result)
+            if self._subscribers:
+                event = self._pack_pull(PULL_EVENT, EVENT_REQUEST_ID, result)
+                for subscriber in self._subscribers:
+                    subscriber_replies = self._replies[subscriber]
+                    if len(subscriber_replies) < PROTOCOL_MAX_PENDING_BYTES:
+                        subscriber_replies += event
+                    else:
+                        self.dropped_events += 1
+        elif message_type == BALANCE_REQUEST:
+            replies += self._frame(BALANCE_REPLY, request_id, BALANCE_PAYLOAD.pack(self.engine.balance))
+        elif message_type == CONFIGURATION_REQUEST:
+            replies += self._frame(CONFIGURATION_REPLY, request_id, self._configuration)
+        else:
+            if SUBSCRIBE_PAYLOAD.unpack(payload)[0]:
+                self._subscribers.add(connection)
+            else:
+                self._subscribers.discard(connection)
+            replies += self._frame(SUBSCRIBE_REPLY, request_id, b"")
+
+    @staticmethod
+    def _frame(message_type: int, request_id: int, payload: bytes) -> bytes:
+        """
+        Build a frame.
+
+        Args:
+            message_type (int): The message type.
+            request_id (int): The request id.
+            payload (bytes): The payload.
+
+        Returns:
+            bytes: The header followed by the payload.
+        """
+        return FRAME_HEADER.pack(message_type, request_id, len(payload)) + payload
+
+    def _pack_pull(self, message_type: int, request_id: int, result: PullResult) -> bytes:
+        """
+        Build a pull reply or event frame.
+
+        Args:
+            message_type (int): The message type, PULL_REPLY or PULL_EVENT.
+            request_id (int): The request id.
+            result (PullResult): The result of the pull.
+
+        Returns:
+            bytes: The frame.
+        """
+        return self._pull_frame.pack(message_type, request_id, self._pull_payload_size, result.pull_number,
+                                     OUTCOME_CODES.index(result.outcome), result.pull_cost, result.payout,
+                                     result.balance, *result.reels)
+
+    def _disconnect(self, connection: socket.socket) -> None:
+        """
+        Forget a client and close its connection.
+
+        Args:
+            connection (socket.socket): The connection to close.
+        """
+        self._selector.unregister(connection)
+        self._buffers.pop(connection, None)
+        self._replies.pop(connection, None)
+        self._subscribers.discard(connection)
+        connection.close()
+
+    def close(self) -> None:
+        """
+        Close every connection and remove the socket file.
+        """
+        for connection in list(self._buffers):
+            self._disconnect(connection)
+        self._selector.close()
+        self._server.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class MachineClient:
+    """
+    Represents a local front-end connected to a MachineServer.
+
+    Attributes:
+        paytable (Paytable): The paytable of the served machine, read when connecting.
+        values (tuple): The possible values of each slot, used to show the reel indices.
+    """
+
+    def __init__(self, socket_path: str = PROTOCOL_SOCKET_PATH) -> None:
+        """
+        Connect to a machine server and read its configuration.
+
+        Args:
+            socket_path (str): The path of the socket, relative to the source directory.
+
+        Raises:
+            ValueError: If the served machine does not have as many values as the configured slot values.
+        """
+        self._socket: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(resolve_socket_path(socket_path))
+        self._buffer: bytearray = bytearray()
+        self._offset: int = 0
+        self._next_request_id: int = 1
+        self._events: deque[PullResult] = deque()
+
+        self._send(CONFIGURATION_REQUEST)
+        (number_of_slots, number_of_values, number_of_rows, win_mode, pull_cost, win_prize, jackpot_multiplier,
+         jackpot_enabled) = CONFIGURATION_PAYLOAD.unpack(self._reply(CONFIGURATION_REPLY))
+        self.paytable: Paytable = Paytable(pull_cost, win_prize, jackpot_enabled, jackpot_multiplier,
+                                           number_of_values, number_of_slots, number_of_rows,
+                                           WIN_MODE_CODES[win_mode])
+        self.values: tuple = get_slot_values()
+        if number_of_values != len(self.values):
+            self._socket.close()
+            raise ValueError(f"The machine server has {number_of_values} values, "
+                             f"but {len(self.values)} slot values are configured.")
+        self._pull_payload: struct.Struct = pull_struct(number_of_slots)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the MachineClient object.
+
+        Returns:
+            str: A string representation of the MachineClient object.
+        """
+        return f"MachineClient(slots={self.paytable.number_of_slots}, pending_events={len(self._events)})"
+
+    def _send(self, message_type: int, payload: bytes = b"", count: int = 1) -> None:
+        """
+        Send one or more identical requests with a single write.
+
+        Args:
+            message_type (int): The message type of the requests.
+            payload (bytes): The payload of every request.
+            count (int): The number of requests.
+        """
+        frames = bytearray()
+        for _ in range(count):
+            frames += FRAME_HEADER.pack(message_type, self._next_request_id, len(payload)) + payload
+            self._next_request_id = self._next_request_id % 0xFFFFFFFF + 1
+        self._socket.sendall(frames)
+
+    def _frame(self) -> tuple[int, bytes]:
+        """
+        Read the next frame.
+
+        Returns:
+            tuple[int, bytes]: The message type and the payload.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        while True:
+            available = len(self._buffer) - self._offset
+            if available >= FRAME_HEADER.size:
+                message_type, _, payload_size = FRAME_HEADER.unpack_from(self._buffer, self._offset)
+                frame_end = self._offset + FRAME_HEADER.size + payload_size
+                if len(self._buffer) >= frame_end:
+                    payload = bytes(self._buffer[self._offset + FRAME_HEADER.size:frame_end])
+                    self._offset = frame_end
+                    return message_type, payload
+            # Drop the frames already read before reading more
+            del self._buffer[:self._offset]
+            self._offset = 0
+            data = self._socket.recv(PROTOCOL_RECEIVE_SIZE)
+            if not data:
+                raise ConnectionError("The machine server closed the connection.")
+            self._buffer += data
+
+    def _reply(self, expected_type: int) -> bytes:
+        """
+        Read the reply to the oldest request, keeping the events received before it.
+
+        Args:
+            expected_type (int): The message type of the expected reply.
+
+        Returns:
+            bytes: The payload of the reply.
+
+        Raises:
+            ValueError: If the server replied with an error or an unexpected message.
+        """
+        while True:
+            message_type, payload = self._frame()
+            if message_type == PULL_EVENT:
+                self._events.append(self._decode_pull(payload))
+            elif message_type == expected_type:
+                return payload
+            elif message_type == ERROR_REPLY:
+                raise ValueError(f"Machine server error {ERROR_PAYLOAD.unpack(payload)[0]}.")
+            else:
+                raise ValueError(f"Expected message type {expected_type:#04x}, got {message_type:#04x}.")
+
+    def _decode_pull(self, payload: bytes) -> PullResult:
+        """
+        Decode a pull reply or event payload.
+
+        Args:
+            payload (bytes): The payload.
+
+        Returns:
+            PullResult: The result of the pull.
+        """
+        pull_number, outcome, pull_cost, payout, balance, *reels = self._pull_payload.unpack(payload)
+        return PullResult(pull_number, tuple(reels), tuple(self.values[index] for index in reels),
+                          OUTCOME_CODES[outcome], pull_cost, payout, balance)
+
+    def pull(self) -> PullResult:
+        """
+        Pull once and wait for the result.
+
+        Returns:
+            PullResult: The result of the pull.
+        """
+        return self.pull_many(1)[0]
+
+    def pull_many(self, pulls: int, depth: int = PROTOCOL_PIPELINE_DEPTH) -> list[PullResult]:
+        """
+        Pull several times, sending the requests in pipelined chunks.
+
+        The replies of every chunk are read before the next chunk is sent, so the
+        client never blocks sending while the server blocks on unread replies.
+
+        Args:
+            pulls (int): The number of pulls.
+            depth (int): The largest number of requests sent before reading their replies.
+
+        Returns:
+            list[PullResult]: The results of the pulls, in order.
+        """
+        results: list[PullResult] = []
+        for start in range(0, pulls, depth):
+            chunk = min(depth, pulls - start)
+            self._send(PULL_REQUEST, count=chunk)
+            results += [self._decode_pull(self._reply(PULL_REPLY)) for _ in range(chunk)]
+        return results
+
+    def balance(self) -> int:
+        """
+        Get the balance of the machine.
+
+        Returns:
+            int: The balance.
+        """
+        self._send(BALANCE_REQUEST)
+        return BALANCE_PAYLOAD.unpack(self._reply(BALANCE_REPLY))[0]
+
+    def subscribe(self, enabled: bool = True) -> None:
+        """
+        Turn the pull events of the machine on or off.
+
+        Args:
+            enabled (bool): Whether the server should push the pull events.
+        """
+        self._send(SUBSCRIBE_REQUEST, SUBSCRIBE_PAYLOAD.pack(enabled))
+        self._reply(SUBSCRIBE_REPLY)
+
+    def events(self) -> Iterator[PullResult]:
+        """
+        Get the pull events pushed by the server, waiting for each one.
+
+        Yields:
+            PullResult: The result of every pull made on the machine by any client.
+        """
+        while True:
+            while self._events:
+                yield self._events.popleft()
+            message_type, payload = self._frame()
+            if message_type == PULL_EVENT:
+                self._events.append(self._decode_pull(payload))
+
+    def close(self) -> None:
+        """
+        Close the connection.
+        """
+        self._socket.close()
+
+
+def benchmark(pulls: int = PROTOCOL_BENCHMARK_PULLS, depth: int = PROTOCOL_PIPELINE_DEPTH,
+              socket_path: str = PROTOCOL_SOCKET_PATH) -> dict[str, float]:
+    """
+    Measure pull round trips against a server running in another process.
+
+    Args:
+        pulls (int): The number of pulls of each measurement.
+        depth (int): The number of pipelined pulls sent before reading their replies.
+        socket_path (str): The path of the socket, relative to the source directory.
+
+    Returns:
+        dict[str, float]: The microseconds per pull one at a time and pipelined, and the
+            microseconds to encode and decode one pull reply as a struct and as JSON.
+    """
+    path = resolve_socket_path(socket_path)
+    if os.path.exists(path):
+        os.remove(path)
+    server = Process(target=serve, args=(socket_path,), daemon=True)
+    server.start()
+    while not os.path.exists(path):
+        sleep(0.01)
+    client = MachineClient(socket_path)
+
+    started = perf_counter()
+    for _ in range(pulls):
+        client.pull()
+    sequential = (perf_counter() - started) / pulls
+
+    started = perf_counter()
+    client.pull_many(pulls, depth)
+    pipelined = (perf_counter() - started) / pulls
+
+    result = client.pull()
+    client.close()
+    server.terminate()
+    server.join()
+
+    layout = pull_struct(len(result.reels))
+    fields = (result.pull_number, OUTCOME_CODES.index(result.outcome), result.pull_cost, result.payout,
+              result.balance, *result.reels)
+    started = perf_counter()
+    for _ in range(pulls):
+        layout.unpack(layout.pack(*fields))
+    packed = (perf_counter() - started) / pulls
+    document = {"pull_number": result.pull_number, "reels": list(result.reels), "outcome": result.outcome,
+                "pull_cost": result.pull_cost, "payout": result.payout, "balance": result.balance}
+    started = perf_counter()
+    for _ in range(pulls):
+        json.loads(json.dumps(document))
+    encoded = (perf_counter() - started) / pulls
+
+    return {
+        "round_trip_us": sequential * 1_000_000,
+        "pipelined_us": pipelined * 1_000_000,
+        "struct_codec_us": packed * 1_000_000,
+        "json_codec_us": encoded * 1_000_000
+    }
+
+
+def serve(socket_path: str = PROTOCOL_SOCKET_PATH) -> None:
+    """
+    Serve a new headless machine until the process is stopped.
+
+    Args:
+        socket_path (str): The path of the socket, relative to the source directory.
+    """
+    server = MachineServer(socket_path=socket_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+
+
+def main() -> None:
+    """
+    Serve the machine, or benchmark the protocol.
+    """
+    parser = argparse.ArgumentParser(description="Binary protocol of a headless machine over a Unix domain socket.")
+    parser.add_argument("--socket", default=PROTOCOL_SOCKET_PATH, help="Socket path, relative to the source directory.")
+    parser.add_argument("--benchmark", action="store_true", help="Measure pull round trips instead of serving.")
+    parser.add_argument("--pulls", type=int, default=PROTOCOL_BENCHMARK_PULLS, help="Pulls of each measurement.")
+    parser.add_argument("--depth", type=int, default=PROTOCOL_PIPELINE_DEPTH, help="Pipelined pulls per write.")
+    arguments = parser.parse_args()
+
+    if arguments.benchmark:
+        for name, value in benchmark(arguments.pulls, arguments.depth, arguments.socket).items():
+            print(f"{name}: {value:.2f}")
+    else:
+        print(f"Serving on {resolve_socket_path(arguments.socket)}")
+        serve(arguments.socket)
+
+
+if __name__ == "__main__":
+    main()
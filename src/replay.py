@@ -0,0 +1,416 @@
+"""
+This module provides a viewer that plays back a recorded session.
+
+A session can be loaded from JSON log files (written with LOGGER_JSON_MODE,
+rotated segments and compressed ".gz" segments included) or from a session
+store directory. Every recorded pull holds the full state the player saw after
+it (slot values, balance and outcome), so each frame is a snapshot of its own:
+seeking to any pull shows it directly, without replaying the pulls before it.
+
+Frames are drawn through the regular display path ("Machine.update_slots",
+"Money.update_money" and the messages) at the recorded pace (1x), ten times
+faster (10x) or as fast as the screen allows (max).
+
+Controls:
+- Space: pause or resume.
+- Left and Right: previous and next pull.
+- Home and End: first and last pull.
+- G: go to a pull number.
+- 1, 2 and 3: 1x, 10x and max speed.
+- Escape: exit.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from dataclasses import dataclass, replace
+from functools import partial
+from turtle import Screen, Turtle, mainloop
+from typing import Any, Iterator
+from slot import SlotValue
+from machine import Machine
+from messages import Instructions, Messages
+from money import Money
+from logger import Logger
+from session_store import SessionStore
+from profiles import GameConfig, compile_config, load_profile
+from game_math import LOSS_OUTCOME, WIN_OUTCOME, JACKPOT_OUTCOME
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_BG_COLOR, SCREEN_TITLE, KEY_TO_EXIT,
+    NUMBER_OF_SLOTS, CONFIG_PROFILE, REPLAY_PULL_INTERVAL_MS,
+    REPLAY_MAX_GAP_MS, REPLAY_FAST_FACTOR, INSTRUCTIONS_X_POSITION, INSTRUCTIONS_Y_POSITION,
+    HOW_TO_EXIT_FONT, INSTRUCTIONS_COLOR
+)
+
+# Playback speeds, None plays as fast as the screen allows
+REPLAY_SPEEDS: dict[str, float | None] = {"1x": 1.0, "10x": REPLAY_FAST_FACTOR, "max": None}
+
+# Outcome events of the JSON log and the outcome they record
+_LOG_OUTCOMES: dict[str, str] = {"lost": LOSS_OUTCOME, "won": WIN_OUTCOME, "jackpot_won": JACKPOT_OUTCOME}
+
+
+@dataclass(frozen=True)
+class ReplayFrame:
+    """
+    Represents what the player saw after one recorded pull.
+
+    Attributes:
+        pull_number (int): The number of the pull in the recording, starting from 1.
+        values (tuple[SlotValue, ...]): The value shown on each main slot.
+        balance (int): The player's money after the pull.
+        outcome (str): The outcome of the pull (loss, win or jackpot).
+        amount (int): The amount won or lost, as shown in the message.
+        cycles (int | None): The number of cycles the slots spun, None if not recorded, 0 for a timed spin.
+        time (float | None): The time of the pull in seconds since the epoch, None if not recorded.
+    """
+    pull_number: int
+    values: tuple[SlotValue, ...]
+    balance: int
+    outcome: str
+    amount: int
+    cycles: int | None = None
+    time: float | None = None
+
+
+def _read_records(log_file: str) -> Iterator[dict[str, Any]]:
+    """
+    Read the records of a JSON log file, compressed or not.
+
+    Args:
+        log_file (str): The path of the log file.
+
+    Yields:
+        dict[str, Any]: The records in the order they were written.
+    """
+    opener = gzip.open if log_file.endswith(".gz") else open
+    with opener(log_file, mode="rt", encoding="utf-8") as records:
+        for line in records:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_log(log_files: list[str]) -> list[ReplayFrame]:
+    """
+    Load the pulls recorded in JSON log files.
+
+    Pull summary records are used when the log has them, otherwise the won,
+    jackpot and lost records together with the preceding pull started record.
+
+    Args:
+        log_files (list[str]): The paths of the log files of one session, in the order they were written.
+
+    Returns:
+        list[ReplayFrame]: The recorded pulls.
+    """
+    records = [record for log_file in log_files for record in _read_records(log_file)]
+    summaries = [record for record in records if record["event"] == "pull_summary"]
+
+    frames: list[ReplayFrame] = []
+    if summaries:
+        for record in summaries:
+            frames.append(ReplayFrame(len(frames) + 1, tuple(record["slots"]), record["balance"], record["outcome"],
+                                      record["amount"], record["cycles"], record["ts"]))
+        return frames
+
+    cycles = None
+    for record in records:
+        if record["event"] == "pull_started":
+            cycles = record["cycles"]
+        elif record["event"] in _LOG_OUTCOMES:
+            frames.append(ReplayFrame(len(frames) + 1, tuple(record["slots"]), record["balance"],
+                                      _LOG_OUTCOMES[record["event"]], record["amount"], cycles, record["ts"]))
+            cycles = None
+    return frames
+
+
+def load_journal(directory: str, number_of_reels: int = NUMBER_OF_SLOTS,
+                 game_config: GameConfig | None = None) -> list[ReplayFrame]:
+    """
+    Load the pulls recorded in a session store, without writing to it.
+
+    The journal only holds the pulls after the last snapshot, so the snapshot
+    is the first frame and at most SESSION_SNAPSHOT_INTERVAL pulls are played
+    back. Outcomes are derived from the slot values, and amounts from the change
+    of the balance, or from the paytable for the snapshot.
+
+    Args:
+        directory (str): The session store directory.
+        number_of_reels (int): The number of reels the session was played with.
+        game_config (GameConfig | None): The game values the session was played with,
+            or None for the values of config.py.
+
+    Returns:
+        list[ReplayFrame]: The recorded pulls.
+
+    Raises:
+        FileNotFoundError: If the directory holds no session journal.
+        ValueError: If the journal was written for a different number of reels.
+    """
+    session_store = SessionStore(number_of_reels, directory, read_only=True)
+    try:
+        snapshot = session_store.load_snapshot()
+        checkpoints = ([snapshot] if snapshot is not None else []) + session_store.records()
+    finally:
+        session_store.close()
+
+    game_config = game_config if game_config is not None else compile_config()
+    values = game_config.slot_values
+    paytable = replace(game_config.paytable, number_of_slots=number_of_reels)
+    frames = []
+    previous_balance = None
+    for checkpoint in checkpoints:
+        shown = tuple(values[index] for index in checkpoint.reels)
+        evaluation = paytable.evaluate(checkpoint.reels, game_config.jackpot_index)
+        payout = paytable.payout(evaluation)
+        outcome, amount = evaluation.outcome, payout - paytable.pull_cost if payout else paytable.pull_cost
+        if previous_balance is not None:
+            # The balance change also covers a progressive jackpot of unknown size
+            amount = abs(checkpoint.balance - previous_balance)
+        if checkpoint.pull_number > 0:
+            frames.append(ReplayFrame(checkpoint.pull_number, shown, checkpoint.balance, outcome, amount))
+        previous_balance = checkpoint.balance
+    return frames
+
+
+class ReplayViewer:
+    """
+    Represents the playback of recorded frames on the slot machine display.
+
+    Attributes:
+        machine (Machine): The slot machine whose display shows the frames.
+        frames (list[ReplayFrame]): The recorded pulls.
+        position (int): The index of the frame on display, -1 before the first one.
+        speed (str): The playback speed, one of "REPLAY_SPEEDS".
+        playing (bool): Indicates whether the playback is running.
+    """
+
+    def __init__(self, screen: Any, machine: Machine, frames: list[ReplayFrame], speed: str = "1x") -> None:
+        """
+        Initialize a new ReplayViewer instance.
+
+        Args:
+            screen (Any): The turtle screen showing the machine.
+            machine (Machine): The slot machine whose display shows the frames.
+            frames (list[ReplayFrame]): The recorded pulls.
+            speed (str): The playback speed, one of "REPLAY_SPEEDS".
+        """
+        self.screen: Any = screen
+        self.machine: Machine = machine
+        self.frames: list[ReplayFrame] = frames
+        self.position: int = -1
+        self.speed: str = speed
+        self.playing: bool = False
+        self._scheduled: int = 0
+        self._status: Turtle = Turtle()
+        self._status.hideturtle()
+        self._status.penup()
+        self._status.color(INSTRUCTIONS_COLOR)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the ReplayViewer object.
+
+        Returns:
+            str: A string representation of the ReplayViewer object.
+        """
+        return f"ReplayViewer(frames={len(self.frames)}, position={self.position}, speed={self.speed})"
+
+    def show(self, position: int) -> None:
+        """
+        Show a frame directly, without showing the frames before it.
+
+        Args:
+            position (int): The index of the frame, clamped to the recording.
+        """
+        if not self.frames:
+            return
+        self.position = max(0, min(position, len(self.frames) - 1))
+        frame = self.frames[self.position]
+        machine = self.machine
+
+        for slot, value in zip(machine.main_slots, frame.values):
+            slot.value = value
+        machine.update_slots()
+        machine.money.money = frame.balance
+        machine.money.update_money()
+
+        if frame.outcome == JACKPOT_OUTCOME:
+            machine.messages.player_won_jackpot_message(frame.amount)
+        elif frame.outcome == WIN_OUTCOME:
+            machine.messages.player_won_message(frame.amount)
+        else:
+            machine.messages.player_lost_message(frame.amount)
+        self.show_status()
+
+    def show_status(self) -> None:
+        """
+        Show the pull number, speed and playback state below the machine.
+        """
+        frame = self.frames[self.position]
+        state = "playing" if self.playing else "paused"
+        cycles = f", {frame.cycles} cycles" if frame.cycles else ""
+        self._status.clear()
+        self._status.goto(INSTRUCTIONS_X_POSITION, INSTRUCTIONS_Y_POSITION)
+        self._status.write(f"Pull {frame.pull_number} ({self.position + 1} of {len(self.frames)}{cycles}) "
+                           f"- {self.speed} {state}\nSpace play/pause, Left/Right step, G go to pull, "
+                           f"1/2/3 speed", align="center", font=HOW_TO_EXIT_FONT)
+
+    def seek(self, pull_number: int) -> None:
+        """
+        Show the frame of a pull number.
+
+        Args:
+            pull_number (int): The recorded pull number, frames are searched by number.
+        """
+        numbers = [frame.pull_number for frame in self.frames]
+        position = next((index for index, number in enumerate(numbers) if number >= pull_number), len(numbers) - 1)
+        self.show(position)
+
+    def step(self, frames: int) -> None:
+        """
+        Pause the playback and move by a number of frames.
+
+        Args:
+            frames (int): The number of frames to move, negative to move back.
+        """
+        self.playing = False
+        self.show(self.position + frames)
+
+    def set_speed(self, speed: str) -> None:
+        """
+        Change the playback speed.
+
+        Args:
+            speed (str): The new speed, one of "REPLAY_SPEEDS".
+        """
+        self.speed = speed
+        self.screen.tracer(0 if REPLAY_SPEEDS[speed] is None else 1)
+        if self.position >= 0:
+            self.show_status()
+
+    def toggle(self) -> None:
+        """
+        Pause a running playback, or resume a paused one.
+        """
+        self.playing = not self.playing
+        if self.playing:
+            self._schedule(0)
+        elif self.position >= 0:
+            self.show_status()
+
+    def _interval(self) -> int:
+        """
+        Get the delay before the next frame at the current speed.
+
+        Returns:
+            int: The delay in milliseconds.
+        """
+        factor = REPLAY_SPEEDS[self.speed]
+        if factor is None:
+            return 1
+        current = self.frames[self.position] if self.position >= 0 else None
+        following = self.frames[self.position + 1] if self.position + 1 < len(self.frames) else None
+        if current is not None and following is not None and current.time is not None and following.time is not None:
+            interval = min((following.time - current.time) * 1000, REPLAY_MAX_GAP_MS)
+        else:
+            interval = REPLAY_PULL_INTERVAL_MS
+        return max(1, int(interval / factor))
+
+    def _schedule(self, delay: int) -> None:
+        """
+        Schedule the next frame, replacing any frame already scheduled.
+
+        Args:
+            delay (int): The delay in milliseconds.
+        """
+        self._scheduled += 1
+        scheduled = self._scheduled
+        self.screen.ontimer(lambda: self._advance(scheduled), delay)
+
+    def _advance(self, scheduled: int) -> None:
+        """
+        Show the next frame and schedule the one after it.
+
+        Args:
+            scheduled (int): The number of the schedule, outdated schedules are ignored.
+        """
+        if not self.playing or scheduled != self._scheduled:
+            return
+        if self.position + 1 >= len(self.frames):
+            self.playing = False
+            self.show_status()
+            return
+        self.show(self.position + 1)
+        if REPLAY_SPEEDS[self.speed] is None:
+            self.screen.update()
+        self._schedule(self._interval())
+
+    def ask_pull_number(self) -> None:
+        """
+        Ask for a pull number and show its frame.
+        """
+        self.playing = False
+        pull_number = self.screen.numinput("Go to pull", "Pull number:", minval=1)
+        self.screen.listen()
+        if pull_number is not None:
+            self.seek(int(pull_number))
+
+
+def main() -> None:
+    """
+    Load a recorded session and start the replay viewer.
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded slot machine session.")
+    parser.add_argument("source", nargs="+",
+                        help="JSON log files of one session in order (.jsonl or .jsonl.gz), "
+                             "or a session store directory.")
+    parser.add_argument("--speed", choices=REPLAY_SPEEDS, default="1x", help="Playback speed.")
+    parser.add_argument("--seek", type=int, default=1, help="Pull number shown first.")
+    parser.add_argument("--paused", action="store_true", help="Start paused.")
+    parser.add_argument("--profile", default=CONFIG_PROFILE,
+                        help="Config profile a session store was played with, relative to src.")
+    arguments = parser.parse_args()
+
+    if len(arguments.source) == 1 and os.path.isdir(arguments.source[0]):
+        game_config = load_profile(arguments.profile) if arguments.profile is not None else None
+        frames = load_journal(os.path.abspath(arguments.source[0]), game_config=game_config)
+    else:
+        frames = load_log(arguments.source)
+    if not frames:
+        print("No recorded pulls found.")
+        sys.exit(1)
+
+    screen = Screen()
+    screen.setup(width=SCREEN_WIDTH, height=SCREEN_HEIGHT)
+    screen.bgcolor(SCREEN_BG_COLOR)
+    screen.title(f"{SCREEN_TITLE} - Replay")
+    screen.tracer(0)
+
+    money = Money()
+    machine = Machine(money, Instructions(), Messages(), Logger(logger_on=False))
+    machine.instructions.hide_instructions()
+    viewer = ReplayViewer(screen, machine, frames)
+    viewer.seek(arguments.seek)
+    screen.update()
+    viewer.set_speed(arguments.speed)
+
+    screen.listen()
+    screen.onkey(viewer.toggle, "space")
+    screen.onkey(lambda: viewer.step(1), "Right")
+    screen.onkey(lambda: viewer.step(-1), "Left")
+    screen.onkey(lambda: viewer.step(-len(frames)), "Home")
+    screen.onkey(lambda: viewer.step(len(frames)), "End")
+    screen.onkey(viewer.ask_pull_number, "g")
+    for key, speed in zip(("1", "2", "3"), REPLAY_SPEEDS):
+        screen.onkey(partial(viewer.set_speed, speed), key)
+    screen.onkey(screen.bye, KEY_TO_EXIT)
+
+    if not arguments.paused:
+        viewer.toggle()
+    mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+"""
+This module provides the random number backends used for drawing slot values.
+
+Drawing a slot value with "random.choice" costs a full call into the random
+module for every reel of every cycle. The bulk backend instead prefetches large
+blocks of random 32-bit words and hands out indices from the buffer, turning
+each word into an index below the number of values with rejection sampling so
+every index stays exactly equally likely. Many indices can be drawn at once,
+and the secure variant refills its buffer from the operating system on a
+background thread.
+
+The backend used by the slots and the machine is chosen by RNG_BACKEND in
+config.py and can be replaced with "set_random_backend".
+
+Every backend may be drawn from by many threads at once, as the machines of a
+thread pool share the backend of this module: the bulk backend hands out each
+buffered word under a lock, so no two draws get the same word and a refill
+never happens in the middle of a draw, and the standard backend relies on the
+random module, whose calls are atomic. A backend is closed once no thread draws
+from it any more.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from array import array
+from queue import Full, Queue
+from random import Random
+from threading import Event, Lock, Thread
+from typing import Any
+from config import RNG_BACKEND, RNG_BLOCK_SIZE, RNG_PREFETCH_BLOCKS
+
+STANDARD_BACKEND: str = "standard"
+BULK_BACKEND: str = "bulk"
+SECURE_BACKEND: str = "secure"
+RANDOM_BACKENDS: tuple[str, ...] = (STANDARD_BACKEND, BULK_BACKEND, SECURE_BACKEND)
+
+_WORD_RANGE: int = 1 << 32
+
+
+class RandomBackend(ABC):
+    """
+    Represents a source of random indices.
+
+    Subclasses implement "index", "getstate" and "setstate", the other methods
+    are built on them.
+    """
+
+    @abstractmethod
+    def index(self, bound: int) -> int:
+        """
+        Draw a random index.
+
+        Args:
+            bound (int): The number of possible indices.
+
+        Returns:
+            int: An index from 0 up to but not including the bound.
+        """
+
+    def indices(self, bound: int, count: int) -> list[int]:
+        """
+        Draw many random indices, as consecutive calls of "index" would.
+
+        Args:
+            bound (int): The number of possible indices.
+            count (int): The number of indices to draw.
+
+        Returns:
+            list[int]: The indices.
+        """
+        return [self.index(bound) for _ in range(count)]
+
+    def randint(self, low: int, high: int) -> int:
+        """
+        Draw a random integer in a range, including both ends.
+
+        Args:
+            low (int): The lowest possible integer.
+            high (int): The highest possible integer.
+
+        Returns:
+            int: The integer.
+        """
+        return low + self.index(high - low + 1)
+
+    @abstractmethod
+    def getstate(self) -> Any:
+        """
+        Get the internal state, so the same draws can be repeated later.
+
+        Returns:
+            Any: The state, or None if the draws cannot be repeated.
+        """
+
+    @abstractmethod
+    def setstate(self, state: Any) -> None:
+        """
+        Restore an internal state returned by "getstate".
+
+        Args:
+            state (Any): The state to restore.
+        """
+
+    def close(self) -> None:
+        """
+        Release any resources held by the backend.
+        """
+
+
+class StandardBackend(RandomBackend):
+    """
+    Represents a backend drawing every index with a separate call of the random module.
+
+    Attributes:
+        source (Random): The random number generator.
+    """
+
+    def __init__(self, source: Random | None = None) -> None:
+        """
+        Initialize a new StandardBackend instance.
+
+        Args:
+            source (Random | None): The random number generator, or None to create a new one.
+        """
+        self.source: Random = source if source is not None else Random()
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the StandardBackend object.
+
+        Returns:
+            str: A string representation of the StandardBackend object.
+        """
+        return "StandardBackend()"
+
+    def index(self, bound: int) -> int:
+        """
+        Draw a random index.
+
+        Args:
+            bound (int): The number of possible indices.
+
+        Returns:
+            int: An index from 0 up to but not including the bound.
+        """
+        return self.source.randrange(bound)
+
+    def getstate(self) -> Any:
+        """
+        Get the internal state of the random number generator.
+
+        Returns:
+            Any: The state as returned by "Random.getstate".
+        """
+        return self.source.getstate()
+
+    def setstate(self, state: Any) -> None:
+        """
+        Restore an internal state of the random number generator.
+
+        Args:
+            state (Any): The state as returned by "Random.getstate".
+        """
+        self.source.setstate(state)
+
+
+class _SecureRefill(Thread):
+    """
+    A background thread that keeps blocks of operating system random words ready.
+    """
+
+    def __init__(self, block_size: int, prefetch_blocks: int) -> None:
+        """
+        Initialize a new _SecureRefill instance.
+
+        Args:
+            block_size (int): The number of words in every block.
+            prefetch_blocks (int): The number of blocks kept ready.
+        """
+        super().__init__(daemon=True)
+        self.block_size: int = block_size
+        self.blocks: Queue[array] = Queue(maxsize=prefetch_blocks)
+        self.stopped: Event = Event()
+
+    def run(self) -> None:
+        """
+        Generate blocks until stopped, waiting while enough blocks are ready.
+        """
+        while not self.stopped.is_set():
+            block = array("I")
+            block.frombytes(os.urandom(self.block_size * block.itemsize))
+            while not self.stopped.is_set():
+                try:
+                    self.blocks.put(block, timeout=0.1)
+                    break
+                except Full:
+                    continue
+
+
+class BulkBackend(RandomBackend):
+    """
+    Represents a backend handing out indices from prefetched blocks of random words.
+
+    Blocks are generated with "Random.getrandbits", or taken from the operating
+    system's secure source when secure. A word is turned into an index by taking
+    it modulo the bound, and words from the incomplete last range are skipped.
+
+    Attributes:
+        source (Random | None): The random number generator, or None for the secure source.
+        block_size (int): The number of words in every block.
+    """
+
+    def __init__(self, source: Random | None = None, block_size: int = RNG_BLOCK_SIZE, secure: bool = False,
+                 prefetch_blocks: int = RNG_PREFETCH_BLOCKS) -> None:
+        """
+        Initialize a new BulkBackend instance.
+
+        Args:
+            source (Random | None): The random number generator, or None to create a new one.
+                Ignored when secure.
+            block_size (int): The number of words in every block.
+            secure (bool): Indicates whether blocks come from the operating system's secure source.
+            prefetch_blocks (int): The number of secure blocks generated ahead on a background thread.
+        """
+        self.source: Random | None = None if secure else (source if source is not None else Random())
+        self.block_size: int = block_size
+        self._words: array = array("I")
+        self._position: int = 0
+        self._block_state: Any = None
+        self._limits: dict[int, int] = {}
+        self._refill_thread: _SecureRefill | None = None
+        # Draws, refills and state changes of concurrent threads take turns
+        self._lock: Lock = Lock()
+        if secure:
+            self._refill_thread = _SecureRefill(block_size, prefetch_blocks)
+            self._refill_thread.start()
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the BulkBackend object.
+
+        Returns:
+            str: A string representation of the BulkBackend object.
+        """
+        return (f"BulkBackend(block_size={self.block_size}, secure={self.source is None}, "
+                f"buffered={len(self._words) - self._position})")
+
+    def _refill(self) -> None:
+        """
+        Replace the exhausted buffer with a new block of words, with the lock held.
+        """
+        source = self.source
+        if source is None:
+            assert self._refill_thread is not None  # Secure backends always have a refill thread
+            self._words = self._refill_thread.blocks.get()
+        else:
+            # The generator state before the block is kept, packed into an array, so the block can be generated again
+            version, internal_state, gauss_next = source.getstate()
+            self._block_state = version, array("I", internal_state), gauss_next
+            words = array("I")
+            words.frombytes(source.getrandbits(self.block_size * 32).to_bytes(self.block_size * 4, "little"))
+            self._words = words
+        self._position = 0
+
+    def _limit(self, bound: int) -> int:
+        """
+        Get the number of word values that map evenly onto a bound.
+
+        Args:
+            bound (int): The number of possible indices.
+
+        Returns:
+            int: The word values below this limit are accepted.
+        """
+        limit = self._limits.get(bound)
+        if limit is None:
+            if not 0 < bound <= _WORD_RANGE:
+                raise ValueError(f"Bound must be between 1 and {_WORD_RANGE}, got {bound}.")
+            limit = self._limits[bound] = _WORD_RANGE - _WORD_RANGE % bound
+        return limit
+
+    def index(self, bound: int) -> int:
+        """
+        Draw a random index from the buffer.
+
+        Args:
+            bound (int): The number of possible indices.
+
+        Returns:
+            int: An index from 0 up to but not including the bound.
+        """
+        limit = self._limits.get(bound) or self._limit(bound)
+        with self._lock:
+            words, position = self._words, self._position
+            while True:
+                if position >= len(words):
+                    self._refill()
+                    words, position = self._words, 0
+                word = words[position]
+                position += 1
+                if word < limit:
+                    self._position = position
+                    return word % bound
+
+    def indices(self, bound: int, count: int) -> list[int]:
+        """
+        Draw many random indices from the buffer, as consecutive calls of "index" would.
+
+        Args:
+            bound (int): The number of possible indices.
+            count (int): The number of indices to draw.
+
+        Returns:
+            list[int]: The indices.
+        """
+        limit = self._limits.get(bound) or self._limit(bound)
+        drawn: list[int] = []
+        with self._lock:
+            while len(drawn) < count:
+                if self._position >= len(self._words):
+                    self._refill()
+                end = min(self._position + count - len(drawn), len(self._words))
+                drawn.extend([word % bound for word in self._words[self._position:end] if word < limit])
+                self._position = end
+        return drawn
+
+    def getstate(self) -> Any:
+        """
+        Get the internal state, made of the generator state before the current block and the buffer position.
+
+        Returns:
+            Any: The state, or None for the secure source, whose draws cannot be repeated.
+        """
+        if self.source is None:
+            return None
+        with self._lock:
+            if self._block_state is None:
+                return self.source.getstate(), 0
+            version, internal_state, gauss_next = self._block_state
+            return (version, tuple(internal_state), gauss_next), self._position
+
+    def setstate(self, state: Any) -> None:
+        """
+        Restore an internal state returned by "getstate", generating the current block again.
+
+        Args:
+            state (Any): The state to restore, None is ignored.
+
+        Raises:
+            ValueError: If the state was not returned by a bulk backend.
+        """
+        if state is None or self.source is None:
+            return
+        if not (isinstance(state, tuple) and len(state) == 2):
+            raise ValueError("Random state was not saved by a bulk backend.")
+        block_state, position = state
+        with self._lock:
+            self.source.setstate(block_state)
+            self._refill()
+            self._position = position
+
+    def close(self) -> None:
+        """
+        Stop the background refill thread of the secure source.
+        """
+        if self._refill_thread is not None:
+            self._refill_thread.stopped.set()
+            self._refill_thread.join()
+            self._refill_thread = None
+
+
+def create_random_backend(name: str = RNG_BACKEND, source: Random | None = None) -> RandomBackend:
+    """
+    Create a random backend by name.
+
+    Args:
+        name (str): The backend name (standard, bulk or secure).
+        source (Random | None): The random number generator, or None to create a new one.
+            Ignored by the secure backend.
+
+    Returns:
+        RandomBackend: The new backend.
+
+    Raises:
+        ValueError: If the name is not a known backend.
+    """
+    if name == STANDARD_BACKEND:
+        return StandardBackend(source)
+    if name == BULK_BACKEND:
+        return BulkBackend(source)
+    if name == SECURE_BACKEND:
+        return BulkBackend(secure=True)
+    raise ValueError(f"Unknown random backend {name}, expected one of {', '.join(RANDOM_BACKENDS)}.")
+
+
+_random_backend: RandomBackend | None = None
+_random_backend_lock: Lock = Lock()
+
+
+def get_random_backend() -> RandomBackend:
+    """
+    Get the backend shared by the slots and the machine, creating it on first use.
+
+    Returns:
+        RandomBackend: The shared backend.
+    """
+    global _random_backend
+    if _random_backend is None:
+        with _random_backend_lock:
+            if _random_backend is None:
+                _random_backend = create_random_backend()
+    return _random_backend
+
+
+def set_random_backend(backend: RandomBackend) -> None:
+    """
+    Replace the backend shared by the slots and the machine.
+
+    Args:
+        backend (RandomBackend): The new backend.
+    """
+    global _random_backend
+    _random_backend = backend
@@ -0,0 +1,137 @@
+"""
+This module defines the SessionStats class, which shows how the machine is actually running.
+
+Next to the theoretical RTP, the session statistics show the number of pulls,
+the totals wagered and won, the observed RTP, the hit rate, the longest losing
+streak and the biggest win since the game started. Every figure is kept as a
+running total updated in constant time from the pull events, so nothing is
+recomputed from the history, and the display is only redrawn when its text
+changes.
+"""
+
+from turtle import Turtle
+from events import EventBus, Event, PullStarted, Won, JackpotWon, Lost, OUTCOME_EVENTS
+from config import (
+    SESSION_STATS_ALIGNMENT, SESSION_STATS_FONT, SESSION_STATS_COLOR,
+    SESSION_STATS_X_POSITION, SESSION_STATS_Y_POSITION
+)
+
+
+class SessionStats(Turtle):
+    """
+    Represents the session statistics display for the slot machine.
+
+    Attributes:
+        pulls (int): The number of completed pulls.
+        wagered (int): The total of the pull costs paid.
+        won (int): The total of the prizes paid, not counting the pull costs.
+        wins (int): The number of pulls paying a prize.
+        losing_streak (int): The number of losing pulls since the latest win.
+        longest_losing_streak (int): The largest number of losing pulls in a row.
+        biggest_win (int): The largest prize of a single pull, not counting the pull cost.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the SessionStats object without any pulls.
+        """
+        super().__init__()
+        self.color(SESSION_STATS_COLOR)
+        self.penup()
+        self.hideturtle()
+        self.goto(SESSION_STATS_X_POSITION, SESSION_STATS_Y_POSITION)
+        self.pulls: int = 0
+        self.wagered: int = 0
+        self.won: int = 0
+        self.wins: int = 0
+        self.losing_streak: int = 0
+        self.longest_losing_streak: int = 0
+        self.biggest_win: int = 0
+        self._pull_cost: int = 0
+        self._shown_text: str | None = None
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the SessionStats object.
+
+        Returns:
+            str: A string representation of the SessionStats object.
+        """
+        return (f"SessionStats(pulls={self.pulls}, wagered={self.wagered}, won={self.won}, "
+                f"observed_rtp={self.observed_rtp:.2f})")
+
+    @property
+    def observed_rtp(self) -> float:
+        """
+        Get the Return to Player (RTP) observed in the session.
+
+        Returns:
+            float: The RTP as a percentage, 0 before the first pull.
+        """
+        return self.won / self.wagered * 100 if self.wagered else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Get the share of pulls paying a prize.
+
+        Returns:
+            float: The hit rate as a percentage, 0 before the first pull.
+        """
+        return self.wins / self.pulls * 100 if self.pulls else 0.0
+
+    def subscribe(self, event_bus: EventBus) -> None:
+        """
+        Update the statistics from the pull events.
+
+        Args:
+            event_bus (EventBus): The bus publishing the pull events.
+        """
+        event_bus.subscribe(self.pull_started, PullStarted)
+        event_bus.subscribe(self.pull_finished, *OUTCOME_EVENTS)
+
+    def pull_started(self, event: PullStarted) -> None:
+        """
+        Count the cost of a pull.
+
+        Args:
+            event (PullStarted): The published event.
+        """
+        self._pull_cost = event.pull_cost
+        self.wagered += event.pull_cost
+
+    def pull_finished(self, event: Event) -> None:
+        """
+        Count the result of a pull and show the updated statistics.
+
+        Args:
+            event (Event): The published outcome event.
+        """
+        self.pulls += 1
+        if isinstance(event, Lost):
+            self.losing_streak += 1
+            self.longest_losing_streak = max(self.longest_losing_streak, self.losing_streak)
+        elif isinstance(event, (Won, JackpotWon)):
+            prize = event.amount + self._pull_cost
+            self.won += prize
+            self.wins += 1
+            self.losing_streak = 0
+            self.biggest_win = max(self.biggest_win, prize)
+        self.show_stats()
+
+    def show_stats(self) -> None:
+        """
+        Display the session statistics, if they changed since they were last displayed.
+        """
+        text = (f"Pulls: {self.pulls}\n"
+                f"Wagered: ${self.wagered}\n"
+                f"Won: ${self.won}\n"
+                f"Observed RTP: {self.observed_rtp:.2f}%\n"
+                f"Hit rate: {self.hit_rate:.2f}%\n"
+                f"Longest losing streak: {self.longest_losing_streak}\n"
+                f"Biggest win: ${self.biggest_win}")
+        if text == self._shown_text:
+            return
+        self._shown_text = text
+        self.clear()
+        self.write(text, align=SESSION_STATS_ALIGNMENT, font=SESSION_STATS_FONT)
@@ -0,0 +1,366 @@
+"""
+This module provides crash-safe checkpoints of a slot machine session.
+
+Every pull appends a small fixed-size binary record (pull number, balance and
+reel indices) to a write-ahead journal. Records are written to the operating
+system immediately, so they survive a crash of the process, while the costly
+fsync that makes them survive a power loss is shared by a group of pulls, and
+made by a timer once the first record of a group has waited
+SESSION_GROUP_COMMIT_MS, so the last records of a burst are not left waiting.
+Periodic snapshots store the full state, including the random number generator
+state, after which the journal is compacted back to its header.
+
+Recovery reads the snapshot and only the last valid journal record, so it takes
+the same time however long the session has been.
+"""
+
+import json
+import os
+import struct
+from dataclasses import dataclass
+from threading import Lock, Timer
+from typing import Any
+from zlib import crc32
+from config import (
+    SESSION_DIRECTORY, SESSION_GROUP_COMMIT_PULLS, SESSION_GROUP_COMMIT_MS,
+    SESSION_SNAPSHOT_INTERVAL
+)
+
+JOURNAL_FILE: str = "journal.wal"
+SNAPSHOT_FILE: str = "snapshot.json"
+
+# Journal header: magic, format version and number of reels
+_JOURNAL_MAGIC: bytes = b"SLOTWAL"
+_JOURNAL_VERSION: int = 1
+_JOURNAL_HEADER: struct.Struct = struct.Struct("<7sBH")
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Represents the state of a session after a pull.
+
+    Attributes:
+        pull_number (int): The number of pulls played.
+        balance (int): The player's money.
+        reels (tuple[int, ...]): The index of the value shown on each main slot.
+        rng_state (Any): The random backend state as returned by "RandomBackend.getstate",
+            only stored in snapshots.
+    """
+    pull_number: int
+    balance: int
+    reels: tuple[int, ...]
+    rng_state: Any = None
+
+
+@dataclass(frozen=True)
+class Recovery:
+    """
+    Represents the state recovered from the session store.
+
+    Attributes:
+        snapshot (Checkpoint | None): The last snapshot, or None if there is none.
+        latest (Checkpoint | None): The most recent state, from the journal or the snapshot.
+        pulls_since_snapshot (int): The number of pulls played after the snapshot was taken.
+    """
+    snapshot: Checkpoint | None
+    latest: Checkpoint | None
+    pulls_since_snapshot: int
+
+
+def _to_json_state(rng_state: Any) -> Any:
+    """
+    Convert a random backend state into JSON-compatible lists.
+
+    Args:
+        rng_state (Any): The state as returned by "RandomBackend.getstate".
+
+    Returns:
+        Any: The state with tuples converted to lists.
+    """
+    if isinstance(rng_state, tuple):
+        return [_to_json_state(item) for item in rng_state]
+    return rng_state
+
+
+def _from_json_state(json_state: Any) -> Any:
+    """
+    Convert JSON lists back into a random backend state.
+
+    Args:
+        json_state (Any): The state loaded from JSON.
+
+    Returns:
+        Any: The state with lists converted back to tuples, as "RandomBackend.setstate" expects.
+    """
+    if isinstance(json_state, list):
+        return tuple(_from_json_state(item) for item in json_state)
+    return json_state
+
+
+class SessionStore:
+    """
+    Represents the write-ahead journal and snapshot of one session.
+
+    Attributes:
+        directory (str): The directory holding the journal and snapshot.
+        number_of_reels (int): The number of reel indices in every record.
+        group_commit_pulls (int): The number of records shared by one fsync.
+        group_commit_ms (float): The longest time a written record waits for its fsync.
+        snapshot_interval (int): The number of records between snapshots.
+        records_since_snapshot (int): The number of records appended after the last snapshot.
+        read_only (bool): Indicates whether the store was opened only to read an existing session.
+    """
+
+    def __init__(self, number_of_reels: int, directory: str = SESSION_DIRECTORY,
+                 group_commit_pulls: int = SESSION_GROUP_COMMIT_PULLS,
+                 group_commit_ms: float = SESSION_GROUP_COMMIT_MS,
+                 snapshot_interval: int = SESSION_SNAPSHOT_INTERVAL, read_only: bool = False) -> None:
+        """
+        Open the session store, creating the directory and journal if needed unless it is read-only.
+
+        Args:
+            number_of_reels (int): The number of reel indices in every record.
+            directory (str): The directory holding the journal and snapshot, relative to the source directory.
+            group_commit_pulls (int): The number of records shared by one fsync.
+            group_commit_ms (float): The longest time a written record waits for its fsync.
+            snapshot_interval (int): The number of records between snapshots.
+            read_only (bool): Open an existing store without creating, repairing or writing anything,
+                for viewers that may run while the game plays the session.
+
+        Raises:
+            FileNotFoundError: If the store is read-only and has no journal.
+            ValueError: If the existing journal was written for a different number of reels.
+        """
+        self.directory: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+        self.number_of_reels: int = number_of_reels
+        self.group_commit_pulls: int = group_commit_pulls
+        self.group_commit_ms: float = group_commit_ms
+        self.snapshot_interval: int = snapshot_interval
+        self.records_since_snapshot: int = 0
+        self.read_only: bool = read_only
+
+        # Record: checksum, pull number, balance and reel indices
+        self._record: struct.Struct = struct.Struct(f"<IQq{number_of_reels}H")
+        self._uncommitted: int = 0
+        self._commit_lock: Lock = Lock()
+        self._commit_timer: Timer | None = None
+
+        self._journal_path: str = os.path.join(self.directory, JOURNAL_FILE)
+        self._snapshot_path: str = os.path.join(self.directory, SNAPSHOT_FILE)
+        if read_only:
+            self._journal: int = os.open(self._journal_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+            self._journal = os.open(self._journal_path,
+                                    os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0))
+
+        header = self._read_journal()[:_JOURNAL_HEADER.size]
+        if not header and not read_only:
+            os.write(self._journal, _JOURNAL_HEADER.pack(_JOURNAL_MAGIC, _JOURNAL_VERSION, number_of_reels))
+            os.fsync(self._journal)
+        elif (len(header) < _JOURNAL_HEADER.size
+              or _JOURNAL_HEADER.unpack(header) != (_JOURNAL_MAGIC, _JOURNAL_VERSION, number_of_reels)):
+            raise ValueError(f"Session journal {self._journal_path} does not match {number_of_reels} reels.")
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the SessionStore object.
+
+        Returns:
+            str: A string representation of the SessionStore object.
+        """
+        return (f"SessionStore(directory='{self.directory}', reels={self.number_of_reels}, "
+                f"records_since_snapshot={self.records_since_snapshot})")
+
+    def _read_journal(self) -> bytes:
+        """
+        Read the whole journal file.
+
+        Returns:
+            bytes: The journal contents.
+        """
+        with open(self._journal_path, mode="rb") as journal:
+            return journal.read()
+
+    def _check_writable(self) -> None:
+        """
+        Make sure the store may be written.
+
+        Raises:
+            ValueError: If the store is read-only.
+        """
+        if self.read_only:
+            raise ValueError(f"Session store {self.directory} is open read-only.")
+
+    def append(self, pull_number: int, balance: int, reels: tuple[int, ...] | list[int]) -> bool:
+        """
+        Append a record of a finished pull to the journal.
+
+        Args:
+            pull_number (int): The number of pulls played.
+            balance (int): The player's money after the pull.
+            reels (tuple[int, ...] | list[int]): The index of the value shown on each main slot.
+
+        Returns:
+            bool: True if a snapshot is due, False otherwise.
+
+        Raises:
+            ValueError: If the store is read-only.
+        """
+        self._check_writable()
+        payload = self._record.pack(0, pull_number, balance, *reels)[4:]
+        os.write(self._journal, struct.pack("<I", crc32(payload)) + payload)
+
+        self.records_since_snapshot += 1
+        with self._commit_lock:
+            self._uncommitted += 1
+            due = self._uncommitted >= self.group_commit_pulls
+            if not due and self._commit_timer is None:
+                self._commit_timer = Timer(self.group_commit_ms / 1000, self.commit)
+                self._commit_timer.daemon = True
+                self._commit_timer.start()
+        if due:
+            self.commit()
+
+        return bool(self.snapshot_interval) and self.records_since_snapshot >= self.snapshot_interval
+
+    def commit(self) -> None:
+        """
+        Make all appended records durable with a single fsync.
+
+        Called when a group is full, and by the commit timer when its first record has waited "group_commit_ms".
+        """
+        with self._commit_lock:
+            if self._commit_timer is not None:
+                self._commit_timer.cancel()
+                self._commit_timer = None
+            if self._uncommitted:
+                os.fsync(self._journal)
+                self._uncommitted = 0
+
+    def snapshot(self, checkpoint: Checkpoint) -> None:
+        """
+        Save a full snapshot and compact the journal.
+
+        The snapshot replaces the previous one atomically, and only then are
+        the journal records it covers removed.
+
+        Args:
+            checkpoint (Checkpoint): The state to save, including the random number generator state.
+
+        Raises:
+            ValueError: If the store is read-only.
+        """
+        self._check_writable()
+        temporary_path = f"{self._snapshot_path}.tmp"
+        with open(temporary_path, mode="w", encoding="utf-8") as snapshot:
+            json.dump({
+                "pull_number": checkpoint.pull_number,
+                "balance": checkpoint.balance,
+                "reels": list(checkpoint.reels),
+                "rng_state": _to_json_state(checkpoint.rng_state)
+            }, snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, self._snapshot_path)
+
+        os.ftruncate(self._journal, _JOURNAL_HEADER.size)
+        self.commit()
+        self.records_since_snapshot = 0
+
+    def load_snapshot(self) -> Checkpoint | None:
+        """
+        Load the last snapshot.
+
+        Returns:
+            Checkpoint | None: The saved state, or None if there is no snapshot.
+        """
+        try:
+            with open(self._snapshot_path, mode="r", encoding="utf-8") as snapshot:
+                data = json.load(snapshot)
+        except FileNotFoundError:
+            return None
+        return Checkpoint(data["pull_number"], data["balance"], tuple(data["reels"]),
+                          _from_json_state(data["rng_state"]))
+
+    def recover(self) -> Recovery:
+        """
+        Recover the most recent state of the session.
+
+        Only the tail of the journal is examined. A record cut short by a crash
+        or with a wrong checksum is dropped, together with anything after it,
+        unless the store is read-only.
+
+        Returns:
+            Recovery: The recovered state.
+        """
+        snapshot = self.load_snapshot()
+        snapshot_pull = snapshot.pull_number if snapshot else 0
+        journal = self._read_journal()
+
+        record_size = self._record.size
+        number_of_records = (len(journal) - _JOURNAL_HEADER.size) // record_size
+        latest = snapshot
+
+        for index in range(number_of_records - 1, -1, -1):
+            offset = _JOURNAL_HEADER.size + index * record_size
+            record = journal[offset:offset + record_size]
+            checksum, pull_number, balance, *reels = self._record.unpack(record)
+            if checksum != crc32(record[4:]):
+                continue
+            if pull_number > snapshot_pull:
+                latest = Checkpoint(pull_number, balance, tuple(reels))
+            valid_size = offset + record_size
+            if valid_size < len(journal) and not self.read_only:
+                # Drop the damaged tail so new records follow the last valid one
+                os.ftruncate(self._journal, valid_size)
+            break
+        else:
+            if len(journal) > _JOURNAL_HEADER.size and not self.read_only:
+                os.ftruncate(self._journal, _JOURNAL_HEADER.size)
+
+        pulls_since_snapshot = (latest.pull_number - snapshot_pull) if latest else 0
+        self.records_since_snapshot = pulls_since_snapshot
+        return Recovery(snapshot, latest, pulls_since_snapshot)
+
+    def records(self) -> list[Checkpoint]:
+        """
+        Read every valid record journaled after the last snapshot, in order.
+
+        Reading stops at the first record cut short by a crash or with a wrong checksum.
+
+        Returns:
+            list[Checkpoint]: The state after each journaled pull.
+        """
+        journal = self._read_journal()
+        record_size = self._record.size
+        checkpoints = []
+        for offset in range(_JOURNAL_HEADER.size, len(journal) - record_size + 1, record_size):
+            record = journal[offset:offset + record_size]
+            checksum, pull_number, balance, *reels = self._record.unpack(record)
+            if checksum != crc32(record[4:]):
+                break
+            checkpoints.append(Checkpoint(pull_number, balance, tuple(reels)))
+        return checkpoints
+
+    def clear(self) -> None:
+        """
+        Remove the snapshot and all journal records, starting a new session.
+
+        Raises:
+            ValueError: If the store is read-only.
+        """
+        self._check_writable()
+        if os.path.exists(self._snapshot_path):
+            os.remove(self._snapshot_path)
+        os.ftruncate(self._journal, _JOURNAL_HEADER.size)
+        self.commit()
+        self.records_since_snapshot = 0
+
+    def close(self) -> None:
+        """
+        Make all records durable and close the journal.
+        """
+        self.commit()
+        os.close(self._journal)
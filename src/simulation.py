@@ -0,0 +1,416 @@
+"""
+This module provides mergeable streaming statistics of simulated pulls.
+
+A SpinStatistics accumulator takes every pull in a single pass and constant
+memory: the count, mean and variance of the payouts (Welford's algorithm), a
+payout histogram, the number of jackpots and the largest drawdown of the
+player's money. Two accumulators merge exactly (Chan's parallel algorithm), so
+shards simulated in separate processes, or on separate hosts connected over a
+socket, combine into the same figures a single run would give.
+
+Instead of fixing the number of pulls up front, a simulation keeps merging
+shards until the confidence interval of the RTP is narrower than a target.
+
+Run this module directly to simulate the values in config.py, for example
+"python simulation.py --precision 0.05", "python simulation.py --serve 8765"
+on one host and "python simulation.py --connect host:8765" on the others.
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from math import sqrt
+from typing import Any, cast
+from engine import Engine
+from game_math import Paytable, JACKPOT_OUTCOME
+from analytics_cache import get_analytics_cache
+from volatility import z_score
+from config import (
+    SIMULATION_BATCH_PULLS, SIMULATION_RTP_PRECISION, SIMULATION_CONFIDENCE,
+    SIMULATION_MAX_PULLS, SIMULATION_PORT
+)
+
+# Replies of the coordinator to a remote worker after every shard
+_CONTINUE: bytes = b"continue\n"
+_STOP: bytes = b"stop\n"
+# Largest number of bytes read from a worker connection at once
+_RECEIVE_SIZE: int = 65536
+
+
+class SpinStatistics:
+    """
+    Represents single-pass statistics of a sequence of pulls.
+
+    The drawdown figures are relative to the money at the start of the
+    sequence. Merging treats the pulls of the other accumulator as played
+    after the pulls of this one.
+
+    Attributes:
+        count (int): The number of pulls.
+        mean (float): The mean payout of a pull.
+        m2 (float): The sum of squared differences of the payouts from their mean.
+        total_cost (int): The sum of the pull costs.
+        histogram (dict[int, int]): The number of pulls with each payout.
+        jackpots (int): The number of pulls winning the jackpot.
+        net (int): The change of the player's money over all pulls.
+        peak (int): The highest change of the player's money reached, at least 0.
+        trough (int): The lowest change of the player's money reached, at most 0.
+        max_drawdown (int): The largest fall of the player's money from an earlier high.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize a new SpinStatistics instance without any pulls.
+        """
+        self.count: int = 0
+        self.mean: float = 0.0
+        self.m2: float = 0.0
+        self.total_cost: int = 0
+        self.histogram: dict[int, int] = {}
+        self.jackpots: int = 0
+        self.net: int = 0
+        self.peak: int = 0
+        self.trough: int = 0
+        self.max_drawdown: int = 0
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the SpinStatistics object.
+
+        Returns:
+            str: A string representation of the SpinStatistics object.
+        """
+        return (f"SpinStatistics(count={self.count}, rtp={self.rtp():.4f}, jackpots={self.jackpots}, "
+                f"max_drawdown={self.max_drawdown})")
+
+    def record(self, payout: int, pull_cost: int, jackpot: bool = False) -> None:
+        """
+        Add a pull to the statistics.
+
+        Args:
+            payout (int): The amount paid to the player, not counting the pull cost.
+            pull_cost (int): The cost of the pull.
+            jackpot (bool): Whether the pull won the jackpot.
+        """
+        self.count += 1
+        delta = payout - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (payout - self.mean)
+        self.total_cost += pull_cost
+        self.histogram[payout] = self.histogram.get(payout, 0) + 1
+        self.jackpots += jackpot
+
+        # The money falls by the pull cost before the payout is added
+        self.max_drawdown = max(self.max_drawdown, self.peak - (self.net - pull_cost))
+        self.trough = min(self.trough, self.net - pull_cost)
+        self.net += payout - pull_cost
+        self.peak = max(self.peak, self.net)
+
+    def merge(self, other: "SpinStatistics") -> None:
+        """
+        Add the pulls of another accumulator, as if they were played after the pulls of this one.
+
+        Args:
+            other (SpinStatistics): The statistics to add.
+        """
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total_cost += other.total_cost
+        for payout, payouts in other.histogram.items():
+            self.histogram[payout] = self.histogram.get(payout, 0) + payouts
+        self.jackpots += other.jackpots
+
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown, self.peak - (self.net + other.trough))
+        self.trough = min(self.trough, self.net + other.trough)
+        self.peak = max(self.peak, self.net + other.peak)
+        self.net += other.net
+
+    def variance(self) -> float:
+        """
+        Get the sample variance of the payouts.
+
+        Returns:
+            float: The variance, 0 for fewer than 2 pulls.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def rtp(self) -> float:
+        """
+        Get the observed Return to Player (RTP).
+
+        Returns:
+            float: The RTP as a percentage, 0 without pulls.
+        """
+        return self.mean * self.count / self.total_cost * 100 if self.total_cost else 0.0
+
+    def rtp_confidence_interval(self, confidence: float = SIMULATION_CONFIDENCE) -> tuple[float, float]:
+        """
+        Get the confidence interval of the RTP from the normal approximation of the mean payout.
+
+        Args:
+            confidence (float): The confidence level between 0 and 1.
+
+        Returns:
+            tuple[float, float]: The lower and upper bound of the RTP as a percentage.
+        """
+        if self.count < 2:
+            return 0.0, float("inf")
+        mean_cost = self.total_cost / self.count
+        half_width = z_score(confidence) * sqrt(self.variance() / self.count) / mean_cost * 100
+        return self.rtp() - half_width, self.rtp() + half_width
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Get the statistics as a JSON-compatible dictionary.
+
+        Returns:
+            dict[str, Any]: The statistics.
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "total_cost": self.total_cost,
+            "histogram": {str(payout): payouts for payout, payouts in self.histogram.items()},
+            "jackpots": self.jackpots,
+            "net": self.net,
+            "peak": self.peak,
+            "trough": self.trough,
+            "max_drawdown": self.max_drawdown
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SpinStatistics":
+        """
+        Create statistics from a dictionary made by "to_dict".
+
+        Args:
+            data (dict[str, Any]): The statistics.
+
+        Returns:
+            SpinStatistics: The statistics.
+        """
+        statistics = cls()
+        statistics.count = data["count"]
+        statistics.mean = data["mean"]
+        statistics.m2 = data["m2"]
+        statistics.total_cost = data["total_cost"]
+        statistics.histogram = {int(payout): payouts for payout, payouts in data["histogram"].items()}
+        statistics.jackpots = data["jackpots"]
+        statistics.net = data["net"]
+        statistics.peak = data["peak"]
+        statistics.trough = data["trough"]
+        statistics.max_drawdown = data["max_drawdown"]
+        return statistics
+
+
+def simulate_shard(pulls: int) -> dict[str, Any]:
+    """
+    Simulate pulls on a new headless machine.
+
+    Every shard gets its own random backend, so shards of different processes
+    are independent.
+
+    Args:
+        pulls (int): The number of pulls.
+
+    Returns:
+        dict[str, Any]: The statistics of the pulls, as made by "SpinStatistics.to_dict".
+    """
+    engine = Engine()
+    statistics = SpinStatistics()
+    for _ in range(pulls):
+        result = engine.pull()
+        statistics.record(result.payout, result.pull_cost, result.outcome == JACKPOT_OUTCOME)
+    return statistics.to_dict()
+
+
+def is_precise(statistics: SpinStatistics, precision: float, confidence: float) -> bool:
+    """
+    Check whether the confidence interval of the RTP is narrow enough.
+
+    Args:
+        statistics (SpinStatistics): The statistics so far.
+        precision (float): The largest half width of the interval in percentage points.
+        confidence (float): The confidence level between 0 and 1.
+
+    Returns:
+        bool: True if the half width is at most the precision.
+    """
+    low, high = statistics.rtp_confidence_interval(confidence)
+    return (high - low) / 2 <= precision
+
+
+def simulate(precision: float = SIMULATION_RTP_PRECISION, confidence: float = SIMULATION_CONFIDENCE,
+             batch_pulls: int = SIMULATION_BATCH_PULLS, max_pulls: int = SIMULATION_MAX_PULLS,
+             workers: int | None = None) -> SpinStatistics:
+    """
+    Simulate shards in worker processes until the RTP is known precisely enough.
+
+    Every worker always has a shard in progress, and shards are merged as
+    they finish. Shards still running when the target is reached are merged
+    too, so no simulated pull is wasted.
+
+    Args:
+        precision (float): The largest half width of the RTP interval in percentage points.
+        confidence (float): The confidence level between 0 and 1.
+        batch_pulls (int): The number of pulls of every shard.
+        max_pulls (int): The number of pulls after which no more shards are started.
+        workers (int | None): The number of worker processes, None to use all processors.
+
+    Returns:
+        SpinStatistics: The merged statistics of all shards.
+    """
+    workers = workers or os.cpu_count() or 1
+    statistics = SpinStatistics()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {executor.submit(simulate_shard, batch_pulls) for _ in range(workers)}
+        started = workers * batch_pulls
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                statistics.merge(SpinStatistics.from_dict(future.result()))
+            if is_precise(statistics, precision, confidence):
+                continue
+            for _ in done:
+                if started < max_pulls:
+                    running.add(executor.submit(simulate_shard, batch_pulls))
+                    started += batch_pulls
+    return statistics
+
+
+def serve(port: int = SIMULATION_PORT, precision: float = SIMULATION_RTP_PRECISION,
+          confidence: float = SIMULATION_CONFIDENCE, max_pulls: int = SIMULATION_MAX_PULLS) -> SpinStatistics:
+    """
+    Merge the shards sent by remote workers until the RTP is known precisely enough.
+
+    Every worker sends the statistics of a shard as one JSON line and waits for
+    the reply telling it to continue or stop.
+
+    Args:
+        port (int): The TCP port to listen on.
+        precision (float): The largest half width of the RTP interval in percentage points.
+        confidence (float): The confidence level between 0 and 1.
+        max_pulls (int): The number of pulls after which all workers are stopped.
+
+    Returns:
+        SpinStatistics: The merged statistics of all shards.
+    """
+    statistics = SpinStatistics()
+    done = False
+    # Shards can arrive split across reads, so every connection keeps the bytes of its unfinished line
+    buffers: dict[socket.socket, bytearray] = {}
+    with socket.create_server(("", port)) as server, selectors.DefaultSelector() as selector:
+        selector.register(server, selectors.EVENT_READ)
+        while not done or buffers:
+            for key, _ in selector.select():
+                if key.fileobj is server:
+                    connection, _ = server.accept()
+                    connection.setblocking(False)
+                    buffers[connection] = bytearray()
+                    selector.register(connection, selectors.EVENT_READ)
+                    continue
+
+                connection = cast(socket.socket, key.fileobj)
+                try:
+                    data = connection.recv(_RECEIVE_SIZE)
+                except BlockingIOError:
+                    continue
+                buffer = buffers[connection]
+                buffer += data
+                while (end := buffer.find(b"\n")) >= 0:
+                    line = bytes(buffer[:end])
+                    del buffer[:end + 1]
+                    statistics.merge(SpinStatistics.from_dict(json.loads(line)))
+                    low, high = statistics.rtp_confidence_interval(confidence)
+                    print(f"{statistics.count} pulls, RTP {statistics.rtp():.4f}% ({low:.4f}% to {high:.4f}%)")
+                    done = done or statistics.count >= max_pulls or is_precise(statistics, precision, confidence)
+                    # The worker waits for this short reply before sending more, so it never fills the send buffer
+                    connection.sendall(_STOP if done else _CONTINUE)
+                if not data or done:
+                    selector.unregister(connection)
+                    del buffers[connection]
+                    connection.close()
+    return statistics
+
+
+def work(address: str, batch_pulls: int = SIMULATION_BATCH_PULLS) -> int:
+    """
+    Simulate shards for a remote coordinator until it has enough pulls.
+
+    Args:
+        address (str): The host and port of the coordinator, as "host:port".
+        batch_pulls (int): The number of pulls of every shard.
+
+    Returns:
+        int: The number of shards sent.
+    """
+    host, port = address.rsplit(":", 1)
+    shards = 0
+    with socket.create_connection((host, int(port))) as connection, connection.makefile("rb") as replies:
+        while True:
+            connection.sendall(json.dumps(simulate_shard(batch_pulls)).encode() + b"\n")
+            shards += 1
+            if replies.readline() != _CONTINUE:
+                return shards
+
+
+def print_report(statistics: SpinStatistics, confidence: float) -> None:
+    """
+    Print the merged statistics.
+
+    Args:
+        statistics (SpinStatistics): The statistics to print.
+        confidence (float): The confidence level of the RTP interval.
+    """
+    low, high = statistics.rtp_confidence_interval(confidence)
+    paytable = Paytable()
+    print(f"Pulls: {statistics.count}")
+    print(f"RTP: {statistics.rtp():.4f}% ({confidence:.0%} interval {low:.4f}% to {high:.4f}%), "
+          f"exact {get_analytics_cache().value('rtp', paytable, paytable.rtp):.4f}%")
+    print(f"Mean payout: ${statistics.mean:.4f}, standard deviation: ${sqrt(statistics.variance()):.4f}")
+    print(f"Jackpots: {statistics.jackpots}")
+    print(f"Net result: ${statistics.net}, largest drawdown: ${statistics.max_drawdown}")
+    print("Payouts:")
+    for payout, payouts in sorted(statistics.histogram.items()):
+        print(f"  ${payout}: {payouts} ({payouts / statistics.count:.6f})")
+
+
+def main() -> None:
+    """
+    Simulate the values in config.py until the RTP is known precisely enough, or run as a remote worker.
+    """
+    parser = argparse.ArgumentParser(description="Open-ended pull simulation with mergeable statistics.")
+    parser.add_argument("--precision", type=float, default=SIMULATION_RTP_PRECISION,
+                        help="Largest half width of the RTP interval in percentage points.")
+    parser.add_argument("--confidence", type=float, default=SIMULATION_CONFIDENCE, help="Confidence level.")
+    parser.add_argument("--batch-pulls", type=int, default=SIMULATION_BATCH_PULLS, help="Pulls of every shard.")
+    parser.add_argument("--max-pulls", type=int, default=SIMULATION_MAX_PULLS,
+                        help="Pulls after which the simulation stops anyway.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, all processors by default.")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Merge the shards of remote workers.")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="Simulate shards for a remote coordinator.")
+    arguments = parser.parse_args()
+
+    if arguments.connect:
+        shards = work(arguments.connect, arguments.batch_pulls)
+        print(f"Sent {shards} shards of {arguments.batch_pulls} pulls.")
+        return
+    if arguments.serve:
+        statistics = serve(arguments.serve, arguments.precision, arguments.confidence, arguments.max_pulls)
+    else:
+        statistics = simulate(arguments.precision, arguments.confidence, arguments.batch_pulls,
+                              arguments.max_pulls, arguments.workers)
+    print_report(statistics, arguments.confidence)
+
+
+if __name__ == "__main__":
+    main()
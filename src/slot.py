@@ -7,10 +7,9 @@ and manages the slot's value and position.
 
 from turtle import Turtle
 from typing import TypeAlias
-from random import choice
+from rng import get_random_backend
 from config import (
     SLOT_ALIGNMENT, SLOT_FONT_SIZE, SLOT_FONT,
-    TOP_SECONDARY_SLOT, BOTTOM_SECONDARY_SLOT,
     SLOT_SYMBOLS, SLOT_NUMBERS, USE_SYMBOLS
 )
 
@@ -30,6 +29,33 @@ def get_slot_values() -> tuple[SlotValue, ...]:
         return SLOT_NUMBERS
 
 
+def draw_slot_value(values: tuple[SlotValue, ...]) -> SlotValue:
+    """
+    Randomly select one of the slot values with the shared random backend.
+
+    Args:
+        values (tuple[SlotValue, ...]): The possible slot values.
+
+    Returns:
+        SlotValue: The selected value.
+    """
+    return values[get_random_backend().index(len(values))]
+
+
+def draw_slot_values(values: tuple[SlotValue, ...], count: int) -> list[SlotValue]:
+    """
+    Randomly select many slot values in a row, as consecutive calls of "draw_slot_value" would.
+
+    Args:
+        values (tuple[SlotValue, ...]): The possible slot values.
+        count (int): The number of values to select.
+
+    Returns:
+        list[SlotValue]: The selected values.
+    """
+    return [values[index] for index in get_random_backend().indices(len(values), count)]
+
+
 class Slot(Turtle):
     """
     Represents a single slot in a slot machine.
@@ -44,7 +70,7 @@ class Slot(Turtle):
             be either strings or integers.
     """
 
-    def __init__(self, x_position: float, y_position: float, color: str, secondary_slot: str | None) -> None:
+    def __init__(self, x_position: float, y_position: float, color: str, row_offset: int = 0) -> None:
         """
         Initialize a new Slot instance.
 
@@ -52,15 +78,15 @@ class Slot(Turtle):
             x_position (float): The x-coordinate for the slot's position.
             y_position (float): The y-coordinate for the slot's position.
             color (str): The color of the slot's text.
-            secondary_slot (str | None): Indicates if this is a secondary slot and its position (top or bottom).
-                If None is provided, this is a main slot.
+            row_offset (int): The offset of the slot's row from the main row, positive above it.
+                If 0 is provided, this is a main slot.
         """
         super().__init__()
         self.color(color)
         self.penup()
         self.hideturtle()
         self._values: tuple[SlotValue, ...] = get_slot_values()
-        self._value: SlotValue | None = choice(self._values) if secondary_slot is None else None
+        self._value: SlotValue | None = draw_slot_value(self._values) if row_offset == 0 else None
         self.goto(x_position, y_position - SLOT_FONT_SIZE / 2 - SLOT_FONT_SIZE / 4)
 
     def __str__(self) -> str:
@@ -116,23 +142,31 @@ class Slot(Turtle):
         """
         return self._values
 
-    def update_slot(self, secondary_slot: str | None = None,
-                    main_slot_value: SlotValue | None = None) -> None:
+    def set_values(self, values: tuple[SlotValue, ...]) -> None:
+        """
+        Replace the possible values for the slot, keeping its position on the reel strip.
+
+        Args:
+            values (tuple[SlotValue, ...]): The new possible values.
+        """
+        if self._value is not None:
+            self._value = values[self._values.index(self._value) % len(values)]
+        self._values = values
+
+    def update_slot(self, row_offset: int = 0, main_slot_value: SlotValue | None = None) -> None:
         """
         Update the slot's display with its current value.
 
-        If this is a secondary slot, it updates based on the primary slot's value.
+        If this is a secondary slot, it shows the value its row offset away
+        from the primary slot's value on the reel strip.
 
         Args:
-            secondary_slot (str | None): Indicates if this is a secondary slot and its position (top or bottom).
+            row_offset (int): The offset of the slot's row from the main row, positive above it.
             main_slot_value (SlotValue | None): The value of the primary slot, if applicable.
         """
         self.clear()
-        if secondary_slot == TOP_SECONDARY_SLOT and main_slot_value is not None:
-            index = (self._values.index(main_slot_value) + 1) % len(self._values)
-            self._value = self._values[index]
-        elif secondary_slot == BOTTOM_SECONDARY_SLOT and main_slot_value is not None:
-            index = (self._values.index(main_slot_value) - 1) % len(self._values)
+        if row_offset and main_slot_value is not None:
+            index = (self._values.index(main_slot_value) + row_offset) % len(self._values)
             self._value = self._values[index]
         if self._value is not None:
             self.write(f"{self._value}", align=SLOT_ALIGNMENT, font=SLOT_FONT)
@@ -141,4 +175,4 @@ class Slot(Turtle):
         """
         Randomly select a new value for the slot.
         """
-        self.value = choice(self._values)
+        self.value = draw_slot_value(self._values)
@@ -0,0 +1,78 @@
+"""
+This module connects the game's displays and logger to the pull events.
+
+The money, messages and instructions displays are synchronous subscribers,
+because they must be drawn before the pull ends. The logger is an asynchronous
+subscriber, so writing log records does not add to the pull time. Its records
+carry the time of the event, not the time they are written.
+"""
+
+from events import (
+    EventBus, Event, PullStarted, Won, JackpotWon, Lost, BalanceChanged, OUTCOME_EVENTS
+)
+from logger import Logger
+from messages import Instructions, Messages
+from money import Money
+
+
+def subscribe_display(event_bus: EventBus, money: Money, instructions: Instructions, messages: Messages) -> None:
+    """
+    Update the money, messages and instructions displays from the pull events.
+
+    Args:
+        event_bus (EventBus): The bus publishing the pull events.
+        money (Money): The money display.
+        instructions (Instructions): The instructions display.
+        messages (Messages): The messages display.
+    """
+    def clear_display(event: PullStarted) -> None:
+        instructions.hide_instructions()
+        messages.remove_messages()
+
+    def show_outcome(event: Event) -> None:
+        if isinstance(event, JackpotWon):
+            messages.player_won_jackpot_message(event.amount)
+        elif isinstance(event, Won):
+            messages.player_won_message(event.amount)
+        elif isinstance(event, Lost):
+            messages.player_lost_message(event.amount)
+        instructions.show_instructions()
+
+    event_bus.subscribe(clear_display, PullStarted)
+    event_bus.subscribe(lambda event: money.update_money(), BalanceChanged)
+    event_bus.subscribe(show_outcome, *OUTCOME_EVENTS)
+
+
+def subscribe_logger(event_bus: EventBus, logger: Logger) -> None:
+    """
+    Log the pull events.
+
+    The logger subscribes asynchronously, except in pull summary mode, where
+    every record has to be counted in the summary of the pull it belongs to.
+
+    Args:
+        event_bus (EventBus): The bus publishing the pull events.
+        logger (Logger): The logger writing the records.
+    """
+    def log_event(event: Event) -> None:
+        if isinstance(event, PullStarted):
+            spin = f"{event.cycles} cycles" if event.cycles else "a timed spin"
+            logger.log_event("pull_started", f"Starting pull sequence with {spin}.",
+                             event.cycles, event.balance, function_name="pull", timestamp=event.timestamp)
+        elif isinstance(event, JackpotWon):
+            logger.log_event("jackpot_won", f"Player won a jackpot! Prize: ${event.amount}",
+                             list(event.values), event.amount, event.balance, function_name="pull",
+                             timestamp=event.timestamp)
+        elif isinstance(event, Won):
+            logger.log_event("won", f"Player won! Prize: ${event.amount}",
+                             list(event.values), event.amount, event.balance, function_name="pull",
+                             timestamp=event.timestamp)
+        elif isinstance(event, Lost):
+            logger.log_event("lost", f"Player lost. Cost: ${event.amount}",
+                             list(event.values), event.amount, event.balance, function_name="pull",
+                             timestamp=event.timestamp)
+
+    if logger.summary_mode:
+        event_bus.subscribe(log_event, PullStarted, *OUTCOME_EVENTS)
+    else:
+        event_bus.subscribe_async(log_event, PullStarted, *OUTCOME_EVENTS)
@@ -0,0 +1,155 @@
+"""
+This module provides a bank of terminals playing from one shared wallet on many threads.
+
+Every terminal is a headless Engine with its own random backend and its own
+lock, so the state of a session is only ever changed by one thread at a time
+while different terminals are played in parallel. The only state shared by
+all terminals is the SharedWallet of the bank, whose every change is a single
+locked read-modify-write, and the optional progressive jackpot pool, which
+locks its own counters.
+
+Run this module directly to stress test the bank: many threads pull on the
+same terminals and the same wallet at once, and the final balance is checked
+exactly against the sum of every pull result.
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+from engine import Engine, PullResult
+from game_math import Paytable
+from models import SharedWallet
+from progressive import ProgressiveJackpot
+from config import (
+    DEFAULT_MONEY, TERMINALS_COUNT, TERMINALS_THREADS, TERMINALS_PULLS, TERMINALS_CHUNK_PULLS
+)
+
+
+class TerminalBank:
+    """
+    Represents terminals sharing one bank of money.
+
+    Attributes:
+        wallet (SharedWallet): The money shared by all terminals.
+        terminals (tuple[Engine, ...]): The terminals, each with its own random backend.
+    """
+
+    def __init__(self, terminals: int = TERMINALS_COUNT, money: int = DEFAULT_MONEY,
+                 paytable: Paytable = Paytable(), jackpot_pool: ProgressiveJackpot | None = None) -> None:
+        """
+        Initialize a new TerminalBank instance.
+
+        Args:
+            terminals (int): The number of terminals.
+            money (int): The starting money of the bank.
+            paytable (Paytable): The paytable of every terminal.
+            jackpot_pool (ProgressiveJackpot | None): The progressive jackpot pool shared by the terminals,
+                or None for a fixed jackpot.
+        """
+        self.wallet: SharedWallet = SharedWallet(money)
+        self.terminals: tuple[Engine, ...] = tuple(
+            Engine(paytable=paytable, jackpot_pool=jackpot_pool, wallet=self.wallet) for _ in range(terminals)
+        )
+        self._locks: tuple[Lock, ...] = tuple(Lock() for _ in range(terminals))
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the TerminalBank object.
+
+        Returns:
+            str: A string representation of the TerminalBank object.
+        """
+        return f"TerminalBank(terminals={len(self.terminals)}, money={self.wallet.money}, pulls={self.pulls})"
+
+    @property
+    def pulls(self) -> int:
+        """
+        Get the number of pulls played on all terminals.
+
+        Returns:
+            int: The number of pulls.
+        """
+        return sum(terminal.pulls for terminal in self.terminals)
+
+    def pull(self, terminal: int) -> PullResult:
+        """
+        Pull on a terminal, waiting for any other thread pulling on it.
+
+        Args:
+            terminal (int): The index of the terminal.
+
+        Returns:
+            PullResult: The result of the pull.
+        """
+        with self._locks[terminal]:
+            return self.terminals[terminal].pull()
+
+    def pull_many(self, terminal: int, pulls: int) -> int:
+        """
+        Pull several times on a terminal, holding its lock for all of the pulls.
+
+        Args:
+            terminal (int): The index of the terminal.
+            pulls (int): The number of pulls.
+
+        Returns:
+            int: The sum of the net results of the pulls.
+        """
+        engine = self.terminals[terminal]
+        with self._locks[terminal]:
+            return sum(engine.pull().net for _ in range(pulls))
+
+
+def stress_test(terminals: int = TERMINALS_COUNT, threads: int = TERMINALS_THREADS, pulls: int = TERMINALS_PULLS,
+                chunk_pulls: int = TERMINALS_CHUNK_PULLS) -> bool:
+    """
+    Check that no pull or money change is lost when many threads play the terminals of one bank.
+
+    The pulls of every terminal are split into chunks handed out round robin, so
+    threads contend both for the same terminals and for the shared wallet.
+
+    Args:
+        terminals (int): The number of terminals.
+        threads (int): The number of threads.
+        pulls (int): The number of pulls of every terminal.
+        chunk_pulls (int): The number of pulls of every chunk.
+
+    Returns:
+        bool: True if the pull count and the final balance match exactly, False otherwise.
+    """
+    bank = TerminalBank(terminals)
+    starting_money = bank.wallet.money
+    chunks = [(terminal, min(chunk_pulls, pulls - start))
+              for start in range(0, pulls, chunk_pulls) for terminal in range(terminals)]
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        net = sum(executor.map(lambda chunk: bank.pull_many(*chunk), chunks))
+    elapsed = perf_counter() - started
+
+    expected_money = starting_money + net
+    print(f"Terminals: {terminals}, threads: {threads}, pulls per terminal: {pulls}")
+    print(f"Pulls: {bank.pulls} of {terminals * pulls}, {bank.pulls / elapsed:,.0f} pulls per second")
+    print(f"Expected money: {expected_money}, bank money: {bank.wallet.money}")
+    return bank.pulls == terminals * pulls and bank.wallet.money == expected_money
+
+
+def main() -> None:
+    """
+    Run the stress test with the given parameters.
+    """
+    parser = argparse.ArgumentParser(description="Terminals sharing one bank of money on many threads.")
+    parser.add_argument("--terminals", type=int, default=TERMINALS_COUNT, help="Number of terminals.")
+    parser.add_argument("--threads", type=int, default=TERMINALS_THREADS, help="Number of threads.")
+    parser.add_argument("--pulls", type=int, default=TERMINALS_PULLS, help="Pulls per terminal.")
+    parser.add_argument("--chunk-pulls", type=int, default=TERMINALS_CHUNK_PULLS,
+                        help="Pulls a thread makes on a terminal at a time.")
+    arguments = parser.parse_args()
+
+    sys.exit(0 if stress_test(arguments.terminals, arguments.threads, arguments.pulls, arguments.chunk_pulls) else 1)
+
+
+if __name__ == "__main__":
+    main()
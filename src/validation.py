@@ -7,11 +7,81 @@ the required criteria for the game to function correctly.
 
 from config import (
     NUMBER_OF_SLOTS, DEFAULT_SLOT_SIZE, MIN_PULL_CYCLES, MAX_PULL_CYCLES,
-    SLOT_SYMBOLS, SLOT_NUMBERS, JACKPOT_WINNING_SYMBOL, JACKPOT_WINNING_NUMBER,
-    PULL_COST, WIN_PRIZE, FRAME_PADDING_FACTOR
+    SLOT_SYMBOLS, SLOT_NUMBERS, USE_SYMBOLS, JACKPOT_WINNING_SYMBOL, JACKPOT_WINNING_NUMBER,
+    PULL_COST, WIN_PRIZE, JACKPOT_PRIZE_MULTIPLIER, FRAME_PADDING_FACTOR, PROGRESSIVE_CONTRIBUTION_RATE,
+    PROGRESSIVE_SEED, PROGRESSIVE_MAX_MACHINES, SESSION_GROUP_COMMIT_PULLS,
+    SESSION_SNAPSHOT_INTERVAL, RNG_BACKEND, RNG_BLOCK_SIZE, RNG_PREFETCH_BLOCKS,
+    EVENT_QUEUE_SIZE, SPIN_DURATION_MS, SPIN_FRAME_MS, SPIN_REEL_STAGGER_MS,
+    DIAGNOSTICS_REFRESH_MS, DIAGNOSTICS_TRACE_EVENTS, NUMBER_OF_ROWS, WIN_MODE,
+    ANALYTICS_CACHE_MAX_ENTRIES, CONFIG_PROFILE_POLL_MS, WAREHOUSE_BATCH_PULLS, WAREHOUSE_FLUSH_MS
 )
 
 
+def validate_paytable(number_of_slots: int, pull_cost: int, win_prize: int, number_of_values: int,
+                      jackpot_multiplier: int) -> list[str]:
+    """
+    Validate the parameters that determine the game math.
+
+    Args:
+        number_of_slots (int): The number of main slots.
+        pull_cost (int): The cost of each pull.
+        win_prize (int): The amount of money won for a successful pull.
+        number_of_values (int): The number of possible values on each slot.
+        jackpot_multiplier (int): Number by which the prize would be multiplied if jackpot is hit.
+
+    Returns:
+        list[str]: The error messages, empty if all parameters are valid.
+    """
+    errors: list[str] = []
+
+    if number_of_slots < 2:
+        errors.append("NUMBER_OF_SLOTS must be at least 2.")
+    if number_of_values < 2:
+        errors.append("There must be at least 2 slot values.")
+    if pull_cost < 1:
+        errors.append("PULL_COST must be at least 1.")
+    if win_prize < pull_cost * 2:
+        errors.append("WIN_PRIZE must be at least twice as big as PULL_COST.")
+    if jackpot_multiplier < 1:
+        errors.append("JACKPOT_PRIZE_MULTIPLIER must be at least 1.")
+
+    return errors
+
+
+def validate_game_values(win_mode: str, slot_symbols: tuple[str, ...], slot_numbers: tuple[int, ...],
+                         jackpot_winning_symbol: str, jackpot_winning_number: int) -> list[str]:
+    """
+    Validate the win mode and the slot values, which a config profile may change.
+
+    Args:
+        win_mode (str): Whether only the main row pays (line) or every way across the rows (ways).
+        slot_symbols (tuple[str, ...]): The slot symbols.
+        slot_numbers (tuple[int, ...]): The slot numbers.
+        jackpot_winning_symbol (str): The symbol winning the jackpot.
+        jackpot_winning_number (int): The number winning the jackpot.
+
+    Returns:
+        list[str]: The error messages, empty if all values are valid.
+    """
+    errors: list[str] = []
+
+    if win_mode not in ("line", "ways"):
+        errors.append("WIN_MODE must be line or ways.")
+
+    # Validate SLOT_SYMBOLS
+    for i, symbol in enumerate(slot_symbols):
+        if len(symbol) > 1:
+            errors.append(f"Symbol at index {i} ({symbol}) is not a single Unicode character.")
+
+    # Validate JACKPOT_WINNING_SYMBOL and JACKPOT_WINNING_NUMBER
+    if jackpot_winning_symbol not in slot_symbols:
+        errors.append(f"Jackpot symbol {jackpot_winning_symbol} is not included in slot symbols: {slot_symbols}.")
+    if jackpot_winning_number not in slot_numbers:
+        errors.append(f"Jackpot number {jackpot_winning_number} is not included in slot numbers: {slot_numbers}.")
+
+    return errors
+
+
 def validate_configurations() -> None:
     """
     Validate configuration parameters.
@@ -22,10 +92,13 @@ def validate_configurations() -> None:
     Raises:
         ValueError: If any configuration setting is invalid.
     """
-    errors: list[str] = []
+    errors: list[str] = validate_paytable(NUMBER_OF_SLOTS, PULL_COST, WIN_PRIZE,
+                                          len(SLOT_SYMBOLS if USE_SYMBOLS else SLOT_NUMBERS), JACKPOT_PRIZE_MULTIPLIER)
+    errors += validate_game_values(WIN_MODE, SLOT_SYMBOLS, SLOT_NUMBERS, JACKPOT_WINNING_SYMBOL,
+                                   JACKPOT_WINNING_NUMBER)
 
-    if NUMBER_OF_SLOTS < 2:
-        errors.append("NUMBER_OF_SLOTS must be at least 2.")
+    if NUMBER_OF_ROWS < 1:
+        errors.append("NUMBER_OF_ROWS must be at least 1.")
     if DEFAULT_SLOT_SIZE != 20:
         errors.append("DEFAULT_SLOT_SIZE must be set to 20.")
     if MIN_PULL_CYCLES < 1:
@@ -34,21 +107,45 @@ def validate_configurations() -> None:
         errors.append("MAX_PULL_CYCLES must not be greater than 100.")
     if MIN_PULL_CYCLES > MAX_PULL_CYCLES:
         errors.append("MIN_PULL_CYCLES must not be greater than MAX_PULL_CYCLES.")
-    if WIN_PRIZE < PULL_COST * 2:
-        errors.append("WIN_PRIZE must be at least twice as big as PULL_COST.")
+    if SPIN_DURATION_MS < 0:
+        errors.append("SPIN_DURATION_MS must not be negative.")
+    if SPIN_FRAME_MS < 1:
+        errors.append("SPIN_FRAME_MS must be at least 1.")
+    if SPIN_REEL_STAGGER_MS < 0 or (
+            SPIN_DURATION_MS and (NUMBER_OF_SLOTS - 1) * SPIN_REEL_STAGGER_MS >= SPIN_DURATION_MS):
+        errors.append("SPIN_REEL_STAGGER_MS must not be negative, and all reels must stop within SPIN_DURATION_MS.")
     if FRAME_PADDING_FACTOR <= 0 or FRAME_PADDING_FACTOR >= 0.5:
         errors.append("FRAME_PADDING_FACTOR must be between 0 and 0.5.")
-
-    # Validate SLOT_SYMBOLS
-    for i, symbol in enumerate(SLOT_SYMBOLS):
-        if len(symbol) > 1:
-            errors.append(f"Symbol at index {i} ({symbol}) is not a single Unicode character.")
-
-    # Validate JACKPOT_WINNING_SYMBOL and JACKPOT_WINNING_NUMBER
-    if JACKPOT_WINNING_SYMBOL not in SLOT_SYMBOLS:
-        errors.append(f"Jackpot symbol {JACKPOT_WINNING_SYMBOL} is not included in slot symbols: {SLOT_SYMBOLS}.")
-    if JACKPOT_WINNING_NUMBER not in SLOT_NUMBERS:
-        errors.append(f"Jackpot number {JACKPOT_WINNING_NUMBER} is not included in slot numbers: {SLOT_NUMBERS}.")
+    if PROGRESSIVE_CONTRIBUTION_RATE < 0 or PROGRESSIVE_CONTRIBUTION_RATE > 1:
+        errors.append("PROGRESSIVE_CONTRIBUTION_RATE must be between 0 and 1.")
+    if PROGRESSIVE_SEED < 0:
+        errors.append("PROGRESSIVE_SEED must not be negative.")
+    if PROGRESSIVE_MAX_MACHINES < 1:
+        errors.append("PROGRESSIVE_MAX_MACHINES must be at least 1.")
+    if SESSION_GROUP_COMMIT_PULLS < 1:
+        errors.append("SESSION_GROUP_COMMIT_PULLS must be at least 1.")
+    if SESSION_SNAPSHOT_INTERVAL < 1:
+        errors.append("SESSION_SNAPSHOT_INTERVAL must be at least 1.")
+    if RNG_BACKEND not in ("standard", "bulk", "secure"):
+        errors.append("RNG_BACKEND must be standard, bulk or secure.")
+    if RNG_BLOCK_SIZE < 1:
+        errors.append("RNG_BLOCK_SIZE must be at least 1.")
+    if RNG_PREFETCH_BLOCKS < 1:
+        errors.append("RNG_PREFETCH_BLOCKS must be at least 1.")
+    if EVENT_QUEUE_SIZE < 1:
+        errors.append("EVENT_QUEUE_SIZE must be at least 1.")
+    if WAREHOUSE_BATCH_PULLS < 1:
+        errors.append("WAREHOUSE_BATCH_PULLS must be at least 1.")
+    if WAREHOUSE_FLUSH_MS <= 0:
+        errors.append("WAREHOUSE_FLUSH_MS must be greater than 0.")
+    if ANALYTICS_CACHE_MAX_ENTRIES < 1:
+        errors.append("ANALYTICS_CACHE_MAX_ENTRIES must be at least 1.")
+    if CONFIG_PROFILE_POLL_MS < 1:
+        errors.append("CONFIG_PROFILE_POLL_MS must be at least 1.")
+    if DIAGNOSTICS_REFRESH_MS < 0:
+        errors.append("DIAGNOSTICS_REFRESH_MS must not be negative.")
+    if DIAGNOSTICS_TRACE_EVENTS < 1:
+        errors.append("DIAGNOSTICS_TRACE_EVENTS must be at least 1.")
 
     if errors:
         error_message = "\n".join(errors) + "\n\nPlease update config.py to correct these issues."
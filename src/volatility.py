@@ -0,0 +1,456 @@
+"""
+This module provides payout distribution and volatility analysis for the Slot Machine game.
+
+Next to the mean (RTP) it calculates the variance, standard deviation, volatility
+index and confidence intervals of a single pull. It also calculates the exact
+distribution of the net result after any number of pulls. The single-pull
+distribution is raised to the n-th power by exponentiation by squaring, where
+every squaring is an FFT-based convolution, so a million pulls need only about
+twenty convolutions.
+
+Run this module directly to print a report for the values in config.py.
+"""
+
+import argparse
+from cmath import exp, pi
+from collections.abc import Sequence
+from dataclasses import dataclass, asdict
+from math import gcd, sqrt
+from statistics import NormalDist
+from game_math import Paytable
+from analytics_cache import get_analytics_cache
+from config import VOLATILITY_CONFIDENCE, DISTRIBUTION_EPSILON
+
+# Convolutions with a side shorter than this are computed directly
+DIRECT_CONVOLUTION_LIMIT: int = 64
+
+
+@dataclass(frozen=True)
+class VolatilityReport:
+    """
+    Represents the volatility figures of a single pull.
+
+    Attributes:
+        rtp (float): The Return to Player as a percentage.
+        hit_frequency (float): The probability that a pull pays anything.
+        mean (float): The expected net result of a pull.
+        variance (float): The variance of the net result of a pull.
+        standard_deviation (float): The standard deviation of the net result of a pull.
+        confidence (float): The confidence level used for the volatility index.
+        volatility_index (float): The standard deviation in pull costs multiplied by the confidence z-score.
+    """
+    rtp: float
+    hit_frequency: float
+    mean: float
+    variance: float
+    standard_deviation: float
+    confidence: float
+    volatility_index: float
+
+
+class NetDistribution:
+    """
+    Represents the exact distribution of the net result after a number of pulls.
+
+    The possible net results lie on a lattice: result = start + index * step.
+
+    Attributes:
+        pulls (int): The number of pulls.
+        start (int): The net result of index 0.
+        step (int): The distance between two neighbouring net results.
+        probabilities (Sequence[float]): The probability of each net result.
+        trimmed_probability (float): The probability dropped from the tails as negligible.
+    """
+
+    def __init__(self, pulls: int, start: int, step: int, probabilities: Sequence[float],
+                 trimmed_probability: float) -> None:
+        """
+        Initialize a new NetDistribution instance.
+
+        Args:
+            pulls (int): The number of pulls.
+            start (int): The net result of index 0.
+            step (int): The distance between two neighbouring net results.
+            probabilities (Sequence[float]): The probability of each net result.
+            trimmed_probability (float): The probability dropped from the tails as negligible.
+        """
+        self.pulls: int = pulls
+        self.start: int = start
+        self.step: int = step
+        self.probabilities: Sequence[float] = probabilities
+        self.trimmed_probability: float = trimmed_probability
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the NetDistribution object.
+
+        Returns:
+            str: A string representation of the NetDistribution object.
+        """
+        return (f"NetDistribution(pulls={self.pulls}, start={self.start}, step={self.step}, "
+                f"points={len(self.probabilities)})")
+
+    def net_result(self, index: int) -> int:
+        """
+        Get the net result of a lattice index.
+
+        Args:
+            index (int): The index in the probabilities list.
+
+        Returns:
+            int: The net result.
+        """
+        return self.start + index * self.step
+
+    def as_dict(self) -> dict[int, float]:
+        """
+        Get the non-zero probabilities as a dictionary.
+
+        Returns:
+            dict[int, float]: The probability of each net result.
+        """
+        return {self.net_result(index): probability
+                for index, probability in enumerate(self.probabilities) if probability > 0}
+
+    def mean(self) -> float:
+        """
+        Calculate the expected net result.
+
+        Returns:
+            float: The expected net result.
+        """
+        total = sum(self.probabilities)
+        return sum(self.net_result(index) * probability
+                   for index, probability in enumerate(self.probabilities)) / total
+
+    def quantile(self, level: float) -> int:
+        """
+        Get the smallest net result whose cumulative probability reaches the level.
+
+        Args:
+            level (float): The cumulative probability between 0 and 1.
+
+        Returns:
+            int: The net result at the quantile.
+        """
+        target = level * sum(self.probabilities)
+        cumulative = 0.0
+        for index, probability in enumerate(self.probabilities):
+            cumulative += probability
+            if cumulative >= target:
+                return self.net_result(index)
+        return self.net_result(len(self.probabilities) - 1)
+
+    def confidence_interval(self, confidence: float = VOLATILITY_CONFIDENCE) -> tuple[int, int]:
+        """
+        Get the central interval of net results containing the given probability.
+
+        Args:
+            confidence (float): The probability contained in the interval.
+
+        Returns:
+            tuple[int, int]: The lowest and highest net result of the interval.
+        """
+        tail = (1 - confidence) / 2
+        return self.quantile(tail), self.quantile(1 - tail)
+
+    def probability_of_profit(self) -> float:
+        """
+        Calculate the probability that the player ends with more money than they started with.
+
+        Returns:
+            float: The probability of a positive net result.
+        """
+        return sum(probability for index, probability in enumerate(self.probabilities)
+                   if self.net_result(index) > 0)
+
+
+def z_score(confidence: float) -> float:
+    """
+    Get the two-sided z-score of the standard normal distribution for a confidence level.
+
+    Args:
+        confidence (float): The confidence level between 0 and 1.
+
+    Returns:
+        float: The z-score.
+    """
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def volatility_report(paytable: Paytable = Paytable(), confidence: float = VOLATILITY_CONFIDENCE) -> VolatilityReport:
+    """
+    Calculate the volatility figures of a single pull.
+
+    Args:
+        paytable (Paytable): The paytable describing a single pull.
+        confidence (float): The confidence level used for the volatility index.
+
+    Returns:
+        VolatilityReport: The volatility figures.
+    """
+    outcomes = paytable.outcomes()
+    mean = sum(outcome.probability * outcome.net for outcome in outcomes)
+    variance = sum(outcome.probability * (outcome.net - mean) ** 2 for outcome in outcomes)
+    hit_frequency = sum(outcome.probability for outcome in outcomes if outcome.payout > 0)
+    standard_deviation = sqrt(variance)
+    volatility_index = z_score(confidence) * standard_deviation / paytable.pull_cost
+
+    return VolatilityReport(paytable.rtp(), hit_frequency, mean, variance, standard_deviation,
+                            confidence, volatility_index)
+
+
+def rtp_confidence_interval(pulls: int, paytable: Paytable = Paytable(),
+                            confidence: float = VOLATILITY_CONFIDENCE) -> tuple[float, float]:
+    """
+    Calculate the interval expected to contain the observed RTP after a number of pulls.
+
+    Args:
+        pulls (int): The number of pulls.
+        paytable (Paytable): The paytable describing a single pull.
+        confidence (float): The confidence level of the interval.
+
+    Returns:
+        tuple[float, float]: The lowest and highest observed RTP as percentages.
+    """
+    report = volatility_report(paytable, confidence)
+    margin = z_score(confidence) * report.standard_deviation / (paytable.pull_cost * sqrt(pulls)) * 100
+    return report.rtp - margin, report.rtp + margin
+
+
+def _fft(values: list[complex], invert: bool) -> list[complex]:
+    """
+    Compute the discrete Fourier transform of a list whose length is a power of two.
+
+    Args:
+        values (list[complex]): The values to transform.
+        invert (bool): Whether to compute the inverse transform.
+
+    Returns:
+        list[complex]: The transformed values.
+    """
+    size = len(values)
+    result = list(values)
+
+    # Bit-reversal permutation
+    j = 0
+    for i in range(1, size):
+        bit = size >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            result[i], result[j] = result[j], result[i]
+
+    length = 2
+    sign = 1 if invert else -1
+    while length <= size:
+        half = length // 2
+        roots = [exp(sign * 2j * pi * k / length) for k in range(half)]
+        for start in range(0, size, length):
+            for k in range(half):
+                even = result[start + k]
+                odd = result[start + k + half] * roots[k]
+                result[start + k] = even + odd
+                result[start + k + half] = even - odd
+        length *= 2
+
+    if invert:
+        result = [value / size for value in result]
+    return result
+
+
+def convolve(first: list[float], second: list[float]) -> list[float]:
+    """
+    Convolve two probability lists.
+
+    Short lists are convolved directly, longer ones with the FFT.
+
+    Args:
+        first (list[float]): The first probability list.
+        second (list[float]): The second probability list.
+
+    Returns:
+        list[float]: The convolution of both lists.
+    """
+    result_length = len(first) + len(second) - 1
+
+    if min(len(first), len(second)) <= DIRECT_CONVOLUTION_LIMIT:
+        short, long = sorted((first, second), key=len)
+        result = [0.0] * result_length
+        for shift, probability in enumerate(short):
+            if probability:
+                result[shift:shift + len(long)] = [value + probability * other for value, other
+                                                   in zip(result[shift:shift + len(long)], long)]
+        return result
+
+    size = 1
+    while size < result_length:
+        size *= 2
+
+    first_transform = _fft([complex(value) for value in first] + [0j] * (size - len(first)), False)
+    if first is second:
+        product = [value * value for value in first_transform]
+    else:
+        second_transform = _fft([complex(value) for value in second] + [0j] * (size - len(second)), False)
+        product = [value * other for value, other in zip(first_transform, second_transform)]
+
+    # Rounding errors of the transform can produce tiny negative values
+    return [max(0.0, value.real) for value in _fft(product, True)[:result_length]]
+
+
+def _trim(offset: int, probabilities: list[float], epsilon: float) -> tuple[int, list[float], float]:
+    """
+    Drop negligible probabilities from both ends of a probability list.
+
+    Args:
+        offset (int): The lattice index of the first probability.
+        probabilities (list[float]): The probability list.
+        epsilon (float): The probability below which tail values are dropped.
+
+    Returns:
+        tuple[int, list[float], float]: The new offset, the trimmed list and the dropped probability.
+    """
+    first = 0
+    last = len(probabilities)
+    while first < last - 1 and probabilities[first] < epsilon:
+        first += 1
+    while last - 1 > first and probabilities[last - 1] < epsilon:
+        last -= 1
+    dropped = sum(probabilities[:first]) + sum(probabilities[last:])
+    return offset + first, probabilities[first:last], dropped
+
+
+def net_distribution(pulls: int, paytable: Paytable = Paytable(),
+                     epsilon: float = DISTRIBUTION_EPSILON) -> NetDistribution:
+    """
+    Calculate the exact distribution of the net result after a number of pulls.
+
+    The single-pull outcomes are mapped to a lattice whose step is the greatest
+    common divisor of their distances from the loss, and the lattice distribution
+    is raised to the power of pulls by exponentiation by squaring.
+
+    Args:
+        pulls (int): The number of pulls.
+        paytable (Paytable): The paytable describing a single pull.
+        epsilon (float): The tail probability below which values are dropped.
+
+    Returns:
+        NetDistribution: The distribution of the net result.
+    """
+    outcomes = paytable.outcomes()
+    lowest = outcomes[0].net
+    step = 0
+    for outcome in outcomes:
+        step = gcd(step, outcome.net - lowest)
+    step = step or 1
+
+    base = [0.0] * ((outcomes[-1].net - lowest) // step + 1)
+    for outcome in outcomes:
+        base[(outcome.net - lowest) // step] += outcome.probability
+
+    result_offset, result = 0, [1.0]
+    power_offset, power = 0, base
+    trimmed = 0.0
+    remaining = pulls
+
+    while remaining:
+        if remaining & 1:
+            result_offset, result, dropped = _trim(result_offset + power_offset,
+                                                   convolve(result, power), epsilon)
+            trimmed += dropped
+        remaining >>= 1
+        if remaining:
+            power_offset, power, dropped = _trim(power_offset * 2, convolve(power, power), epsilon)
+            # The dropped tails of the power are missing from every later result
+            trimmed += dropped
+
+    return NetDistribution(pulls, pulls * lowest + result_offset * step, step, result, trimmed)
+
+
+def cached_volatility_report(paytable: Paytable = Paytable(),
+                             confidence: float = VOLATILITY_CONFIDENCE) -> VolatilityReport:
+    """
+    Get the volatility figures of a single pull from the analytics cache, calculating them on a miss.
+
+    Args:
+        paytable (Paytable): The paytable describing a single pull.
+        confidence (float): The confidence level used for the volatility index.
+
+    Returns:
+        VolatilityReport: The volatility figures.
+    """
+    report = get_analytics_cache().value("volatility_report", paytable,
+                                         lambda: asdict(volatility_report(paytable, confidence)),
+                                         confidence=confidence)
+    return VolatilityReport(**report)
+
+
+def cached_net_distribution(pulls: int, paytable: Paytable = Paytable(),
+                            epsilon: float = DISTRIBUTION_EPSILON) -> NetDistribution:
+    """
+    Get the distribution of the net result after a number of pulls from the analytics cache.
+
+    The probabilities are a memory-mapped lookup table, and the distribution
+    is calculated only if the cache misses it.
+
+    Args:
+        pulls (int): The number of pulls.
+        paytable (Paytable): The paytable describing a single pull.
+        epsilon (float): The tail probability below which values are dropped.
+
+    Returns:
+        NetDistribution: The distribution of the net result.
+    """
+    calculated: list[NetDistribution] = []
+
+    def calculate() -> NetDistribution:
+        if not calculated:
+            calculated.append(net_distribution(pulls, paytable, epsilon))
+        return calculated[0]
+
+    cache = get_analytics_cache()
+    start, step, trimmed_probability = cache.value(
+        "net_distribution", paytable,
+        lambda: (calculate().start, calculate().step, calculate().trimmed_probability),
+        pulls=pulls, epsilon=epsilon
+    )
+    probabilities = cache.table("net_distribution", paytable, lambda: calculate().probabilities,
+                                pulls=pulls, epsilon=epsilon)
+    return NetDistribution(pulls, start, step, probabilities, trimmed_probability)
+
+
+def main() -> None:
+    """
+    Print a volatility report for the values in config.py.
+    """
+    parser = argparse.ArgumentParser(description="Payout distribution and volatility analysis.")
+    parser.add_argument("--pulls", type=int, default=1000, help="Number of pulls for the net result distribution.")
+    parser.add_argument("--confidence", type=float, default=VOLATILITY_CONFIDENCE, help="Confidence level.")
+    arguments = parser.parse_args()
+
+    paytable = Paytable()
+    report = cached_volatility_report(paytable, arguments.confidence)
+    print("Single pull:")
+    for outcome in paytable.outcomes():
+        print(f"  {outcome.name}: probability {outcome.probability:.6f}, net ${outcome.net}")
+    print(f"RTP: {report.rtp:.4f}%")
+    print(f"Hit frequency: {report.hit_frequency:.6f}")
+    print(f"Mean: ${report.mean:.4f}, variance: {report.variance:.4f}, "
+          f"standard deviation: ${report.standard_deviation:.4f}")
+    print(f"Volatility index ({report.confidence:.0%}): {report.volatility_index:.4f}")
+
+    low_rtp, high_rtp = rtp_confidence_interval(arguments.pulls, paytable, arguments.confidence)
+    distribution = cached_net_distribution(arguments.pulls, paytable)
+    low_net, high_net = distribution.confidence_interval(arguments.confidence)
+    print(f"After {arguments.pulls} pulls:")
+    print(f"  Observed RTP interval ({arguments.confidence:.0%}): {low_rtp:.4f}% to {high_rtp:.4f}%")
+    print(f"  Net result interval ({arguments.confidence:.0%}): ${low_net} to ${high_net}")
+    print(f"  Expected net result: ${distribution.mean():.2f}")
+    print(f"  Probability of profit: {distribution.probability_of_profit():.6f}")
+    print(f"  Trimmed tail probability: {distribution.trimmed_probability:.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""
+This module provides a SQLite warehouse recording every pull for later queries.
+
+Every pull is stored with its session id, time, configuration, reel values,
+bet, payout and balance. Pulls are queued by the game and written by a
+background thread in batches, each batch in one transaction with prepared
+statements, to a database in WAL mode, so readers are never blocked by the
+writer and the game never waits for the disk.
+
+Every batch also updates two rollup tables in the same transaction: the totals
+of every session, and the totals of every configuration for every hour. Queries
+such as "the observed RTP of a configuration during the last week" read a few
+rollup rows instead of every pull, and the pulls are indexed by time and by
+configuration for the queries that need them.
+
+A configuration is identified by a hash of its paytable, stored with the
+paytable and its theoretical RTP.
+
+Run this module directly to show the recorded configurations, sessions or hourly totals.
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, asdict
+from queue import SimpleQueue, Empty
+from threading import Thread, Event as ThreadEvent
+from time import time, monotonic
+from typing import Any
+from uuid import uuid4
+from analytics_cache import get_analytics_cache
+from events import EventBus, Event, PullStarted, Won, JackpotWon, OUTCOME_EVENTS
+from game_math import Paytable, LOSS_OUTCOME, WIN_OUTCOME, JACKPOT_OUTCOME
+from slot import SlotValue
+from config import WAREHOUSE_FILE, WAREHOUSE_BATCH_PULLS, WAREHOUSE_FLUSH_MS
+
+# Version of the database schema, stored as the user version of the database
+SCHEMA_VERSION: int = 1
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS configs (
+    config_id TEXT PRIMARY KEY,
+    paytable TEXT NOT NULL,
+    rtp REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pulls (
+    session_id TEXT NOT NULL,
+    pull_number INTEGER NOT NULL,
+    time REAL NOT NULL,
+    config_id TEXT NOT NULL,
+    reels TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    bet INTEGER NOT NULL,
+    payout INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    PRIMARY KEY (session_id, pull_number)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pulls_by_time ON pulls (time);
+CREATE INDEX IF NOT EXISTS pulls_by_config ON pulls (config_id, time);
+CREATE TABLE IF NOT EXISTS session_totals (
+    session_id TEXT PRIMARY KEY,
+    first_pull REAL NOT NULL,
+    last_pull REAL NOT NULL,
+    pulls INTEGER NOT NULL,
+    wagered INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    jackpots INTEGER NOT NULL,
+    balance INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hourly_totals (
+    config_id TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    pulls INTEGER NOT NULL,
+    wagered INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    jackpots INTEGER NOT NULL,
+    PRIMARY KEY (config_id, hour)
+) WITHOUT ROWID;
+"""
+
+_INSERT_CONFIG: str = "INSERT OR IGNORE INTO configs (config_id, paytable, rtp) VALUES (?, ?, ?)"
+
+_INSERT_PULL: str = ("INSERT INTO pulls (session_id, pull_number, time, config_id, reels, outcome, bet, payout, "
+                     "balance) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+_UPSERT_SESSION: str = """
+INSERT INTO session_totals (session_id, first_pull, last_pull, pulls, wagered, won, wins, jackpots, balance)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    last_pull = excluded.last_pull, pulls = pulls + excluded.pulls, wagered = wagered + excluded.wagered,
+    won = won + excluded.won, wins = wins + excluded.wins, jackpots = jackpots + excluded.jackpots,
+    balance = excluded.balance
+"""
+
+_UPSERT_HOUR: str = """
+INSERT INTO hourly_totals (config_id, hour, pulls, wagered, won, wins, jackpots) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (config_id, hour) DO UPDATE SET
+    pulls = pulls + excluded.pulls, wagered = wagered + excluded.wagered, won = won + excluded.won,
+    wins = wins + excluded.wins, jackpots = jackpots + excluded.jackpots
+"""
+
+# Outcome recorded for every outcome event
+_EVENT_OUTCOMES: dict[type[Event], str] = {Won: WIN_OUTCOME, JackpotWon: JACKPOT_OUTCOME}
+
+# Kinds of the queued records
+_CONFIG_RECORD: str = "config"
+_PULL_RECORD: str = "pull"
+
+
+@dataclass(frozen=True)
+class Totals:
+    """
+    Represents the totals of the pulls of a session or a period.
+
+    Attributes:
+        pulls (int): The number of pulls.
+        wagered (int): The total of the bets.
+        won (int): The total of the payouts.
+        wins (int): The number of pulls paying a prize.
+        jackpots (int): The number of jackpots.
+    """
+    pulls: int
+    wagered: int
+    won: int
+    wins: int
+    jackpots: int
+
+    @property
+    def observed_rtp(self) -> float:
+        """
+        Get the Return to Player (RTP) observed over the pulls.
+
+        Returns:
+            float: The RTP as a percentage, 0 without pulls.
+        """
+        return self.won / self.wagered * 100 if self.wagered else 0.0
+
+
+def config_id(paytable: Paytable) -> str:
+    """
+    Get the id of a configuration.
+
+    Args:
+        paytable (Paytable): The paytable of the configuration.
+
+    Returns:
+        str: A hash of every value of the paytable.
+    """
+    return hashlib.sha256(json.dumps(asdict(paytable), sort_keys=True).encode()).hexdigest()[:16]
+
+
+class Warehouse:
+    """
+    Represents the SQLite database recording every pull, and its background writer.
+
+    Attributes:
+        database_file (str): The absolute path of the database.
+        session_id (str): The id of the session recorded by this process.
+        batch_pulls (int): The number of pulls written in one transaction.
+        flush_ms (float): The longest time in milliseconds a recorded pull waits to be written.
+        dropped_pulls (int): The number of pulls lost because their batch could not be written.
+    """
+
+    def __init__(self, database_file: str = WAREHOUSE_FILE, batch_pulls: int = WAREHOUSE_BATCH_PULLS,
+                 flush_ms: float = WAREHOUSE_FLUSH_MS, session_id: str | None = None) -> None:
+        """
+        Open the database, creating it if needed, and start the background writer.
+
+        Args:
+            database_file (str): The path of the database, relative to the source directory.
+            batch_pulls (int): The number of pulls written in one transaction.
+            flush_ms (float): The longest time in milliseconds a recorded pull waits to be written.
+            session_id (str | None): The id of the recorded session, or None for a new random id.
+        """
+        self.database_file: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), database_file)
+        self.session_id: str = session_id if session_id is not None else uuid4().hex
+        self.batch_pulls: int = batch_pulls
+        self.flush_ms: float = flush_ms
+        self.dropped_pulls: int = 0
+        self._queue: SimpleQueue[tuple[str, tuple] | ThreadEvent | None] = SimpleQueue()
+        self._config_ids: dict[Paytable, str] = {}
+        self._bet: int = 0
+        self._paytable: Paytable = Paytable()
+        self._get_paytable: Callable[[], Paytable] = Paytable
+        self._closed: bool = False
+
+        os.makedirs(os.path.dirname(self.database_file), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        connection.close()
+
+        self._writer: Thread = Thread(target=self._write_batches, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def __repr__(self) -> str:
+        """
+        Return a string representation of the Warehouse object.
+
+        Returns:
+            str: A string representation of the Warehouse object.
+        """
+        return f"Warehouse(database_file={self.database_file}, session_id={self.session_id})"
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the database.
+
+        Returns:
+            sqlite3.Connection: The connection, which must only be used on the thread that opened it.
+        """
+        connection = sqlite3.connect(self.database_file)
+        # WAL keeps the database consistent after a crash, only the latest commits can be lost on a power loss
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(self, pull_number: int, paytable: Paytable, values: tuple[SlotValue, ...], outcome: str,
+               bet: int, payout: int, balance: int, pull_time: float | None = None) -> None:
+        """
+        Queue a pull to be written by the background writer.
+
+        Args:
+            pull_number (int): The number of the pull in the session.
+            paytable (Paytable): The paytable the pull was played with.
+            values (tuple[SlotValue, ...]): The value shown on each main slot.
+            outcome (str): The outcome of the pull (loss, win or jackpot).
+            bet (int): The cost of the pull.
+            payout (int): The amount paid to the player, not counting the pull cost.
+            balance (int): The player's money after the pull.
+            pull_time (float | None): The time of the pull in seconds since the epoch, or None for now.
+        """
+        identifier = self._config_ids.get(paytable)
+        if identifier is None:
+            identifier = self._config_ids[paytable] = config_id(paytable)
+            rtp = get_analytics_cache().value("rtp", paytable, paytable.rtp)
+            self._queue.put((_CONFIG_RECORD, (identifier, json.dumps(asdict(paytable), sort_keys=True), rtp)))
+        self._queue.put((_PULL_RECORD, (self.session_id, pull_number, pull_time if pull_time is not None else time(),
+                                        identifier, json.dumps(values, ensure_ascii=False), outcome, bet, payout,
+                                        balance)))
+
+    def subscribe(self, event_bus: EventBus, get_paytable: Callable[[], Paytable]) -> None:
+        """
+        Record every pull published on an event bus.
+
+        The handlers only queue the pull, so they can run synchronously.
+
+        Args:
+            event_bus (EventBus): The bus publishing the pull events.
+            get_paytable (Callable[[], Paytable]): The function returning the paytable in use,
+                read when a pull starts so a configuration reloaded later is not mixed in.
+        """
+        self._get_paytable = get_paytable
+        self._paytable = get_paytable()
+        event_bus.subscribe(self.pull_started, PullStarted)
+        event_bus.subscribe(self.pull_finished, *OUTCOME_EVENTS)
+
+    def pull_started(self, event: PullStarted) -> None:
+        """
+        Remember the bet and the paytable of a pull.
+
+        Args:
+            event (PullStarted): The published event.
+        """
+        self._bet = event.pull_cost
+        self._paytable = self._get_paytable()
+
+    def pull_finished(self, event: Any) -> None:
+        """
+        Record a finished pull.
+
+        Args:
+            event (Any): The published outcome event.
+        """
+        outcome = _EVENT_OUTCOMES.get(type(event), LOSS_OUTCOME)
+        payout = event.amount + self._bet if outcome != LOSS_OUTCOME else 0
+        self.record(event.pull_number, self._paytable, event.values, outcome, self._bet, payout, event.balance,
+                    event.timestamp)
+
+    def _write_batches(self) -> None:
+        """
+        Write the queued records in batches until the warehouse is closed.
+
+        A batch is written once it has "batch_pulls" pulls, once its oldest pull has
+        waited "flush_ms", or when a flush is requested. A batch that cannot be written,
+        for example while another process keeps the database locked or the disk is
+        full, is reported and its pulls are dropped, so the writer keeps running and
+        the queue does not grow without bound. Its configurations are kept for the next batch.
+        """
+        connection = self._connect()
+        batch: list[tuple[str, tuple]] = []
+        deadline = 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - monotonic()) if batch else None)
+            except Empty:
+                item = ThreadEvent()
+            if isinstance(item, tuple):
+                if not batch:
+                    deadline = monotonic() + self.flush_ms / 1000
+                batch.append(item)
+                if len(batch) < self.batch_pulls:
+                    continue
+            if batch:
+                try:
+                    self._write(connection, batch)
+                    batch = []
+                except sqlite3.Error as error:
+                    pulls = sum(1 for kind, _ in batch if kind == _PULL_RECORD)
+                    self.dropped_pulls += pulls
+                    print(f"Warehouse dropped {pulls} pulls: {error!r}", file=sys.stderr)
+                    batch = [record for record in batch if record[0] == _CONFIG_RECORD]
+                    deadline = monotonic() + self.flush_ms / 1000
+            if item is None:
+                break
+            if isinstance(item, ThreadEvent):
+                item.set()
+        connection.close()
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, batch: list[tuple[str, tuple]]) -> None:
+        """
+        Write a batch of records and update the rollups in one transaction.
+
+        Args:
+            connection (sqlite3.Connection): The connection of the writer.
+            batch (list[tuple[str, tuple]]): The queued records.
+        """
+        configs = [row for kind, row in batch if kind == _CONFIG_RECORD]
+        pulls = [row for kind, row in batch if kind == _PULL_RECORD]
+
+        sessions: dict[str, list] = {}
+        hours: dict[tuple[str, int], list[int]] = {}
+        for session_id, _, pull_time, identifier, _, outcome, bet, payout, balance in pulls:
+            win = 1 if payout else 0
+            jackpot = 1 if outcome == JACKPOT_OUTCOME else 0
+            session = sessions.get(session_id)
+            if session is None:
+                sessions[session_id] = [session_id, pull_time, pull_time, 1, bet, payout, win, jackpot, balance]
+            else:
+                session[2] = pull_time
+                session[3] += 1
+                session[4] += bet
+                session[5] += payout
+                session[6] += win
+                session[7] += jackpot
+                session[8] = balance
+            totals = hours.setdefault((identifier, int(pull_time // 3600)), [0, 0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += bet
+            totals[2] += payout
+            totals[3] += win
+            totals[4] += jackpot
+
+        # The statements are the same for every batch, so the connection reuses them prepared
+        with connection:
+            connection.executemany(_INSERT_CONFIG, configs)
+            connection.executemany(_INSERT_PULL, pulls)
+            connection.executemany(_UPSERT_SESSION, sessions.values())
+            connection.executemany(_UPSERT_HOUR, [(identifier, hour, *totals)
+                                                  for (identifier, hour), totals in hours.items()])
+
+    def flush(self) -> None:
+        """
+        Wait until every pull recorded so far is written, or dropped if it could not be.
+        """
+        if self._closed or not self._writer.is_alive():
+            return
+        written = ThreadEvent()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self) -> None:
+        """
+        Write the remaining pulls and stop the background writer.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _query(self, sql: str, parameters: tuple = ()) -> list[tuple]:
+        """
+        Run a read-only query on a connection of its own, which the writer does not block in WAL mode.
+
+        Args:
+            sql (str): The query.
+            parameters (tuple): The parameters of the query.
+
+        Returns:
+            list[tuple]: The rows.
+        """
+        connection = self._connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def configs(self) -> list[tuple[str, dict[str, Any], float]]:
+        """
+        Get the recorded configurations.
+
+        Returns:
+            list[tuple[str, dict[str, Any], float]]: The id, paytable values and theoretical RTP of every configuration.
+        """
+        return [(identifier, json.loads(paytable), rtp)
+                for identifier, paytable, rtp in self._query("SELECT config_id, paytable, rtp FROM configs")]
+
+    def config_totals(self, identifier: str, since: float | None = None, until: float | None = None) -> Totals:
+        """
+        Get the totals of a configuration over a period, from the hourly rollups.
+
+        Args:
+            identifier (str): The id of the configuration.
+            since (float | None): The start of the period in seconds since the epoch, or None for the first pull.
+                It is rounded down to a whole hour.
+            until (float | None): The end of the period in seconds since the epoch, or None for the latest pull.
+                It is rounded up to a whole hour.
+
+        Returns:
+            Totals: The totals of the pulls played with the configuration during the period.
+        """
+        first_hour = int(since // 3600) if since is not None else 0
+        last_hour = -int(-until // 3600) if until is not None else 2 ** 62
+        row = self._query("SELECT COUNT(*), TOTAL(pulls), TOTAL(wagered), TOTAL(won), TOTAL(wins), TOTAL(jackpots) "
+                          "FROM hourly_totals WHERE config_id = ? AND hour >= ? AND hour < ?",
+                          (identifier, first_hour, last_hour))[0]
+        return Totals(*(int(value) for value in row[1:]))
+
+    def hourly_totals(self, identifier: str, since: float | None = None) -> list[tuple[int, Totals]]:
+        """
+        Get the totals of a configuration for every hour.
+
+        Args:
+            identifier (str): The id of the configuration.
+            since (float | None): The start of the period in seconds since the epoch, or None for the first pull.
+
+        Returns:
+            list[tuple[int, Totals]]: The start of every hour in seconds since the epoch with its totals, oldest first.
+        """
+        rows = self._query("SELECT hour, pulls, wagered, won, wins, jackpots FROM hourly_totals "
+                           "WHERE config_id = ? AND hour >= ? ORDER BY hour",
+                           (identifier, int(since // 3600) if since is not None else 0))
+        return [(hour * 3600, Totals(*totals)) for hour, *totals in rows]
+
+    def session_totals(self, session_id: str | None = None) -> Totals | None:
+        """
+        Get the totals of a session.
+
+        Args:
+            session_id (str | None): The id of the session, or None for the session of this process.
+
+        Returns:
+            Totals | None: The totals, or None if the session has no written pulls.
+        """
+        rows = self._query("SELECT pulls, wagered, won, wins, jackpots FROM session_totals WHERE session_id = ?",
+                           (session_id if session_id is not None else self.session_id,))
+        return Totals(*rows[0]) if rows else None
+
+
+def main() -> None:
+    """
+    Show the observed RTP of every recorded configuration, or the totals of a session.
+    """
+    parser = argparse.ArgumentParser(description="Queries of the SQLite pull warehouse.")
+    parser.add_argument("--database", default=WAREHOUSE_FILE, help="Database file, relative to the source directory.")
+    parser.add_argument("--days", type=float, default=7, help="Number of past days of the configuration totals.")
+    parser.add_argument("--hourly", metavar="CONFIG_ID", help="Show the hourly totals of a configuration.")
+    parser.add_argument("--session", metavar="SESSION_ID", help="Show the totals of a session.")
+    arguments = parser.parse_args()
+
+    warehouse = Warehouse(arguments.database)
+    since = time() - arguments.days * 86_400
+    if arguments.session:
+        totals = warehouse.session_totals(arguments.session)
+        print(totals if totals is None else f"{totals}, observed RTP {totals.observed_rtp:.2f}%")
+    elif arguments.hourly:
+        for hour, totals in warehouse.hourly_totals(arguments.hourly, since):
+            print(f"{hour}: {totals.pulls} pulls, observed RTP {totals.observed_rtp:.2f}%")
+    else:
+        for identifier, paytable, rtp in warehouse.configs():
+            totals = warehouse.config_totals(identifier, since)
+            print(f"{identifier}: {totals.pulls} pulls in {arguments.days:g} days, "
+                  f"observed RTP {totals.observed_rtp:.2f}%, theoretical RTP {rtp:.2f}% ({paytable})")
+    warehouse.close()
+
+
+if __name__ == "__main__":
+    main()